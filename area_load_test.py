@@ -1,38 +1,60 @@
 #!/usr/bin/env python3
-from poff_mud.spawn_pool import SpawnPool
-from poff_mud.area import Area
-
-
-def load_and_print_area(filename, gsp):
-    with open(filename) as fp:
-        new_area = Area.load_from_file(fp, gsp=gsp)
+import sys
 
-    print(new_area)
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.area import Area, AreaHeader, AreaReset, iter_area_records
+from poff_mud.mobile import Mobile
+from poff_mud.room import Room
+from poff_mud.object import Object
 
-    print("MOBS:")
-    for mob_vnum in new_area.mobs:
-        print(f"\t{new_area.mobs[mob_vnum]}")
+section_names = {
+    Mobile: "MOBS:",
+    Room: "ROOMS:",
+    Object: "OBJECTS:",
+    AreaReset: "RESETS:",
+}
 
-    print("ROOMS:")
-    for room_vnum in new_area.rooms:
-        print(f"\t{new_area.rooms[room_vnum]}")
 
-    print("OBJECTS:")
-    for obj_vnum in new_area.objects:
-        print(f"\t{new_area.objects[obj_vnum]}")
+def print_area_records(filename):
+    # Records are printed as they're read rather than after loading the
+    # whole area, so this works on areas of any size
+    last_type = None
 
-    return new_area
+    with open(filename) as fp:
+        for record in iter_area_records(fp):
+            if type(record) is AreaHeader:
+                author, desc = record.description.split(" ", 1)
+                print(
+                    f"AREA #{record.filename}: {record.name} By: {author}"
+                    f" (Lvl {record.level_min} to {record.level_max})"
+                )
+            else:
+                if type(record) is not last_type:
+                    print(section_names[type(record)])
+                    last_type = type(record)
+
+                if type(record) is AreaReset:
+                    print(f"\t{record.action.name} {' '.join(record.values)}")
+                else:
+                    print(f"\t{record}")
+
+
+def load_area(filename, gsp):
+    with open(filename) as fp:
+        return Area.load_from_file(fp, gsp=gsp)
 
 
 if __name__ == "__main__":
-    areas = []
-    gsp = SpawnPool()
+    filenames = ["areas/school.are", "areas/midgaard.are"]
 
-    school = load_and_print_area("areas/school.are", gsp)
-    areas.append(school)
+    for filename in filenames:
+        print_area_records(filename)
 
-    midgaard = load_and_print_area("areas/midgaard.are", gsp)
-    areas.append(midgaard)
+    # Loading whole areas to try out their resets needs them all in memory,
+    # so with --no-reset only the records are printed
+    if "--no-reset" not in sys.argv:
+        gsp = SpawnPool()
+        areas = [load_area(filename, gsp) for filename in filenames]
 
-    for a in areas:
-        a.reset(gsp)
+        for a in areas:
+            a.reset(gsp)
@@ -0,0 +1,240 @@
+"""asyncio based transport for the MUD server.
+
+Contains one class, AsyncMudServer, which offers the same API as
+mudserver.MudServer but is driven by an asyncio event loop. Instead of
+sleeping between polls, the game loop can await 'wait_for_events' which
+returns as soon as a player connects, disconnects or sends a command.
+"""
+
+
+import asyncio
+import time
+
+from mudserver import MudServer, NewPlayerEvent, PlayerLeftEvent
+
+
+class AsyncMudServer(MudServer):
+    """A MudServer which uses asyncio streams to talk to players.
+
+    It takes the same arguments as MudServer, although
+    'max_accepts_per_update' has no effect as the event loop accepts
+    clients as they arrive. Once created, 'start' must be awaited from
+    inside a running event loop before players can connect. The game
+    loop should then await 'wait_for_events' and call 'update' each time
+    it returns, after which 'drain_events', 'get_new_players',
+    'get_disconnected_players' and 'get_commands' work exactly as they
+    do for MudServer.
+    """
+
+    class _Client(MudServer._Client):
+        """Holds information about a connected player"""
+
+        # the stream used to read data sent by this client
+        reader = None
+        # the stream used to send data to this client
+        writer = None
+
+        def __init__(self, id, reader, writer, address, buffer, last_activity):
+            MudServer._Client.__init__(self, id, None, address, buffer, last_activity)
+            self.reader = reader
+            self.writer = writer
+
+    # the asyncio server accepting new clients
+    _server = None
+    # set whenever there are new events waiting to be picked up by 'update'
+    _events_waiting = None
+    # the tasks reading from each client, see '_handle_client'
+    _client_tasks = None
+
+    def _start_listening(self):
+        # MudServer opens its listen socket when it's constructed, but we
+        # have to wait for a running event loop. See 'start'
+        pass
+
+    async def start(self):
+        """Starts listening for new players. Must be called from inside
+        a running event loop.
+        """
+
+        # the event is created here rather than in __init__ so that it
+        # belongs to the running loop
+        self._events_waiting = asyncio.Event()
+        self._client_tasks = set()
+
+        # listen on the same address and port MudServer would
+        self._server = await asyncio.start_server(
+            self._handle_client,
+            self._address,
+            self._port,
+            backlog=self._backlog,
+            reuse_address=True,
+        )
+
+    async def wait_for_events(self, timeout=None):
+        """Waits until there are new events to be picked up by 'update',
+        or until 'timeout' seconds have passed, whichever comes first.
+        """
+        try:
+            await asyncio.wait_for(self._events_waiting.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def update(self):
+        """Makes the events received since the last call available from
+        'drain_events', 'get_new_players', 'get_disconnected_players' and
+        'get_commands'.
+        Unlike MudServer this doesn't read from the network, as the event
+        loop reads from the clients in the background.
+        """
+        self._check_for_idle()
+        self.flush()
+
+        self._swap_events()
+        self._events_waiting.clear()
+
+    def disconnect_client(self, clid):
+        # the client may have left already, e.g. straight after sending us
+        # 'quit'
+        cl = self._clients.get(clid)
+        if cl is None:
+            return
+
+        # send anything still waiting, such as a goodbye message
+        self._end_compression(cl)
+        self._flush_client(clid)
+        if clid not in self._clients:
+            return
+
+        # this closes the stream, disconnecting the client. The reading task
+        # for this client will notice and finish on its own
+        self._handle_disconnect(clid)
+
+    def shutdown(self):
+        """Closes down the server, disconnecting all clients and
+        closing the listen socket. Await 'wait_closed' afterwards to let
+        everything finish before the event loop stops.
+        """
+        self.flush()
+
+        for cl in self._clients.values():
+            cl.writer.close()
+
+        # stop reading from the clients. Their tasks finish once they've
+        # been cancelled, see 'wait_closed'
+        for task in self._client_tasks or ():
+            task.cancel()
+
+        if self._server is not None:
+            self._server.close()
+
+    async def wait_closed(self):
+        """Waits for everything closed down by 'shutdown' to finish."""
+        if self._client_tasks:
+            await asyncio.gather(*self._client_tasks, return_exceptions=True)
+
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def _flush_client(self, clid):
+        cl = self._clients.get(clid)
+        if cl is None:
+            return
+        self._finish_compressed_block(cl)
+        if not cl.outbuf:
+            return
+
+        # hand everything queued for the client to the stream in one go.
+        # 'write' only buffers the data, the event loop sends it to the
+        # client in the background
+        try:
+            cl.writer.write(bytes(cl.outbuf))
+        except OSError:
+            self._handle_disconnect(clid)
+            return
+        self._send_calls += 1
+        cl.outbuf.clear()
+
+        # the client isn't reading what we send them. Rather than let the
+        # buffer grow forever, we drop them
+        if cl.writer.transport.get_write_buffer_size() > self._output_limit:
+            self._drop_client(clid)
+
+    def _add_event(self, kind, *fields):
+        # add the event to the new events and wake up anybody waiting on
+        # 'wait_for_events'
+        MudServer._add_event(self, kind, *fields)
+        self._events_waiting.set()
+
+    async def _handle_client(self, reader, writer):
+        # asyncio runs this as a new task for every client that connects
+
+        clid = self._nextid
+        self._nextid += 1
+
+        address = writer.get_extra_info("peername")
+        cl = AsyncMudServer._Client(
+            clid, reader, writer, address[0], bytearray(), time.monotonic()
+        )
+        self._clients[clid] = cl
+        self._enable_keepalive(writer.get_extra_info("socket"))
+        self._track_idle(clid)
+        self._offer_compression(clid)
+
+        # 'drain' waits while more than the high water mark is buffered
+        writer.transport.set_write_buffer_limits(high=self._output_high_water)
+
+        self._add_event(NewPlayerEvent, clid)
+
+        # keep hold of the task so 'shutdown' can cancel it
+        task = asyncio.current_task()
+        self._client_tasks.add(task)
+
+        try:
+            while clid in self._clients:
+                # stop reading the client's commands while their output is
+                # backed up, so they can't send faster than they read
+                await writer.drain()
+
+                data = await reader.read(4096)
+
+                # an empty read means the client closed the connection
+                if not data:
+                    break
+
+                cl.last_activity = time.monotonic()
+
+                # process the data, stripping out any special Telnet commands
+                # and turning each complete line into a command
+                for message in self._process_sent_data(cl, data):
+                    self._add_command(clid, message)
+        # if there is a problem with the connection (e.g. the client has
+        # disconnected, or keepalive found it dead and reports ETIMEDOUT)
+        # an OSError is raised, as with the sockets MudServer uses
+        except OSError:
+            pass
+        # 'shutdown' cancels this task. It returns rather than finishing as
+        # cancelled, which asyncio's stream server would log as an error
+        except asyncio.CancelledError:
+            return
+        finally:
+            self._client_tasks.discard(task)
+
+        # if we weren't told to disconnect the client, they left on their own
+        if clid in self._clients:
+            self._handle_disconnect(clid)
+
+    def _drop_client(self, clid):
+        # throw away anything still buffered for the client and disconnect
+        # them straight away
+        self._clients[clid].writer.transport.abort()
+        self._handle_disconnect(clid)
+
+    def _handle_disconnect(self, clid):
+
+        # remove the client from the clients map. Closing the stream is
+        # harmless if it has already been closed
+        cl = self._clients.pop(clid)
+        cl.writer.close()
+
+        # add a 'player left' occurence to the new events list
+        self._add_event(PlayerLeftEvent, clid)
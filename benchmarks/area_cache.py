@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Compares loading the area files by parsing them (a cold start) against
+loading the compiled copies in the area cache (a warm start).
+
+Run from the repo root with: python -m benchmarks.area_cache
+"""
+import os
+import time
+
+from poff_mud.area_cache import cache_path, load_area
+from poff_mud.spawn_pool import SpawnPool
+
+AREA_FILES = ["areas/school.are", "areas/midgaard.are"]
+RUNS = 20
+
+
+def remove_caches():
+    for filename in AREA_FILES:
+        try:
+            os.remove(cache_path(filename))
+        except FileNotFoundError:
+            pass
+
+
+def load_all():
+    gsp = SpawnPool()
+    for filename in AREA_FILES:
+        load_area(filename, gsp=gsp)
+
+
+def time_runs(before_each):
+    total = 0
+    for _ in range(RUNS):
+        before_each()
+        start = time.perf_counter()
+        load_all()
+        total += time.perf_counter() - start
+    return total / RUNS * 1000
+
+
+def main():
+    cold_ms = time_runs(remove_caches)
+    warm_ms = time_runs(lambda: None)
+
+    print(f"loading {', '.join(AREA_FILES)}")
+    print(f"  cold (parse and write cache): {cold_ms:7.2f} ms")
+    print(f"  warm (read cache):            {warm_ms:7.2f} ms")
+    print(f"  speedup:                      {cold_ms / warm_ms:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Compares loading the area files with AreaLexer against the old helpers,
+which read the file one character at a time with fp.read(1).
+
+The old helpers are kept here for comparison, wrapped up with the same
+methods as AreaLexer so the loaders can run on either. The areas each one
+loads are checked to be identical.
+
+Run from the repo root with: python -m benchmarks.area_loading
+"""
+import enum
+import time
+
+from poff_mud.area import Area
+from poff_mud.file_helpers import AreaLexer
+
+AREA_FILES = ["areas/school.are", "areas/midgaard.are"]
+RUNS = 20
+
+
+class LegacyReader(AreaLexer):
+    # the old file_helpers functions, working on an open file. It's a
+    # subclass only so the loaders use it as it is instead of wrapping it
+    def __init__(self, fp):
+        self.fp = fp
+
+    def read(self, count=1):
+        return self.fp.read(count)
+
+    def readline(self):
+        return self.fp.readline()
+
+    def peek_next_line(self):
+        pos = self.fp.tell()
+        line = self.fp.readline()
+        self.fp.seek(pos)
+
+        return line
+
+    def read_until_delimiter(self, demlimiter):
+        result = ""
+        last_char = ""
+
+        while last_char in [" ", "\n"]:
+            last_char = self.fp.read(1)
+
+        while True:
+            last_char = self.fp.read(1)
+
+            if last_char == demlimiter:
+                break
+            elif last_char == "":
+                return result
+
+            result = result + last_char
+
+        return result
+
+    def read_until_tilde(self):
+        result = self.read_until_delimiter("~")
+        self.fp.read(1)
+
+        return result
+
+    def read_flagset(self):
+        flagset = []
+
+        last_char = self.fp.read(1)
+        while last_char not in [" ", "\n"]:
+            if last_char != "0":
+                flagset.append(last_char)
+
+            last_char = self.fp.read(1)
+
+        return flagset
+
+    def read_string(self):
+        result = ""
+
+        last_char = self.fp.read(1)
+
+        while last_char in [" ", "\n"]:
+            last_char = self.fp.read(1)
+
+        quote_mode = False
+        while quote_mode or last_char not in [" ", "\n"]:
+            if last_char == "'":
+                quote_mode = not quote_mode
+            else:
+                result = result + last_char
+
+            last_char = self.fp.read(1)
+
+        return result
+
+    def read_number(self):
+        result = ""
+
+        last_char = self.fp.read(1)
+
+        while last_char in [" ", "\n"]:
+            last_char = self.fp.read(1)
+
+        while last_char not in [" ", "\n"]:
+            result = result + last_char
+
+            last_char = self.fp.read(1)
+
+        if result == "":
+            return 0
+
+        return int(result)
+
+    def read_letter(self):
+        return self.fp.read(1)
+
+
+def describe(value):
+    # a text version of everything loaded, for comparing the two loaders
+    if isinstance(value, enum.Enum):
+        return repr(value)
+    if isinstance(value, dict):
+        items = ", ".join(f"{describe(k)}: {describe(v)}" for k, v in value.items())
+        return "{" + items + "}"
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(describe(v) for v in value) + "]"
+    slots = [n for c in type(value).__mro__ for n in c.__dict__.get("__slots__", ())]
+    if slots or hasattr(value, "__dict__"):
+        fields = {n: getattr(value, n) for n in slots if n != "prototype"}
+        fields.update(getattr(value, "__dict__", {}))
+        attrs = ", ".join(f"{k}={describe(v)}" for k, v in sorted(fields.items()))
+        return f"{type(value).__name__}({attrs})"
+    return repr(value)
+
+
+def load_all(make_reader):
+    areas = []
+    for filename in AREA_FILES:
+        with open(filename) as fp:
+            areas.append(Area.load_from_file(make_reader(fp)))
+    return areas
+
+
+def time_loads(make_reader):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        load_all(make_reader)
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    legacy = describe(load_all(LegacyReader))
+    lexer = describe(load_all(AreaLexer.from_file))
+    if legacy != lexer:
+        raise SystemExit("the loaders produced different areas!")
+
+    legacy_ms = time_loads(LegacyReader)
+    lexer_ms = time_loads(AreaLexer.from_file)
+
+    print(f"loading {', '.join(AREA_FILES)}")
+    print(f"  fp.read(1) helpers: {legacy_ms:7.2f} ms")
+    print(f"  AreaLexer:          {lexer_ms:7.2f} ms")
+    print(f"  speedup:            {legacy_ms / lexer_ms:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
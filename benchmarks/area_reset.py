@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Compares the cost of resetting every area in the world with the
+compiled reset plans against the old reset, which went through the resets
+as loaded on every run, converting their values and printing a line for
+each. The old reset is kept here for comparison, and the worlds each one
+builds are checked to be identical.
+
+Two costs are measured: the first reset of a freshly loaded world, which
+spawns everything, and resets of a world which is already full, as happens
+on every later reset. Output and logging go to /dev/null for both.
+
+Run from the repo root with: python -m benchmarks.area_reset
+"""
+import contextlib
+import logging
+import os
+import time
+
+from poff_mud.area import ResetAction
+from poff_mud.character import EquipmentSlot
+from poff_mud.gamestate import GameState
+from poff_mud.room import DoorState, code_to_direction
+from poff_mud.spawn_pool import SpawnPool, SpawnPoolType
+from poff_mud.world import load_world
+
+WORLDS = 20
+RESETS = 200
+
+
+def legacy_reset(area, gsp):
+    # Area.reset as it was before the resets were compiled.
+    # Global limits are checked against everything spawned so far in the
+    # whole world, wherever it is, see gsp.instances
+
+    # Note: reset doesn't necessarily imply
+    # resetting a zone from the ground up.
+    # New things are basically spawned in if
+    # needed or conditions are met.
+
+    # Apply resets
+    last = None
+    for reset in area.resets:
+        print(f"Attempting reset: {reset['action']} with values {reset['values']}")
+
+        values = reset["values"]
+        if reset["action"] == ResetAction.MOB_SPAWN:
+            mob_vnum = values[1]
+            room_vnum = values[3]
+
+            rm = area.rooms[room_vnum]
+            matching_mobs = [m for m in rm.mobs if m.vnum == mob_vnum]
+
+            local_count = len(matching_mobs)
+            global_count = gsp.instances.count(SpawnPoolType.MOB, mob_vnum)
+
+            if local_count >= int(values[4]) or global_count >= int(values[2]):
+                last = None
+                continue
+
+            if gsp.contains(SpawnPoolType.MOB, mob_vnum):
+                # We're good to spawn the mob
+                mob = gsp.spawn(SpawnPoolType.MOB, mob_vnum, rm)
+                rm.mobs.append(mob)
+                last = mob
+            else:
+                print(f"WARNING: Mob {mob_vnum} not in global spawn pool")
+        elif reset["action"] == ResetAction.OBJ_SPAWN:
+            obj_vnum = values[1]
+            room_vnum = values[3]
+
+            if room_vnum not in area.rooms:
+                # TODO: midgaard.are tries to do this. Idk why.
+                print("WARNING: Trying to spawn an object in a room not in the area")
+                continue
+
+            # Don't spawn object if there's an object there already
+            rm = area.rooms[room_vnum]
+
+            matching_objs = [o for o in rm.objects if o.vnum == obj_vnum]
+            if len(matching_objs) > 0:
+                last = None
+                continue
+
+            # TODO: spec says to not spawn object if players
+            # are present but I kinda disagree.. not sure
+            # the reasoning but there probably is one
+            if len(rm.players) > 0:
+                last = None
+                continue
+
+            if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum, rm)
+                rm.objects.append(obj)
+                last = obj
+            else:
+                print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+        elif reset["action"] == ResetAction.OBJ_IN_OBJ:
+            obj_vnum = values[1]
+            global_limit = int(values[2])
+            obj_to_vnum = values[3]
+            local_limit = int(values[4])
+
+            # Global limit is arg 2
+            if gsp.instances.count(SpawnPoolType.OBJ, obj_vnum) >= global_limit:
+                continue
+
+            # I'm not entirely sure this is the correct behavior
+            # but the problem is that VNUM doesn't necessarily
+            # correspond to an instanced version so we have to rely
+            # on last pointer to figure out where to put the item
+
+            # But there's a new problem... sometimes an object might
+            # not get spawned in because it already exists. Fuck!
+
+            # Ok... Here's what I'm gonna do:
+            # If the last.vnum matches the expected vnum, give that
+            # object the target object. If it doesn't, put it in the
+            # newest one in the world like ROM's get_obj_type does
+            if type(last).__name__ == "Object" and obj_to_vnum == last.vnum:
+                # Local limit in container is 4
+                local_count = len([o for o in last.contains if o.vnum == obj_vnum])
+                if local_count >= local_limit:
+                    continue
+
+                if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    # We can give the object to this last object
+                    obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum, last)
+                    last.contains.append(obj)
+                else:
+                    print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+            else:
+                # Look up object
+                target_object = gsp.instances.newest(SpawnPoolType.OBJ, obj_to_vnum)
+
+                # Couldn't find the object.. give up
+                if target_object is None:
+                    continue
+
+                # Local limit in container is 4
+                local_count = len(
+                    [o for o in target_object.contains if o.vnum == obj_vnum]
+                )
+                if local_count >= local_limit:
+                    continue
+
+                if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum, target_object)
+                    target_object.contains.append(obj)
+                else:
+                    print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+        elif reset["action"] == ResetAction.GIVE_OBJ:
+            obj_vnum = values[1]
+
+            if last and type(last).__name__ == "Mobile":
+                if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum, last)
+                    last.inventory.append(obj)
+                else:
+                    print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+            else:
+                # TODO: There's a case here where the mob already existed
+                # so it didn't get reset and therefore won't get an item
+                # reset to it (since it wasn't newly created). I have to figure
+                # out if this is the intended behavior or if I should look up
+                # the mob in the area and give it the item if it doesn't exist
+                print("Skipping as the last thing loaded wasn't a mob..")
+
+                last = None
+
+        elif reset["action"] == ResetAction.EQUIP_OBJ:
+            obj_vnum = values[1]
+            wear_slot = EquipmentSlot(int(values[3]))
+
+            if last and type(last).__name__ == "Mobile":
+                if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum, last)
+                    last.equip(obj, wear_slot)
+                else:
+                    print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+            else:
+                # TODO: There's a case here where the mob already existed
+                # so it didn't get reset and therefore won't get an item
+                # reset to it (since it wasn't newly created). I have to figure
+                # out if this is the intended behavior or if I should look up
+                # the mob in the area and give it the item if it doesn't exist
+                print("Skipping as the last thing loaded wasn't a mob..")
+
+                last = None
+        elif reset["action"] == ResetAction.SET_DOOR:
+            room_vnum = values[1]
+            direction = code_to_direction[int(values[2])]
+            door_state = DoorState(int(values[3]))
+
+            rm = area.rooms[room_vnum]
+            rm.exits[direction]["door_state"] = door_state
+
+
+def compiled_reset(area, gsp):
+    area.reset(gsp)
+
+
+def describe(obj):
+    # a text version of an object and everything in it
+    contents = ",".join(describe(o) for o in obj.contains)
+    return f"{obj.vnum}({contents})"
+
+
+def describe_world(gs):
+    # a text version of everything spawned in the world, room by room
+    lines = []
+    for vnum, room in gs.rooms.items():
+        mobs = []
+        for m in room.mobs:
+            inventory = ",".join(describe(o) for o in m.inventory)
+            equipment = ",".join(
+                f"{slot.name}={describe(o)}" for slot, o in m.equipment.items() if o
+            )
+            mobs.append(f"{m.vnum}[{inventory}|{equipment}]")
+        objects = ",".join(describe(o) for o in room.objects)
+        doors = {d: e["door_state"] for d, e in room.exits.items()}
+        lines.append(f"{vnum} {mobs} {objects} {doors}")
+    return "\n".join(lines)
+
+
+def new_world():
+    gsp = SpawnPool()
+    gs = GameState()
+    areas = load_world("areas/area.lst", gsp, gs)
+    return gsp, gs, areas
+
+
+def time_resets(reset):
+    # returns ms for the first reset of a world, and for each reset after
+    first = 0
+    for _ in range(WORLDS):
+        gsp, gs, areas = new_world()
+        start = time.perf_counter()
+        for area in areas:
+            reset(area, gsp)
+        first += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(RESETS):
+        for area in areas:
+            reset(area, gsp)
+    later = time.perf_counter() - start
+
+    return first / WORLDS * 1000, later / RESETS * 1000, describe_world(gs)
+
+
+def main():
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        # and the warnings logged when compiling the resets
+        logging.basicConfig(stream=devnull, force=True)
+
+        legacy_first, legacy_later, legacy_world = time_resets(legacy_reset)
+        first, later, world = time_resets(compiled_reset)
+
+    if legacy_world != world:
+        raise SystemExit("the resets built different worlds!")
+
+    print("resetting every area in areas/area.lst")
+    print(f"{'':>16} {'first ms':>9} {'later ms':>9}")
+    print(f"{'old reset':>16} {legacy_first:9.3f} {legacy_later:9.3f}")
+    print(f"{'compiled plan':>16} {first:9.3f} {later:9.3f}")
+    print(f"{'speedup':>16} {legacy_first / first:8.2f}x {legacy_later / later:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
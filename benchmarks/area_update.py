@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Compares how long ticks take when every area comes due to reset at the
+same moment and they're all reset in that tick, as a single world wide
+area pulse would do, against AreaUpdater spreading them across ticks under
+its per-tick budget.
+
+Each run loads a fresh world, compiles its resets as the server does at
+startup, and queues every area, so each reset spawns all of the area's
+mobs and objects, as when players have cleared it out. The longest tick,
+the number of ticks taken and the slowest areas are reported.
+
+Run from the repo root with: python -m benchmarks.area_update
+"""
+import argparse
+import logging
+import time
+
+from poff_mud.area_update import MAX_AGE, AreaUpdater
+from poff_mud.gamestate import GameState
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+
+RUNS = 20
+
+
+def run_ticks(budget_ms):
+    # returns the duration of each tick it took to reset a whole world, and
+    # the updater that did it
+    gsp = SpawnPool()
+    gs = GameState()
+    areas = load_world("areas/area.lst", gsp, gs, use_cache=True)
+    updater = AreaUpdater(areas, gsp, gs, budget_ms=budget_ms)
+
+    # the server compiles the resets in its first reset, at startup
+    for area in areas:
+        area.reset_plan = area.compile_resets(gsp)
+
+    # one pulse short of having to reset, whoever is there
+    for state in updater.states.values():
+        state.age = MAX_AGE - 1
+    for area in areas:
+        updater.age_area(area)
+
+    ticks = []
+    while updater.queued:
+        start = time.perf_counter()
+        updater.run()
+        ticks.append((time.perf_counter() - start) * 1000)
+
+    return ticks, updater
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=0.5)
+    args = parser.parse_args()
+
+    # leave out the warnings from compiling the resets
+    logging.disable(logging.WARNING)
+
+    durations = {}
+    for name, budget_ms in [
+        ("all at once", float("inf")),
+        (f"budget {args.budget_ms} ms", args.budget_ms),
+    ]:
+        worst = []
+        tick_counts = []
+        for _ in range(RUNS):
+            ticks, updater = run_ticks(budget_ms)
+            worst.append(max(ticks))
+            tick_counts.append(len(ticks))
+            for filename, ms in updater.reset_durations().items():
+                durations.setdefault(filename, []).append(ms)
+
+        worst.sort()
+        print(
+            f"{name:>18}: {sum(tick_counts) / RUNS:5.1f} ticks,"
+            f" longest tick median {worst[RUNS // 2]:.3f} ms"
+            f" max {worst[-1]:.3f} ms"
+        )
+
+    print("slowest areas, median ms per reset:")
+    medians = {filename: sorted(ms)[len(ms) // 2] for filename, ms in durations.items()}
+    for filename, ms in sorted(medians.items(), key=lambda m: -m[1])[:5]:
+        print(f"  {filename:>20} {ms:.3f}")
+
+
+if __name__ == "__main__":
+    main()
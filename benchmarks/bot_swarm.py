@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""Load generator for the telnet server.
+
+Starts simplemud.py, connects a swarm of simulated players to it, and has
+them log in and wander around: walking through random exits, looking and
+talking. At the end it reports command round-trip latency percentiles,
+the server's tick durations, and the server's CPU use and memory.
+
+Each action a bot takes is sent together with an unknown 'ping' command,
+and the round trip is timed until the server's "Unknown command" reply to
+the ping arrives. Both lines are handled in the same tick, so this is the
+latency of the action itself.
+
+Linux only, as server CPU and memory are read from /proc.
+
+Run from the repo root with, e.g.:
+    python -m benchmarks.bot_swarm --bots 500 --duration 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+import zlib
+
+IAC, WILL, DO, SB, SE = 255, 251, 253, 250, 240
+COMPRESS2 = 86
+
+TELNET_COMMAND_RE = re.compile(
+    rb"\xff(?:[\xfb-\xfe].|\xfa.*?\xff\xf0|[^\xfa-\xfe])", re.DOTALL
+)
+EXITS_RE = re.compile(r"\[Exits: ([a-z, ]*)\]")
+
+SAYINGS = ["hello", "anyone around?", "nice weather", "where is the temple?"]
+
+
+class Bot:
+    def __init__(self, number, args, latencies):
+        self.name = f"bot{number}"
+        self.args = args
+        self.latencies = latencies
+        self.reader = None
+        self.writer = None
+        self.text = ""
+        self.raw = b""
+        self.decompressor = None
+        self.exits = []
+        self.pings = 0
+
+    async def connect(self, deadline):
+        # the server may be slow to accept everyone, so keep trying until the
+        # ramp up deadline. When the server's listen backlog is full the
+        # kernel can leave us with a connection the server never accepts, so
+        # we also retry if the greeting doesn't arrive
+        while True:
+            try:
+                self.reader, self.writer = await asyncio.open_connection(
+                    self.args.host, self.args.port
+                )
+                if self.args.mccp:
+                    self.writer.write(bytes([IAC, DO, COMPRESS2]))
+                await asyncio.wait_for(self.read_until("What is your name?"), 5)
+                return
+            except (OSError, asyncio.TimeoutError):
+                if self.writer is not None:
+                    self.writer.close()
+                    self.writer = None
+                    self.text = ""
+                    self.raw = b""
+                    self.decompressor = None
+                if time.monotonic() > deadline:
+                    raise
+                await asyncio.sleep(0.1)
+
+    async def read_until(self, marker):
+        while True:
+            index = self.text.find(marker)
+            if index != -1:
+                found = self.text[: index + len(marker)]
+                self.text = self.text[index + len(marker) :]
+                return found
+
+            data = await self.reader.read(65536)
+            if not data:
+                raise ConnectionError("server closed the connection")
+            self.receive(data)
+
+    def receive(self, data):
+        if self.decompressor is not None:
+            data = self.decompressor.decompress(data)
+        else:
+            # the server offers compression straight after connecting
+            self.raw += data
+            held_back = b""
+            if self.args.mccp:
+                start = self.raw.find(bytes([IAC, SB, COMPRESS2, IAC, SE]))
+                if start != -1:
+                    compressed = self.raw[start + 5 :]
+                    self.raw = self.raw[:start]
+                    self.decompressor = zlib.decompressobj()
+                    self.raw += self.decompressor.decompress(compressed)
+                else:
+                    # the start of compression might be split across reads
+                    held_back = self.raw[-4:]
+                    self.raw = self.raw[:-4]
+            data, self.raw = self.raw, held_back
+
+        data = TELNET_COMMAND_RE.sub(b"", data)
+        self.text += data.decode("latin1")
+
+    async def act(self, command):
+        self.pings += 1
+        marker = f"Unknown command 'ping{self.pings}'"
+
+        start = time.perf_counter()
+        self.writer.write(f"{command}\r\nping{self.pings}\r\n".encode("latin1"))
+        reply = await asyncio.wait_for(self.read_until(marker), self.args.reply_timeout)
+        self.latencies.append(time.perf_counter() - start)
+
+        self.remember_exits(reply)
+
+    def remember_exits(self, reply):
+        match = EXITS_RE.search(reply)
+        if match:
+            self.exits = [e for e in match.group(1).split(", ") if e]
+
+    async def run(self, ramp_deadline, stop_time):
+        await self.connect(ramp_deadline)
+
+        self.writer.write(f"{self.name}\r\n".encode("latin1"))
+        await asyncio.wait_for(self.read_until("[Exits:"), self.args.reply_timeout)
+        self.remember_exits("[Exits:" + await self.read_until("]"))
+
+        while time.monotonic() < stop_time:
+            await asyncio.sleep(random.uniform(0, self.args.think * 2))
+
+            roll = random.random()
+            if roll < 0.5 and self.exits:
+                await self.act(random.choice(self.exits))
+            elif roll < 0.8:
+                await self.act("look")
+            else:
+                await self.act(f"say {random.choice(SAYINGS)}")
+
+        self.writer.close()
+
+
+def read_proc_stats(pid):
+    # returns (cpu seconds used, resident memory in KB) for the process
+    with open(f"/proc/{pid}/stat") as fp:
+        fields = fp.read().rsplit(")", 1)[1].split()
+    cpu_seconds = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    rss_kb = 0
+    with open(f"/proc/{pid}/status") as fp:
+        for line in fp:
+            if line.startswith("VmRSS:"):
+                rss_kb = int(line.split()[1])
+
+    return cpu_seconds, rss_kb
+
+
+def start_server(args):
+    command = [sys.executable, "simplemud.py", "--stats"]
+    if args.sync:
+        command.append("--sync")
+    if args.mccp:
+        command.append("--mccp")
+
+    server = subprocess.Popen(
+        command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+
+    # collect the tick and compression stats lines the server prints while we
+    # run
+    stats_lines = []
+
+    def read_output():
+        for line in server.stdout:
+            if line.startswith(("STATS", "MCCP_STATS")):
+                stats_lines.append(line)
+
+    threading.Thread(target=read_output, daemon=True).start()
+    return server, stats_lines
+
+
+def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port)).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server didn't start listening on {host}:{port}")
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[
+        min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    ]
+
+
+async def run_swarm(args, latencies):
+    bots = [Bot(i, args, latencies) for i in range(args.bots)]
+
+    ramp_start = time.monotonic()
+    ramp_deadline = ramp_start + args.ramp_timeout
+    stop_time = ramp_start + args.duration
+
+    results = await asyncio.gather(
+        *[b.run(ramp_deadline, stop_time) for b in bots], return_exceptions=True
+    )
+    return [r for r in results if isinstance(r, Exception)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--bots", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument(
+        "--think", type=float, default=1.0, help="mean seconds between actions"
+    )
+    parser.add_argument("--ramp-timeout", type=float, default=60)
+    parser.add_argument(
+        "--reply-timeout",
+        type=float,
+        default=30,
+        help="seconds to wait for a reply before giving up on a bot",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1234)
+    parser.add_argument("--sync", action="store_true", help="use the polling server")
+    parser.add_argument("--mccp", action="store_true", help="accept compression")
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="use a server that's already running, skipping server stats",
+    )
+    args = parser.parse_args()
+
+    server = None
+    stats_lines = []
+    if not args.no_server:
+        server, stats_lines = start_server(args)
+        wait_for_port(args.host, args.port)
+        cpu_before, _ = read_proc_stats(server.pid)
+
+    latencies = []
+    wall_start = time.monotonic()
+    try:
+        errors = asyncio.run(run_swarm(args, latencies))
+        wall = time.monotonic() - wall_start
+
+        if server is not None:
+            cpu_after, rss_kb = read_proc_stats(server.pid)
+    finally:
+        if server is not None:
+            server.kill()
+            server.wait()
+
+    print(f"bots: {args.bots}  duration: {wall:.1f}s  errors: {len(errors)}")
+    for e in errors[:5]:
+        print(f"  {type(e).__name__}: {e}")
+
+    if latencies:
+        latencies.sort()
+        print(
+            f"commands: {len(latencies)} ({len(latencies) / wall:.0f}/s)  latency ms:"
+            f" p50={percentile(latencies, 0.5) * 1000:.1f}"
+            f" p90={percentile(latencies, 0.9) * 1000:.1f}"
+            f" p99={percentile(latencies, 0.99) * 1000:.1f}"
+            f" max={latencies[-1] * 1000:.1f}"
+        )
+
+    if server is not None:
+        print(
+            f"server cpu: {(cpu_after - cpu_before) / wall * 100:.1f}%"
+            f"  rss: {rss_kb / 1024:.1f} MB"
+        )
+        for line in stats_lines:
+            print(f"server {line.strip()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Compares MudServer's telnet input parser against the old parser, which
+walked the received data one character at a time.
+
+The old parser only kept the last line of each read, so the line counts
+differ for pasted commands. For tiny reads both parsers are dominated by
+call overhead, and connection-time negotiation is a little slower than
+before, but the cost no longer grows with the square of the line length.
+
+Run from the repo root with: python -m benchmarks.input_parser
+"""
+import time
+
+from mudserver import MudServer
+
+IAC, SB, SE, WILL, WONT, DO, DONT = 255, 250, 240, 251, 252, 253, 254
+
+
+class LegacyClient:
+    buffer = ""
+
+
+def legacy_process_sent_data(client, data):
+    # the parser as it was before, kept here for comparison. It only returns
+    # the last complete line in the data
+    message = None
+    state = 1
+    for c in data:
+        if state == 1:
+            if ord(c) == IAC:
+                state = 2
+            elif c == "\n":
+                message = client.buffer
+                client.buffer = ""
+            elif c == "\x08":
+                client.buffer = client.buffer[:-1]
+            else:
+                client.buffer += c
+        elif state == 2:
+            if ord(c) == SB:
+                state = 3
+            elif ord(c) in (WILL, WONT, DO, DONT):
+                state = 2
+            else:
+                state = 1
+        elif state == 3:
+            if ord(c) == SE:
+                state = 1
+    return message
+
+
+def chunks(data, size=4096):
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+WORKLOADS = {
+    "single command": [b"look\r\n"],
+    "pasted commands": chunks(b"north\r\nlook\r\nsay hello there\r\n" * 150),
+    "64KB line": chunks(b"say " + b"a" * 65536 + b"\r\n"),
+    "negotiation": chunks(
+        bytes([IAC, DO, 24, IAC, WILL, 31, IAC, SB, 24, 0])
+        + b"xterm"
+        + bytes([IAC, SE])
+        + b"look\r\n"
+    )
+    * 200,
+}
+
+
+def time_parser(fn, packets, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(packets)
+    return (time.perf_counter() - start) / repeat * 1000000
+
+
+def main():
+    mud = MudServer.__new__(MudServer)
+
+    # every workload ends on a complete line, so the clients can be reused
+    # between runs without anything being left over in their buffers
+    new_client = MudServer._Client(0, None, "", bytearray(), 0)
+    legacy_client = LegacyClient()
+
+    def run_new(packets):
+        cl = new_client
+        lines = 0
+        for p in packets:
+            lines += len(mud._process_sent_data(cl, p))
+        return lines
+
+    def run_legacy(packets):
+        cl = legacy_client
+        lines = 0
+        for p in packets:
+            if legacy_process_sent_data(cl, p.decode("latin1")) is not None:
+                lines += 1
+        return lines
+
+    print(
+        f"{'workload':>16} {'old us':>10} {'new us':>10} {'old lines':>10} {'new lines':>10}"
+    )
+    for name, packets in WORKLOADS.items():
+        repeat = max(1, 2000 // len(packets))
+        old_us = time_parser(run_legacy, packets, repeat)
+        new_us = time_parser(run_new, packets, repeat)
+        print(
+            f"{name:>16} {old_us:>10.1f} {new_us:>10.1f}"
+            f" {run_legacy(packets):>10} {run_new(packets):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Reports the memory each area takes with and without the loaders
+interning their strings and keyword tuples, measured with tracemalloc. Memory
+is measured once the area is loaded and again after its first reset has
+spawned its mobs and objects.
+
+Run from the repo root with: python -m benchmarks.interning
+"""
+import tracemalloc
+
+from poff_mud import interning
+from poff_mud.area import Area
+from poff_mud.spawn_pool import SpawnPool
+
+AREA_FILES = ["areas/school.are", "areas/midgaard.are"]
+
+
+def measure(filename):
+    # returns the KB allocated for the loaded area, and for the area after
+    # its first reset
+    gsp = SpawnPool()
+
+    tracemalloc.start()
+    with open(filename) as fp:
+        area = Area.load_from_file(fp, gsp=gsp)
+    loaded_kb = tracemalloc.get_traced_memory()[0] / 1024
+
+    area.reset(gsp)
+    reset_kb = tracemalloc.get_traced_memory()[0] / 1024
+    tracemalloc.stop()
+
+    return loaded_kb, reset_kb
+
+
+def main():
+    results = {}
+    # measure without interning first, so nothing has been interned yet
+    for enabled in [False, True]:
+        interning.enabled = enabled
+        for filename in AREA_FILES:
+            results[filename, enabled] = measure(filename)
+
+    print(f"{'':>20} {'--- loaded KB ---':>26} {'--- after reset KB ---':>26}")
+    print(f"{'area':>20}" + f" {'plain':>8} {'interned':>8} {'saved':>8}" * 2)
+    for filename in AREA_FILES:
+        plain = results[filename, False]
+        interned = results[filename, True]
+        columns = "".join(
+            f" {p:8.0f} {i:8.0f} {p - i:8.0f}" for p, i in zip(plain, interned)
+        )
+        print(f"{filename:>20}{columns}")
+
+
+if __name__ == "__main__":
+    main()
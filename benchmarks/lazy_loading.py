@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Compares loading the world fully against loading it lazily, where rooms,
+mobs and objects are only parsed when first used. Reports the time and the
+memory allocated for loading, and again after the first area reset, which
+spawns mobs and objects into the rooms named by the resets.
+
+Run from the repo root with: python -m benchmarks.lazy_loading
+"""
+import time
+import tracemalloc
+
+from poff_mud.gamestate import GameState
+from poff_mud.lazy_records import LazyRecords
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+
+AREA_LIST = "areas/area.lst"
+
+
+def count_loaded(areas):
+    loaded = total = 0
+    for area in areas:
+        for records in [area.rooms, area.mobs, area.objects]:
+            total += len(records)
+            if isinstance(records, LazyRecords):
+                loaded += sum(1 for vnum in records if records.is_loaded(vnum))
+            else:
+                loaded += len(records)
+    return loaded, total
+
+
+def measure(name, **options):
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    gsp = SpawnPool()
+    gs = GameState()
+    areas = load_world(AREA_LIST, gsp, gs, max_workers=1, **options)
+
+    load_ms = (time.perf_counter() - start) * 1000
+    load_kb = tracemalloc.get_traced_memory()[0] / 1024
+    loaded, total = count_loaded(areas)
+
+    for area in areas:
+        area.reset(gsp)
+
+    reset_ms = (time.perf_counter() - start) * 1000
+    reset_kb = tracemalloc.get_traced_memory()[0] / 1024
+    reset_loaded, _ = count_loaded(areas)
+    tracemalloc.stop()
+
+    print(
+        f"{name:>8} {load_ms:8.2f} {load_kb:9.0f} {loaded:>5}/{total}"
+        f" {reset_ms:8.2f} {reset_kb:9.0f} {reset_loaded:>5}/{total}"
+    )
+
+
+def main():
+    print(f"{'':>8} {'--- loaded ---':>30} {'--- after reset ---':>30}")
+    print(
+        f"{'':>8} {'ms':>8} {'KB':>9} {'parsed':>11}"
+        f" {'ms':>8} {'KB':>9} {'parsed':>11}"
+    )
+    measure("full", use_cache=False)
+    measure("cached", use_cache=True)
+    measure("lazy", lazy=True)
+
+
+if __name__ == "__main__":
+    main()
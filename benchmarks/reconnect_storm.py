@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Measures how long a MudServer takes to admit a crowd of players who all
+connect at once, as happens when everybody reconnects after a restart.
+
+The server runs in its own process, ticking every 0.2 seconds like
+simplemud.py and greeting each new player. All the clients connect at the
+same moment and each one counts as admitted when its greeting arrives.
+
+This is run once with the old behaviour, a backlog of 1 and one accept per
+update, and once with the server's defaults.
+
+Run from the repo root with: python -m benchmarks.reconnect_storm
+"""
+import argparse
+import asyncio
+import multiprocessing
+import resource
+import socket
+import time
+
+from mudserver import MudServer, NewPlayerEvent
+
+TICK = 0.2
+
+CONFIGS = [
+    ("backlog 1, 1 accept/update", {"backlog": 1, "max_accepts_per_update": 1}),
+    ("defaults", {}),
+]
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def serve(port, options, needed_fds):
+    raise_fd_limit(needed_fds)
+    mud = MudServer(address="127.0.0.1", port=port, **options)
+    while True:
+        time.sleep(TICK)
+        mud.update()
+        for event in mud.drain_events():
+            if type(event) is NewPlayerEvent:
+                mud.send_message(event.id, "Welcome!")
+        mud.flush()
+
+
+def wait_for_port(port, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port)).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server didn't start listening on port {port}")
+
+
+async def connect(port, start, timeout, writers):
+    # returns the seconds from the start of the storm until the greeting
+    # arrived, or None if the client wasn't admitted in time
+    try:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection("127.0.0.1", port), timeout
+        )
+        writers.append(writer)
+        remaining = timeout - (time.perf_counter() - start)
+        if not await asyncio.wait_for(reader.read(1), max(remaining, 0)):
+            return None
+    except (OSError, asyncio.TimeoutError):
+        return None
+    return time.perf_counter() - start
+
+
+async def storm(port, clients, timeout):
+    writers = []
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *[connect(port, start, timeout, writers) for _ in range(clients)]
+    )
+    for writer in writers:
+        writer.close()
+    return sorted(r for r in results if r is not None)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[
+        min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument(
+        "--timeout", type=float, default=30, help="seconds before giving up"
+    )
+    parser.add_argument("--port", type=int, default=4321)
+    args = parser.parse_args()
+
+    needed_fds = args.clients * 2 + 64
+    raise_fd_limit(needed_fds)
+
+    print(f"{'server':>28} {'admitted':>9} {'p50 s':>7} {'p99 s':>7} {'all s':>7}")
+    for name, options in CONFIGS:
+        server = multiprocessing.Process(
+            target=serve, args=(args.port, options, needed_fds), daemon=True
+        )
+        server.start()
+        try:
+            wait_for_port(args.port)
+            # let the server accept and forget the connection used to check
+            # it was listening
+            time.sleep(TICK * 2)
+
+            admitted = asyncio.run(storm(args.port, args.clients, args.timeout))
+        finally:
+            server.kill()
+            server.join()
+
+        if admitted:
+            everyone = (
+                f"{admitted[-1]:7.2f}" if len(admitted) == args.clients else "    n/a"
+            )
+            print(
+                f"{name:>28} {len(admitted):>9} {percentile(admitted, 0.5):7.2f}"
+                f" {percentile(admitted, 0.99):7.2f} {everyone}"
+            )
+        else:
+            print(f"{name:>28} {0:>9}     n/a     n/a     n/a")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Times resetting the world with logging enabled, writing the log to a
+stream which takes a while to accept each write, as a pipe to a busy log
+shipper does.
+
+With everything logged at debug level, the first reset of each world logs
+the warnings from compiling its resets and every reset logs a line per
+area. Three setups are compared:
+
+- written as they're logged, like the prints they replaced
+- the same with repeated warnings rate limited
+- setup_logging: rate limited and written by a background thread
+
+Run from the repo root with: python -m benchmarks.reset_logging
+"""
+import logging
+import time
+
+from poff_mud.area_update import AreaUpdater
+from poff_mud.gamestate import GameState
+from poff_mud.log import RateLimitFilter, setup_logging
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+
+WORLDS = 10
+RESETS = 20
+WRITE_DELAY = 0.0002
+
+
+class SlowStream:
+    def __init__(self):
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        time.sleep(WRITE_DELAY)
+
+    def flush(self):
+        pass
+
+
+def direct(stream, rate_limit):
+    handler = logging.StreamHandler(stream)
+    if rate_limit:
+        handler.addFilter(RateLimitFilter())
+
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    root.addHandler(handler)
+    logging.getLogger("poff_mud").setLevel(logging.DEBUG)
+
+
+def time_resets():
+    # median ms for the first reset of a fresh world, and for later ones
+    first = []
+    later = []
+    for _ in range(WORLDS):
+        gsp = SpawnPool()
+        gs = GameState()
+        updater = AreaUpdater(load_world("areas/area.lst", gsp, gs), gsp, gs)
+
+        start = time.perf_counter()
+        updater.reset_all()
+        first.append((time.perf_counter() - start) * 1000)
+
+        for _ in range(RESETS):
+            start = time.perf_counter()
+            updater.reset_all()
+            later.append((time.perf_counter() - start) * 1000)
+
+    first.sort()
+    later.sort()
+    return first[len(first) // 2], later[len(later) // 2]
+
+
+def main():
+    print(f"resetting the world, writes take {WRITE_DELAY * 1000} ms")
+    print(f"{'':>24} {'first ms':>9} {'later ms':>9} {'writes':>7}")
+    for name in ["written directly", "directly, rate limited", "setup_logging"]:
+        stream = SlowStream()
+        listener = None
+        if name == "setup_logging":
+            listener = setup_logging(level=logging.DEBUG, stream=stream)
+        else:
+            direct(stream, rate_limit=name != "written directly")
+
+        first_ms, later_ms = time_resets()
+
+        # let the listener catch up before counting what was written
+        if listener is not None:
+            listener.stop()
+        print(f"{name:>24} {first_ms:9.3f} {later_ms:9.3f} {stream.writes:7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Compares finding and counting the mobs and objects in a room using the
+room's indexes against going through them in a list, as look and the
+resets used to.
+
+Rooms are filled with 10 to 1000 mobs and objects spawned from the loaded
+world. Each is timed looking up the keyword of the last thing added, which
+a scan has to go all the way through the room for, and counting the
+instances of its vnum. Adding everything to the room is timed too, as the
+indexes make that slower.
+
+Run from the repo root with: python -m benchmarks.room_contents
+"""
+import time
+
+from poff_mud.gamestate import GameState
+from poff_mud.room import Room
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+
+SIZES = [10, 100, 1000]
+LOOKUPS = 2000
+
+
+def scan_mob(mobs, keyword):
+    # LookCommand as it was
+    for m in mobs:
+        for kw in m.keywords:
+            if keyword == kw:
+                return m
+
+
+def scan_object(objects, keyword):
+    for o in objects:
+        for kw in o.extra_description:
+            if keyword == kw:
+                return o
+
+
+def per_call_us(fn):
+    start = time.perf_counter()
+    for _ in range(LOOKUPS):
+        fn()
+    return (time.perf_counter() - start) / LOOKUPS * 1e6
+
+
+def fill(contents, instances):
+    # microseconds per instance to add them all
+    start = time.perf_counter()
+    for instance in instances:
+        contents.append(instance)
+    return (time.perf_counter() - start) / len(instances) * 1e6
+
+
+def unique_keyword(prototypes, keywords_of):
+    # a prototype with a keyword none of the others have, and that keyword
+    for p in reversed(prototypes):
+        others = {kw for o in prototypes if o is not p for kw in keywords_of(o)}
+        for keyword in keywords_of(p):
+            if keyword not in others:
+                return p, keyword
+
+
+def main():
+    gsp = SpawnPool()
+    areas = load_world("areas/area.lst", gsp, GameState())
+
+    cases = [
+        (
+            "mobs",
+            [m for a in areas for m in a.mobs.values()],
+            lambda m: m.keywords,
+            scan_mob,
+        ),
+        (
+            "objects",
+            [o for a in areas for o in a.objects.values() if o.extra_description],
+            lambda o: o.extra_description,
+            scan_object,
+        ),
+    ]
+
+    print(f"{'':>12} {'':>10} {'list us':>8} {'indexed us':>11}")
+    for kind, prototypes, keywords_of, scan in cases:
+        target, keyword = unique_keyword(prototypes, keywords_of)
+        others = [p for p in prototypes if p is not target]
+
+        for size in SIZES:
+            # the one to look for is added last
+            instances = [others[i % len(others)].spawn() for i in range(size - 1)]
+            instances.append(target.spawn())
+
+            listed = []
+            contents = getattr(Room(), kind)
+
+            for what, old, new in [
+                ("add", fill(listed, instances), fill(contents, instances)),
+                (
+                    "find",
+                    per_call_us(lambda: scan(listed, keyword)),
+                    per_call_us(lambda: contents.find(keyword)),
+                ),
+                (
+                    "count vnum",
+                    per_call_us(
+                        lambda: len([i for i in listed if i.vnum == target.vnum])
+                    ),
+                    per_call_us(lambda: contents.count_vnum(target.vnum)),
+                ),
+            ]:
+                name = f"{kind} {size}" if what == "add" else ""
+                print(f"{name:>12} {what:>10} {old:8.3f} {new:11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Compares the memory and attribute access speed of mobs, objects, rooms
+and affects using __slots__ against the same classes keeping their
+attributes in a __dict__, as they did before.
+
+The world is loaded and 10,000 of each kind of entity are made from it,
+both as full copies sharing the loaded attribute values and, for mobs and
+objects, as instances spawned from their prototypes. The dict based
+classes are built from the slotted ones, with everything the same but the
+__slots__.
+
+Run from the repo root with: python -m benchmarks.slots
+"""
+import time
+import tracemalloc
+
+from poff_mud.gamestate import GameState
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+
+ENTITIES = 10_000
+READS = 20
+
+
+def without_slots(cls, made={}):
+    # the same class, and the same bases, with its attributes in a __dict__
+    if cls is object:
+        return object
+
+    if cls not in made:
+        slots = cls.__dict__.get("__slots__", ())
+        namespace = {
+            k: v for k, v in vars(cls).items() if k != "__slots__" and k not in slots
+        }
+        bases = tuple(without_slots(base) for base in cls.__bases__)
+        made[cls] = type(cls)(cls.__name__, bases, namespace)
+
+    return made[cls]
+
+
+def slot_names(cls):
+    return [n for c in cls.__mro__ for n in c.__dict__.get("__slots__", ())]
+
+
+def clone(entity, cls):
+    # a new 'cls' with the same attribute values as the loaded 'entity'
+    result = cls.__new__(cls)
+    for name in slot_names(type(entity)):
+        if name != "prototype":
+            setattr(result, name, getattr(entity, name))
+    return result
+
+
+def make(entities, make_one):
+    # returns ENTITIES things made from 'entities', and the bytes each took
+    tracemalloc.start()
+    made = [make_one(entities[i % len(entities)]) for i in range(ENTITIES)]
+    per_entity = tracemalloc.get_traced_memory()[0] / len(made)
+    tracemalloc.stop()
+
+    return made, per_entity
+
+
+def time_reads(entities, name):
+    # nanoseconds per read of the attribute 'name'
+    start = time.perf_counter()
+    for _ in range(READS):
+        for entity in entities:
+            getattr(entity, name)
+    return (time.perf_counter() - start) / (READS * len(entities)) * 1e9
+
+
+def main():
+    gsp = SpawnPool()
+    areas = load_world("areas/area.lst", gsp, GameState(), use_cache=False)
+
+    mobs = [m for a in areas for m in a.mobs.values()]
+    objects = [o for a in areas for o in a.objects.values()]
+    rooms = [r for a in areas for r in a.rooms.values()]
+    affects = [aff for o in objects for aff in o.affects]
+
+    # (what, prototypes, how to make one, attributes to read)
+    cases = [
+        ("mob", mobs, "copy", ["short_desc", "hp"]),
+        ("object", objects, "copy", ["short_desc"]),
+        ("room", rooms, "copy", ["exits"]),
+        ("affect", affects, "copy", ["modifier"]),
+        ("spawned mob", mobs, "spawn", ["inventory", "short_desc"]),
+        ("spawned obj", objects, "spawn", ["contains", "short_desc"]),
+    ]
+
+    print(f"{ENTITIES} of each, bytes per entity and ns per attribute read")
+    print(f"{'':>12} {'attribute':>11} {'dict B':>7} {'slots B':>8}", end="")
+    print(f" {'dict ns':>8} {'slots ns':>9}")
+    for what, prototypes, how, attributes in cases:
+        results = {}
+        for cls in [without_slots(type(prototypes[0])), type(prototypes[0])]:
+            if how == "spawn":
+                variants = [clone(p, cls) for p in prototypes]
+                made, per_entity = make(variants, lambda p: p.spawn())
+            else:
+                made, per_entity = make(prototypes, lambda p: clone(p, cls))
+            results[cls] = (per_entity, [time_reads(made, a) for a in attributes])
+
+        (dict_bytes, dict_ns), (slots_bytes, slots_ns) = results.values()
+        for i, attribute in enumerate(attributes):
+            sizes = f"{dict_bytes:7.0f} {slots_bytes:8.0f}" if i == 0 else " " * 16
+            print(
+                f"{what if i == 0 else '':>12} {attribute:>11} {sizes}"
+                f" {dict_ns[i]:8.1f} {slots_ns[i]:9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
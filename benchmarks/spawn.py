@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Compares spawning mobs and objects by deep copying their prototypes, as
+SpawnPool used to, against spawning instances which share their prototype.
+Reports spawns per second and the memory each spawned thing takes.
+
+Run from the repo root with: python -m benchmarks.spawn
+"""
+import copy
+import time
+import tracemalloc
+
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+from poff_mud.gamestate import GameState
+
+ROUNDS = 20
+
+
+def spawn_all(prototypes, spawn):
+    return [spawn(p) for _ in range(ROUNDS) for p in prototypes]
+
+
+def measure(prototypes, spawn):
+    start = time.perf_counter()
+    spawn_all(prototypes, spawn)
+    per_second = len(prototypes) * ROUNDS / (time.perf_counter() - start)
+
+    tracemalloc.start()
+    spawned = spawn_all(prototypes, spawn)
+    per_spawn = tracemalloc.get_traced_memory()[0] / len(spawned)
+    tracemalloc.stop()
+
+    return per_second, per_spawn
+
+
+def main():
+    gsp = SpawnPool()
+    areas = load_world("areas/area.lst", gsp, GameState(), use_cache=False)
+
+    groups = [
+        ("mobs", [m for a in areas for m in a.mobs.values()]),
+        ("objects", [o for a in areas for o in a.objects.values()]),
+    ]
+
+    print(f"{'':>8} {'':>9} {'spawns/s':>10} {'bytes each':>11}")
+    for name, prototypes in groups:
+        for method, spawn in [
+            ("deepcopy", copy.deepcopy),
+            ("instance", lambda p: p.spawn()),
+        ]:
+            per_second, per_spawn = measure(prototypes, spawn)
+            print(f"{name:>8} {method:>9} {per_second:10.0f} {per_spawn:11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Measures how long an idle MudServer.update() takes as the number of
+connected clients grows.
+
+For comparison it also times the old approach of calling select() once per
+connected client on every tick. Past roughly 500 connections the client file
+descriptors go over select()'s FD_SETSIZE limit and the old approach stops
+working entirely, which is reported as n/a.
+
+Run from the repo root with: python -m benchmarks.tick_cost
+"""
+import resource
+import select
+import socket
+import time
+
+from mudserver import MudServer
+
+CONNECTION_COUNTS = [1, 10, 100, 500, 1000]
+TICKS = 200
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+def legacy_poll(mud):
+    # What each tick used to cost: one select for the listen socket plus one
+    # for every client
+    select.select([mud._listen_socket], [], [], 0)
+    for cl in list(mud._clients.values()):
+        select.select([cl.socket], [], [], 0)
+
+
+def time_ticks(fn):
+    start = time.perf_counter()
+    for _ in range(TICKS):
+        fn()
+    return (time.perf_counter() - start) / TICKS * 1000000
+
+
+def main():
+    raise_fd_limit(max(CONNECTION_COUNTS) * 2 + 64)
+
+    mud = MudServer()
+    clients = []
+
+    print(f"{'clients':>8} {'update() us':>12} {'per-client select us':>21}")
+    try:
+        for count in CONNECTION_COUNTS:
+            # connect one at a time, letting the server accept each client
+            # before the next so the listen backlog never overflows
+            while len(clients) < count:
+                clients.append(socket.create_connection(("127.0.0.1", 1234)))
+                while len(mud._clients) < len(clients):
+                    mud.update()
+
+            update_us = time_ticks(mud.update)
+            try:
+                legacy_us = f"{time_ticks(lambda: legacy_poll(mud)):.1f}"
+            except ValueError:
+                legacy_us = "n/a"
+            print(f"{count:>8} {update_us:>12.1f} {legacy_us:>21}")
+    finally:
+        for c in clients:
+            c.close()
+        mud.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Compares TimerManager, which keeps its timers in a heap, against the old
+one, which kept them in a dict keyed by uuid4 and went through all of them
+on every run. The old one is kept here for comparison, with the fixes it
+got for repeating timers and for being changed while it runs.
+
+100,000 repeating timers are added with intervals between 1 and 600
+seconds, like mob AI, affects and object decay would have. Then the
+clock is moved on by a tick of 200 ms before each run, and the runs are
+timed. After that half of the timers are removed.
+
+A fake clock is used so no time is spent waiting.
+
+Run from the repo root with: python -m benchmarks.timers
+"""
+import random
+import time
+import uuid
+
+from poff_mud.timer import TimerManager
+
+TIMERS = 100_000
+TICKS = 100
+TICK_MS = 200
+
+
+class LegacyTimerManager:
+    def __init__(self, clock):
+        self.clock = clock
+        self._timers = {}
+
+    def add_timer(self, interval, callback, repeat=False):
+        timer_id = uuid.uuid4()
+        self._timers[timer_id] = {
+            "target_time": self.clock() + interval,
+            "interval": interval,
+            "repeat": repeat,
+            "callback": callback,
+        }
+        return timer_id
+
+    def remove_timer(self, timer_id):
+        del self._timers[timer_id]
+
+    def run(self):
+        current_time_ms = self.clock()
+
+        for timer_id, t in list(self._timers.items()):
+            if timer_id not in self._timers:
+                continue
+
+            if t["target_time"] <= current_time_ms:
+                t["callback"]()
+
+                if t["repeat"] is False:
+                    self._timers.pop(timer_id, None)
+                else:
+                    t["target_time"] = self.clock() + t["interval"]
+
+
+def measure(manager_class):
+    now = [0]
+    manager = manager_class(clock=lambda: now[0])
+    rng = random.Random(0)
+    fired = [0]
+
+    def callback():
+        fired[0] += 1
+
+    intervals = [rng.randint(1_000, 600_000) for _ in range(TIMERS)]
+
+    start = time.perf_counter()
+    ids = [manager.add_timer(interval, callback, repeat=True) for interval in intervals]
+    add_us = (time.perf_counter() - start) / TIMERS * 1e6
+
+    run_times = []
+    for _ in range(TICKS):
+        now[0] += TICK_MS
+        start = time.perf_counter()
+        manager.run()
+        run_times.append((time.perf_counter() - start) * 1000)
+
+    rng.shuffle(ids)
+    start = time.perf_counter()
+    for timer_id in ids[: TIMERS // 2]:
+        manager.remove_timer(timer_id)
+    remove_us = (time.perf_counter() - start) / (TIMERS // 2) * 1e6
+
+    # and a tick once they're gone
+    now[0] += TICK_MS
+    start = time.perf_counter()
+    manager.run()
+    after_remove_ms = (time.perf_counter() - start) * 1000
+
+    run_times.sort()
+    return {
+        "add us": add_us,
+        "run ms": sum(run_times) / len(run_times),
+        "run max ms": run_times[-1],
+        "remove us": remove_us,
+        "run after ms": after_remove_ms,
+        "fired": fired[0],
+    }
+
+
+def main():
+    print(f"{TIMERS} repeating timers, {TICKS} ticks of {TICK_MS} ms")
+    results = {
+        "dict scan": measure(LegacyTimerManager),
+        "heap": measure(TimerManager),
+    }
+
+    names = list(results)
+    print(f"{'':>14}" + "".join(f"{name:>12}" for name in names))
+    for key in results[names[0]]:
+        values = [results[name][key] for name in names]
+        print(
+            f"{key:>14}"
+            + "".join(f"{v:12}" if isinstance(v, int) else f"{v:12.3f}" for v in values)
+        )
+
+
+if __name__ == "__main__":
+    main()
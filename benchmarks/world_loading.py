@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Compares loading every area in an area list one after another against
+loading them in a pool of worker processes, with and without the area
+cache. The pool only helps with several cores and several areas.
+
+Run from the repo root with: python -m benchmarks.world_loading [area.lst]
+"""
+import os
+import sys
+import time
+
+from poff_mud.gamestate import GameState
+from poff_mud.spawn_pool import SpawnPool
+from poff_mud.world import load_world
+
+RUNS = 5
+
+
+def time_load(area_list, max_workers, use_cache):
+    start = time.perf_counter()
+    for _ in range(RUNS):
+        load_world(
+            area_list,
+            SpawnPool(),
+            GameState(),
+            max_workers=max_workers,
+            use_cache=use_cache,
+        )
+    return (time.perf_counter() - start) / RUNS * 1000
+
+
+def main():
+    area_list = sys.argv[1] if len(sys.argv) > 1 else "areas/area.lst"
+    cores = os.cpu_count() or 1
+
+    print(f"loading {area_list} with {cores} cores")
+    print(f"{'':>10} {'1 process ms':>13} {f'{cores} processes ms':>16}")
+    for use_cache in [False, True]:
+        serial_ms = time_load(area_list, 1, use_cache)
+        pool_ms = time_load(area_list, cores, use_cache)
+        label = "cached" if use_cache else "parsed"
+        print(f"{label:>10} {serial_ms:13.2f} {pool_ms:16.2f}")
+
+
+if __name__ == "__main__":
+    main()
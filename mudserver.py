@@ -8,10 +8,21 @@ author: Mark Frimston - mfrimston@gmail.com
 """
 
 
+import collections
+import heapq
 import socket
-import select
+import selectors
 import time
 import sys
+import zlib
+
+
+# The occurences the server reports to the game, see 'MudServer.drain_events'.
+# Each carries 'seq', its position in the order the events happened, and 'id',
+# the id number of the player it concerns
+NewPlayerEvent = collections.namedtuple("NewPlayerEvent", "seq id")
+PlayerLeftEvent = collections.namedtuple("PlayerLeftEvent", "seq id")
+CommandEvent = collections.namedtuple("CommandEvent", "seq id command params")
 
 
 class MudServer(object):
@@ -31,31 +42,42 @@ class MudServer(object):
     class _Client(object):
         """Holds information about a connected player"""
 
+        # the id number of this client
+        id = None
         # the socket object used to communicate with this client
         socket = None
         # the ip address of this client
         address = ""
         # holds data send from the client until a full message is received
-        buffer = ""
-        # the last time we checked if the client was still connected
-        lastcheck = 0
-
-        def __init__(self, socket, address, buffer, lastcheck):
+        buffer = None
+        # holds an incomplete Telnet command split across two reads
+        telnet_buffer = None
+        # the last time the client sent us anything
+        last_activity = 0
+        # holds encoded data waiting to be sent to the client
+        outbuf = None
+        # the selector events we're currently interested in for this client
+        mask = 0
+        # compresses everything we send once the client has agreed to MCCP2,
+        # otherwise None
+        compressor = None
+        # whether data has been compressed since the compressor was flushed
+        compress_pending = False
+        # bytes given to and taken from the compressor, and the time spent
+        # compressing them in seconds
+        compress_in = 0
+        compress_out = 0
+        compress_time = 0.0
+
+        def __init__(self, id, socket, address, buffer, last_activity):
+            self.id = id
             self.socket = socket
             self.address = address
             self.buffer = buffer
-            self.lastcheck = lastcheck
-
-    # Used to store different types of occurences
-    _EVENT_NEW_PLAYER = 1
-    _EVENT_PLAYER_LEFT = 2
-    _EVENT_COMMAND = 3
-
-    # Different states we can be in while reading data from client
-    # See _process_sent_data function
-    _READ_STATE_NORMAL = 1
-    _READ_STATE_COMMAND = 2
-    _READ_STATE_SUBNEG = 3
+            self.telnet_buffer = bytearray()
+            self.last_activity = last_activity
+            self.outbuf = bytearray()
+            self.mask = selectors.EVENT_READ
 
     # Command codes used by Telnet protocol
     # See _process_sent_data function
@@ -67,27 +89,128 @@ class MudServer(object):
     _TN_DONT = 254
     _TN_SUBNEGOTIATION_START = 250
     _TN_SUBNEGOTIATION_END = 240
+    # Telnet option code for version 2 of the MUD Client Compression Protocol
+    # See _handle_negotiation function
+    _TN_COMPRESS2 = 86
+
+    # byte strings used when searching received data
+    # See _process_sent_data function
+    _IAC_BYTES = bytes([_TN_INTERPRET_AS_COMMAND])
+    _SUBNEG_START_BYTES = bytes([_TN_INTERPRET_AS_COMMAND, _TN_SUBNEGOTIATION_START])
+    _SUBNEG_END_BYTES = bytes([_TN_INTERPRET_AS_COMMAND, _TN_SUBNEGOTIATION_END])
 
     # socket used to listen for new clients
     _listen_socket = None
+    # selector which tells us which of our sockets have data waiting
+    _selector = None
     # holds info on clients. Maps client id to _Client object
     _clients = {}
     # counter for assigning each client a new id
     _nextid = 0
-    # list of occurences waiting to be handled by the code
-    _events = []
-    # list of newly-added occurences
-    _new_events = []
-
-    def __init__(self):
+    # occurences waiting to be handled by the code. Maps each event type to
+    # a deque of events of that type, oldest first
+    _events = {}
+    # newly-added occurences, in the same form as '_events'
+    _new_events = {}
+    # sequence number given to the next event
+    _event_seq = 0
+    # once this many bytes are waiting to be sent to a client, we stop reading
+    # their commands until they catch up
+    _output_high_water = 0
+    # once this many bytes are waiting to be sent to a client, we give up on
+    # them and disconnect them
+    _output_limit = 0
+    # ids of clients with output queued since the last flush
+    _unflushed = None
+    # number of messages queued and number of 'send' calls made to deliver
+    # them, see 'get_output_stats'
+    _messages_queued = 0
+    _send_calls = 0
+    # seconds a client may go without sending anything before they're
+    # disconnected, or None to let them idle forever
+    _idle_timeout = None
+    # message sent to clients disconnected for being idle, or None
+    _idle_message = None
+    # TCP keepalive settings applied to every client socket
+    _keepalive = None
+    # heap of (deadline, client id) pairs, earliest deadline first. See
+    # _check_for_idle function
+    _idle_heap = None
+    # whether we offer MCCP2 compression to clients
+    _compression = False
+    # address and port we listen for new clients on
+    _address = None
+    _port = None
+    # number of connections the operating system will queue up for us before
+    # we accept them
+    _backlog = 0
+    # the most clients we accept in a single update
+    _max_accepts_per_update = 0
+
+    def __init__(
+        self,
+        address="0.0.0.0",
+        port=1234,
+        backlog=1024,
+        max_accepts_per_update=256,
+        output_high_water=64 * 1024,
+        output_limit=1024 * 1024,
+        idle_timeout=None,
+        idle_message="You have been idle for too long. Goodbye!",
+        keepalive_idle=60,
+        keepalive_interval=10,
+        keepalive_count=5,
+        compression=False,
+    ):
         """Constructs the MudServer object and starts listening for
-        new players.
+        new players on 'address' and 'port'.
+
+        'backlog' is how many connecting clients the operating system
+        queues up between updates, and each update accepts up to
+        'max_accepts_per_update' of them. After a restart many players
+        reconnect at once, so both should be well above the number of
+        players expected to arrive within one update.
+
+        'output_high_water' and 'output_limit' control what happens to
+        clients that don't read their output fast enough. Past the high
+        water mark (in bytes) we stop reading their commands until they
+        catch up, and past the limit we disconnect them.
+
+        Clients that send nothing for 'idle_timeout' seconds are sent
+        'idle_message' and disconnected. Clients whose connection has
+        died are found by the operating system using TCP keepalive: after
+        'keepalive_idle' seconds of silence it probes the connection every
+        'keepalive_interval' seconds, and gives up after 'keepalive_count'
+        unanswered probes.
+
+        If 'compression' is True, clients are offered MCCP2 compression.
+        Clients that accept have everything sent to them compressed with
+        zlib, see 'get_compression_stats'.
         """
 
         self._clients = {}
         self._nextid = 0
-        self._events = []
-        self._new_events = []
+        self._events = self._empty_events()
+        self._new_events = self._empty_events()
+        self._event_seq = 0
+        self._output_high_water = output_high_water
+        self._output_limit = output_limit
+        self._unflushed = set()
+        self._messages_queued = 0
+        self._send_calls = 0
+        self._idle_timeout = idle_timeout
+        self._idle_message = idle_message
+        self._keepalive = (keepalive_idle, keepalive_interval, keepalive_count)
+        self._idle_heap = []
+        self._compression = compression
+        self._address = address
+        self._port = port
+        self._backlog = backlog
+        self._max_accepts_per_update = max_accepts_per_update
+
+        self._start_listening()
+
+    def _start_listening(self):
 
         # create a new tcp socket which will be used to listen for new clients
         self._listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -98,55 +221,98 @@ class MudServer(object):
 
         # bind the socket to an ip address and port. Port 23 is the standard
         # telnet port which telnet clients will use, however on some platforms
-        # this requires root permissions, so we use a higher arbitrary port
-        # number instead: 1234. Address 0.0.0.0 means that we will bind to all
-        # of the available network interfaces
-        self._listen_socket.bind(("0.0.0.0", 1234))
+        # this requires root permissions, so by default we use a higher
+        # arbitrary port number instead: 1234. The default address 0.0.0.0
+        # means that we will bind to all of the available network interfaces
+        self._listen_socket.bind((self._address, self._port))
 
         # set to non-blocking mode. This means that when we call 'accept', it
         # will return immediately without waiting for a connection
         self._listen_socket.setblocking(False)
 
-        # start listening for connections on the socket
-        self._listen_socket.listen(1)
+        # start listening for connections on the socket. Clients that connect
+        # while the backlog is full are left waiting by the operating system,
+        # and may give up before we get to them
+        self._listen_socket.listen(self._backlog)
+
+        # create a selector (epoll/kqueue where available) and register the
+        # listen socket with it. Every client socket is registered with the
+        # same selector when it connects, so each update only has to ask the
+        # operating system once which sockets are ready. The listen socket is
+        # registered with no data so we can tell it apart from the clients,
+        # which carry their client id
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._listen_socket, selectors.EVENT_READ, None)
 
     def update(self):
         """Checks for new players, disconnected players, and new
         messages sent from players. This method must be called before
-        up-to-date info can be obtained from the 'get_new_players',
-        'get_disconnected_players' and 'get_commands' methods.
+        up-to-date info can be obtained from the 'drain_events',
+        'get_new_players', 'get_disconnected_players' and 'get_commands'
+        methods.
         It should be called in a loop to keep the game running.
         """
 
+        # ask the selector which sockets are ready to be read from, or
+        # written to for clients with output waiting. We pass in a timeout of
+        # 0 so that it returns immediately without waiting. Only sockets that
+        # are actually ready are returned, so idle clients cost us nothing
+        listen_ready = False
+        ready_clients = []
+        writable_clients = []
+        for key, mask in self._selector.select(timeout=0):
+            if key.data is None:
+                listen_ready = True
+                continue
+            if mask & selectors.EVENT_READ:
+                ready_clients.append(key.data)
+            if mask & selectors.EVENT_WRITE:
+                writable_clients.append(key.data)
+
+        # send whatever output we couldn't send earlier to the clients that
+        # can take it now
+        for id in writable_clients:
+            if id in self._clients:
+                self._flush_client(id)
+
         # check for new stuff
-        self._check_for_new_connections()
-        self._check_for_disconnected()
-        self._check_for_messages()
+        if listen_ready:
+            self._check_for_new_connections()
+        self._check_for_messages(ready_clients)
+        self._check_for_idle()
+
+        # send everything queued up since the last flush
+        self.flush()
 
-        # move the new events into the main events list so that they can be
-        # obtained with 'get_new_players', 'get_disconnected_players' and
-        # 'get_commands'. The previous events are discarded
-        self._events = list(self._new_events)
-        self._new_events = []
+        self._swap_events()
 
     def get_new_players(self):
         """Returns a list containing info on any new players that have
         entered the game since the last call to 'update'. Each item in
         the list is a player id number.
         """
-        retval = []
-        # go through all the events in the main list
-        for ev in self._events:
-            # if the event is a new player occurence, add the info to the list
-            if ev[0] == self._EVENT_NEW_PLAYER:
-                retval.append(ev[1])
-        # return the info list
-        return retval
+        return [ev.id for ev in self._events[NewPlayerEvent]]
 
     def disconnect_client(self, clid):
-        cl = self._clients[clid]
-        # close the socket, disconnecting the client
-        cl.socket.shutdown(socket.SHUT_RDWR)
+        # the client may have left already, e.g. straight after sending us
+        # 'quit'
+        cl = self._clients.get(clid)
+        if cl is None:
+            return
+
+        # make a last attempt to send anything still waiting, such as a
+        # goodbye message
+        self._end_compression(cl)
+        self._flush_client(clid)
+        if clid not in self._clients:
+            return
+
+        # close the socket, disconnecting the client. If the connection has
+        # already died, 'shutdown' will complain, which is fine
+        try:
+            cl.socket.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
         cl.socket.close()
 
         self._handle_disconnect(clid)
@@ -156,15 +322,7 @@ class MudServer(object):
         the game since the last call to 'update'. Each item in the list
         is a player id number.
         """
-        retval = []
-        # go through all the events in the main list
-        for ev in self._events:
-            # if the event is a player disconnect occurence, add the info to
-            # the list
-            if ev[0] == self._EVENT_PLAYER_LEFT:
-                retval.append(ev[1])
-        # return the info list
-        return retval
+        return [ev.id for ev in self._events[PlayerLeftEvent]]
 
     def get_commands(self):
         """Returns a list containing any commands sent from players
@@ -174,32 +332,101 @@ class MudServer(object):
         they typed), and another string containing the text after the
         command
         """
-        retval = []
-        # go through all the events in the main list
-        for ev in self._events:
-            # if the event is a command occurence, add the info to the list
-            if ev[0] == self._EVENT_COMMAND:
-                retval.append((ev[1], ev[2], ev[3]))
-        # return the info list
-        return retval
+        return [(ev.id, ev.command, ev.params) for ev in self._events[CommandEvent]]
+
+    def drain_events(self):
+        """Yields every event since the last call to 'update', in the order
+        they happened, removing each one as it goes. Events are
+        NewPlayerEvent, PlayerLeftEvent or CommandEvent tuples.
+
+        Unlike handling the lists from 'get_new_players',
+        'get_disconnected_players' and 'get_commands' one after another,
+        this keeps the events for each player in order, e.g. a player's
+        commands come before they leave, even if they disconnected straight
+        after sending them. Messages sent to a player who has already
+        disconnected are ignored.
+        """
+        queues = list(self._events.values())
+        while True:
+            # each queue is already in order, so the next event is whichever
+            # queue's first event happened earliest
+            oldest = None
+            for queue in queues:
+                if queue and (oldest is None or queue[0].seq < oldest[0].seq):
+                    oldest = queue
+            if oldest is None:
+                return
+
+            yield oldest.popleft()
 
     def send_global_message(self, message):
-        for cid in self._clients.keys():
+        # copy the ids first, as a client may be dropped while sending
+        for cid in list(self._clients.keys()):
             self.send_message(cid, message)
 
     def send_message(self, to, message):
         """Sends the text in the 'message' parameter to the player with
         the id number given in the 'to' parameter. The text will be
         printed out in the player's terminal.
+
+        The message is queued up with anything else sent to the player and
+        actually sent by the next call to 'flush' or 'update'.
         """
         # we make sure to put a newline on the end so the client receives the
         # message on its own line
         self._attempt_send(to, message + "\n\r")
 
+    def flush(self):
+        """Sends all queued messages, with one write per player. Call
+        this once the game has finished handling a tick, or whenever
+        output needs to go out straight away.
+        """
+        unflushed = self._unflushed
+        self._unflushed = set()
+
+        for clid in unflushed:
+            if clid in self._clients:
+                self._flush_client(clid)
+
+    def get_compression_stats(self):
+        """Returns a dict mapping the id of each player using MCCP2
+        compression to a dict with the bytes before and after
+        compression, the compression ratio, and the seconds spent
+        compressing their output.
+        """
+        stats = {}
+        for clid, cl in self._clients.items():
+            if cl.compress_in == 0:
+                continue
+            stats[clid] = {
+                "raw_bytes": cl.compress_in,
+                "compressed_bytes": cl.compress_out,
+                "ratio": cl.compress_in / max(cl.compress_out, 1),
+                "cpu_seconds": cl.compress_time,
+            }
+        return stats
+
+    def get_output_stats(self):
+        """Returns a dict with the number of messages queued, the
+        number of 'send' calls made to deliver them, and how many calls
+        were saved by sending messages together. Telnet commands we send
+        count as messages, and only calls which sent something count as
+        sends, although a send which only takes part of the output means
+        another one for the rest.
+        """
+        return {
+            "messages": self._messages_queued,
+            "sends": self._send_calls,
+            "sends_saved": self._messages_queued - self._send_calls,
+        }
+
     def shutdown(self):
         """Closes down the server, disconnecting all clients and
         closing the listen socket.
         """
+        # send anything still waiting, such as a goodbye message
+        self.flush()
+
         # for each client
         for cl in self._clients.values():
             # close the socket, disconnecting the client
@@ -207,135 +434,355 @@ class MudServer(object):
             cl.socket.close()
         # stop listening for new clients
         self._listen_socket.close()
+        self._selector.close()
 
     def _attempt_send(self, clid, data):
         # python 2/3 compatability fix - convert non-unicode string to unicode
         if sys.version < "3" and type(data) != unicode:
             data = unicode(data, "latin1")
-        try:
-            # look up the client in the client map and use 'sendall' to send
-            # the message string on the socket. 'sendall' ensures that all of
-            # the data is sent in one go
-            self._clients[clid].socket.sendall(bytearray(data, "latin1"))
-        # KeyError will be raised if there is no client with the given id in
-        # the map
-        except KeyError:
-            pass
-        # If there is a connection problem with the client (e.g. they have
-        # disconnected) a socket error will be raised
-        except socket.error:
-            self._handle_disconnect(clid)
 
-    def _check_for_new_connections(self):
+        # look up the client in the client map. If there is no client with
+        # the given id there's nothing to do
+        cl = self._clients.get(clid)
+        if cl is None:
+            return
+
+        # add the data to the end of the client's output queue. Everything
+        # queued for a client is sent together by the next 'flush', which
+        # saves a lot of tiny writes when a single command sends several
+        # messages
+        data = data.encode("latin1")
+        if cl.compressor is not None:
+            data = self._compress(cl, data)
+        cl.outbuf += data
+        self._messages_queued += 1
+
+        if len(cl.outbuf) > self._output_limit:
+            # the client isn't reading what we send them. Rather than let the
+            # queue grow forever, we drop them
+            self._drop_client(clid)
+        else:
+            self._unflushed.add(clid)
+
+    def _flush_client(self, clid):
+        cl = self._clients.get(clid)
+        if cl is None:
+            return
+        self._finish_compressed_block(cl)
 
-        # 'select' is used to check whether there is data waiting to be read
-        # from the socket. We pass in 3 lists of sockets, the first being those
-        # to check for readability. It returns 3 lists, the first being
-        # the sockets that are readable. The last parameter is how long to wait
-        # - we pass in 0 so that it returns immediately without waiting
-        rlist, wlist, xlist = select.select([self._listen_socket], [], [], 0)
-
-        # if the socket wasn't in the readable list, there's no data available,
-        # meaning no clients waiting to connect, and so we can exit the method
-        # here
-        if self._listen_socket not in rlist:
+        # send as much of the output queue as the socket will take. On a
+        # non-blocking socket 'send' may only send part of the data, in which
+        # case we keep the rest for next time
+        while cl.outbuf:
+            try:
+                sent = cl.socket.send(cl.outbuf)
+            # the socket's buffer is full, so we need to wait until it's
+            # writable again
+            except BlockingIOError:
+                break
+            # If there is a connection problem with the client (e.g. they have
+            # disconnected) a socket error will be raised
+            except socket.error:
+                self._handle_disconnect(clid)
+                return
+            if sent:
+                self._send_calls += 1
+            del cl.outbuf[:sent]
+
+        self._update_interest(clid)
+
+    def _offer_compression(self, clid):
+
+        # tell the client we're willing to compress what we send them. If
+        # they want us to, they'll reply with 'do'. See _handle_negotiation
+        if self._compression:
+            self._queue_telnet_command(
+                self._clients[clid],
+                bytes(
+                    [self._TN_INTERPRET_AS_COMMAND, self._TN_WILL, self._TN_COMPRESS2]
+                ),
+            )
+
+    def _queue_telnet_command(self, cl, data):
+
+        # Telnet commands we send are queued like messages, and counted as
+        # them in 'get_output_stats', so they go out with the next flush
+        cl.outbuf += data
+        self._messages_queued += 1
+        self._unflushed.add(cl.id)
+
+    def _handle_negotiation(self, client, code, option):
+
+        # called for each 'will', 'wont', 'do' or 'dont' command the client
+        # sends us. The only option we care about is MCCP2 compression
+        if option != self._TN_COMPRESS2 or not self._compression:
             return
 
-        # 'accept' returns a new socket and address info which can be used to
-        # communicate with the new client
-        joined_socket, addr = self._listen_socket.accept()
+        if code == self._TN_DO and client.compressor is None:
+            # the client wants compression. We send an (uncompressed)
+            # subnegotiation to say that everything after it is compressed,
+            # then start compressing
+            self._queue_telnet_command(
+                client,
+                bytes(
+                    [
+                        self._TN_INTERPRET_AS_COMMAND,
+                        self._TN_SUBNEGOTIATION_START,
+                        self._TN_COMPRESS2,
+                        self._TN_INTERPRET_AS_COMMAND,
+                        self._TN_SUBNEGOTIATION_END,
+                    ]
+                ),
+            )
+            client.compressor = zlib.compressobj()
+        elif code == self._TN_DONT:
+            self._end_compression(client)
+
+    def _compress(self, cl, data, mode=None):
+
+        # run data through the client's compressor, keeping count of the
+        # bytes in and out and the time it takes. With no mode, the compressor
+        # may hold on to some of the data until it's flushed
+        start = time.perf_counter()
+        if mode is None:
+            compressed = cl.compressor.compress(data)
+            cl.compress_pending = True
+        else:
+            compressed = cl.compressor.flush(mode)
+            cl.compress_pending = False
+        cl.compress_time += time.perf_counter() - start
+
+        cl.compress_in += len(data)
+        cl.compress_out += len(compressed)
+        return compressed
+
+    def _finish_compressed_block(self, cl):
+
+        # before sending, make the compressor give up everything it's holding
+        # on to so the client can decompress all of it straight away. We only
+        # do this once per flush, as each one adds a few bytes of overhead
+        if cl.compressor is not None and cl.compress_pending:
+            cl.outbuf += self._compress(cl, b"", zlib.Z_SYNC_FLUSH)
+
+    def _end_compression(self, cl):
+
+        # finish the compressed stream, after which anything we send goes
+        # out uncompressed again. Nothing to do for clients who have left
+        if cl is not None and cl.compressor is not None:
+            self._queue_telnet_command(cl, self._compress(cl, b"", zlib.Z_FINISH))
+            cl.compressor = None
+
+    def _update_interest(self, clid):
+        cl = self._clients[clid]
+
+        # work out which events we want the selector to tell us about for this
+        # client. We want to know when the socket is writable if there's output
+        # waiting, and we only read their commands while their output queue is
+        # below the high water mark, which throttles clients that send
+        # commands faster than they read the replies
+        mask = 0
+        if len(cl.outbuf) <= self._output_high_water:
+            mask |= selectors.EVENT_READ
+        if cl.outbuf:
+            mask |= selectors.EVENT_WRITE
+
+        # only ask the selector to change anything if the events have changed
+        if mask != cl.mask:
+            self._selector.modify(cl.socket, mask, clid)
+            cl.mask = mask
+
+    def _check_for_new_connections(self):
+
+        # the selector has told us the listen socket is readable, meaning there
+        # are clients waiting to connect. Accept as many as we're allowed to
+        # rather than one per update, so that a crowd of players reconnecting
+        # at once isn't kept waiting in the backlog
+        for _ in range(self._max_accepts_per_update):
+            # once nobody else is waiting 'accept' raises, and we stop. It
+            # also raises if a client gave up in the meantime, or if we've
+            # run out of file descriptors, in which case we try again next
+            # time
+            try:
+                joined_socket, addr = self._listen_socket.accept()
+            except OSError:
+                return
+
+            self._add_client(joined_socket, addr)
+
+    def _add_client(self, joined_socket, addr):
 
         # set non-blocking mode on the new socket. This means that 'send' and
         # 'recv' will return immediately without waiting
         joined_socket.setblocking(False)
+        self._enable_keepalive(joined_socket)
 
         # construct a new _Client object to hold info about the newly connected
         # client. Use 'nextid' as the new client's id number
         self._clients[self._nextid] = MudServer._Client(
-            joined_socket, addr[0], "", time.time()
+            self._nextid, joined_socket, addr[0], bytearray(), time.monotonic()
         )
+        self._track_idle(self._nextid)
+        self._offer_compression(self._nextid)
+
+        # register the new socket with the selector, tagged with the client's
+        # id so we know who sent the data when it becomes readable
+        self._selector.register(joined_socket, selectors.EVENT_READ, self._nextid)
 
         # add a new player occurence to the new events list with the player's
         # id number
-        self._new_events.append((self._EVENT_NEW_PLAYER, self._nextid))
+        self._add_event(NewPlayerEvent, self._nextid)
 
         # add 1 to 'nextid' so that the next client to connect will get a
         # unique id number
         self._nextid += 1
 
-    def _check_for_disconnected(self):
-
-        # go through all the clients
-        for id, cl in list(self._clients.items()):
-
-            # if we last checked the client less than 5 seconds ago, skip this
-            # client and move on to the next one
-            if time.time() - cl.lastcheck < 5.0:
+    def _enable_keepalive(self, sock):
+
+        # ask the operating system to check the connection is still alive
+        # when the client has been quiet for a while. If the client has gone
+        # away without telling us, the socket becomes readable with an error
+        # and we disconnect them as normal. This costs us nothing while the
+        # client is active, unlike sending them data to see if it fails
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+
+        # the timings can only be changed on some platforms
+        keepalive_idle, keepalive_interval, keepalive_count = self._keepalive
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, keepalive_idle)
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            sock.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, keepalive_interval
+            )
+        if hasattr(socket, "TCP_KEEPCNT"):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPCNT, keepalive_count)
+
+    def _track_idle(self, clid):
+
+        # add the client to the idle heap with the time they'll be idle for
+        # too long if they don't send us anything
+        if self._idle_timeout is not None:
+            cl = self._clients[clid]
+            deadline = cl.last_activity + self._idle_timeout
+            heapq.heappush(self._idle_heap, (deadline, clid))
+
+    def _check_for_idle(self):
+
+        # the heap keeps the earliest deadline at the front, so we only look
+        # at clients whose deadline has passed rather than at every client
+        now = time.monotonic()
+        while self._idle_heap and self._idle_heap[0][0] <= now:
+            deadline, clid = heapq.heappop(self._idle_heap)
+
+            # the client may have left already
+            cl = self._clients.get(clid)
+            if cl is None:
                 continue
 
-            # send the client an invisible character. It doesn't actually
-            # matter what we send, we're really just checking that data can
-            # still be written to the socket. If it can't, an error will be
-            # raised and we'll know that the client has disconnected.
-            self._attempt_send(id, "\x00")
-
-            # update the last check time
-            cl.lastcheck = time.time()
+            # rather than updating the heap every time a client sends us
+            # something, we check here whether they've been active since the
+            # deadline was set. If they have, we put them back with a new one
+            if cl.last_activity + self._idle_timeout > now:
+                self._track_idle(clid)
+                continue
 
-    def _check_for_messages(self):
+            # they really have been idle for too long
+            if self._idle_message is not None:
+                self.send_message(clid, self._idle_message)
+            self.disconnect_client(clid)
 
-        # go through all the clients
-        for id, cl in list(self._clients.items()):
+    def _check_for_messages(self, ready_clients):
 
-            # we use 'select' to test whether there is data waiting to be read
-            # from the client socket. The function takes 3 lists of sockets,
-            # the first being those to test for readability. It returns 3 list
-            # of sockets, the first being those that are actually readable.
-            rlist, wlist, xlist = select.select([cl.socket], [], [], 0)
+        # go through the clients the selector told us have data waiting
+        for id in ready_clients:
 
-            # if the client socket wasn't in the readable list, there is no
-            # new data from the client - we can skip it and move on to the next
-            # one
-            if cl.socket not in rlist:
+            # the client may have been disconnected since the selector was
+            # asked (e.g. by the liveness check), in which case skip them
+            cl = self._clients.get(id)
+            if cl is None:
                 continue
 
             try:
                 # read data from the socket, using a max length of 4096
-                data = cl.socket.recv(4096).decode("latin1")
-
-                # process the data, stripping out any special Telnet commands
-                message = self._process_sent_data(cl, data)
+                data = cl.socket.recv(4096)
 
-                # if there was a message in the data
-                if message:
+                # a readable socket with no data means the client closed the
+                # connection from their end
+                if not data:
+                    self._handle_disconnect(id)
+                    continue
 
-                    # remove any spaces, tabs etc from the start and end of
-                    # the message
-                    message = message.strip()
+                cl.last_activity = time.monotonic()
 
-                    # separate the message into the command (the first word)
-                    # and its parameters (the rest of the message)
-                    command, params = (message.split(" ", 1) + ["", ""])[:2]
-
-                    # add a command occurence to the new events list with the
-                    # player's id number, the command and its parameters
-                    self._new_events.append(
-                        (self._EVENT_COMMAND, id, command.lower(), params)
-                    )
+                # process the data, stripping out any special Telnet commands
+                # and turning each complete line into a command
+                for message in self._process_sent_data(cl, data):
+                    self._add_command(id, message)
 
             # if there is a problem reading from the socket (e.g. the client
             # has disconnected) a socket error will be raised
             except socket.error:
                 self._handle_disconnect(id)
 
+    def _empty_events(self):
+        return {
+            NewPlayerEvent: collections.deque(),
+            PlayerLeftEvent: collections.deque(),
+            CommandEvent: collections.deque(),
+        }
+
+    def _swap_events(self):
+        # make the new events the main events so that they can be obtained
+        # with 'drain_events', 'get_new_players', 'get_disconnected_players'
+        # and 'get_commands'. Any previous events not yet drained are
+        # discarded
+        self._events = self._new_events
+        self._new_events = self._empty_events()
+
+    def _add_event(self, kind, *fields):
+        # add an occurence of the given type to the new events, numbered so
+        # that the order of events of different types is kept
+        self._new_events[kind].append(kind(self._event_seq, *fields))
+        self._event_seq += 1
+
+    def _add_command(self, clid, message):
+
+        # empty lines aren't commands
+        if not message:
+            return
+
+        # remove any spaces, tabs etc from the start and end of the message
+        message = message.strip()
+
+        # separate the message into the command (the first word) and its
+        # parameters (the rest of the message)
+        command, params = (message.split(" ", 1) + ["", ""])[:2]
+
+        # add a command occurence to the new events list with the player's id
+        # number, the command and its parameters
+        self._add_event(CommandEvent, clid, command.lower(), params)
+
+    def _drop_client(self, clid):
+        # disconnect a client without trying to send them anything else
+        self._handle_disconnect(clid)
+
     def _handle_disconnect(self, clid):
 
         # remove the client from the clients map
-        del self._clients[clid]
+        cl = self._clients.pop(clid)
+
+        # stop the selector from watching the client's socket. If the socket
+        # has already been closed the selector may complain, which is fine
+        try:
+            self._selector.unregister(cl.socket)
+        except (KeyError, ValueError):
+            pass
+
+        # make sure the socket is closed, since nothing refers to it any more
+        cl.socket.close()
 
         # add a 'player left' occurence to the new events list, with the
         # player's id number
-        self._new_events.append((self._EVENT_PLAYER_LEFT, clid))
+        self._add_event(PlayerLeftEvent, clid)
 
     def _process_sent_data(self, client, data):
 
@@ -346,77 +793,107 @@ class MudServer(object):
         # More info on the Telnet protocol can be found here:
         # http://pcmicro.com/netfoss/telnet.html
 
-        # start with no message and in the normal state
-        message = None
-        state = self._READ_STATE_NORMAL
-
-        # go through the data a character at a time
-        for c in data:
-
-            # handle the character differently depending on the state we're in:
-
-            # normal state
-            if state == self._READ_STATE_NORMAL:
-
-                # if we received the special 'interpret as command' code,
-                # switch to 'command' state so that we handle the next
-                # character as a command code and not as regular text data
-                if ord(c) == self._TN_INTERPRET_AS_COMMAND:
-                    state = self._READ_STATE_COMMAND
-
-                # if we get a newline character, this is the end of the
-                # message. Set 'message' to the contents of the buffer and
-                # clear the buffer
-                elif c == "\n":
-                    message = client.buffer
-                    client.buffer = ""
-
-                # some telnet clients send the characters as soon as the user
-                # types them. So if we get a backspace character, this is where
-                # the user has deleted a character and we should delete the
-                # last character from the buffer.
-                elif c == "\x08":
-                    client.buffer = client.buffer[:-1]
-
-                # otherwise it's just a regular character - add it to the
-                # buffer where we're building up the received message
-                else:
-                    client.buffer += c
-
-            # command state
-            elif state == self._READ_STATE_COMMAND:
-
-                # the special 'start of subnegotiation' command code indicates
-                # that the following characters are a list of options until
-                # we're told otherwise. We switch into 'subnegotiation' state
-                # to handle this
-                if ord(c) == self._TN_SUBNEGOTIATION_START:
-                    state = self._READ_STATE_SUBNEG
-
-                # if the command code is one of the 'will', 'wont', 'do' or
-                # 'dont' commands, the following character will be an option
-                # code so we must remain in the 'command' state
-                elif ord(c) in (
-                    self._TN_WILL,
-                    self._TN_WONT,
-                    self._TN_DO,
-                    self._TN_DONT,
-                ):
-                    state = self._READ_STATE_COMMAND
-
-                # for all other command codes, there is no accompanying data so
-                # we can return to 'normal' state.
-                else:
-                    state = self._READ_STATE_NORMAL
-
-            # subnegotiation state
-            elif state == self._READ_STATE_SUBNEG:
-
-                # if we reach an 'end of subnegotiation' command, this ends the
-                # list of options and we can return to 'normal' state.
-                # Otherwise we must remain in this state
-                if ord(c) == self._TN_SUBNEGOTIATION_END:
-                    state = self._READ_STATE_NORMAL
-
-        # return the contents of 'message' which is either a string or None
-        return message
+        # rather than looking at the data a character at a time, we search for
+        # the bytes we care about and let python copy everything in between.
+        # If the last read ended part way through a Telnet command, the start
+        # of it is waiting in 'telnet_buffer'
+        if client.telnet_buffer:
+            data = bytes(client.telnet_buffer) + data
+            client.telnet_buffer = bytearray()
+
+        # most of the time there are no Telnet commands at all
+        if self._IAC_BYTES in data:
+            data = self._strip_telnet_commands(client, data)
+
+        # most reads are one or more whole commands with nothing left over
+        # from before, which we can split into lines straight away
+        if data[-1:] == b"\n" and not client.buffer and b"\x08" not in data:
+            return [line.decode("latin1") for line in data[:-1].split(b"\n")]
+
+        text = client.buffer
+        text += data
+
+        # if there's no newline we're still waiting for the rest of the line.
+        # Only the new data needs checking, as we already know there's no
+        # newline in what was buffered before
+        if b"\n" not in data:
+            return []
+
+        # split the text into lines. Every complete line is a message, and
+        # whatever comes after the last newline stays in the buffer until the
+        # rest of the line arrives
+        last_newline = text.rfind(b"\n")
+        complete = bytes(text[:last_newline])
+        del text[: last_newline + 1]
+        lines = complete.split(b"\n")
+
+        # some telnet clients send the characters as soon as the user types
+        # them. So if we get a backspace character, this is where the user has
+        # deleted a character and we should delete the character before it
+        if b"\x08" in complete:
+            lines = [self._apply_backspaces(line) for line in lines]
+
+        # return the list of messages
+        return [line.decode("latin1") for line in lines]
+
+    def _strip_telnet_commands(self, client, data):
+
+        # go through the commands one at a time, keeping the text in between
+        text = bytearray()
+        pos = 0
+        size = len(data)
+        while True:
+
+            # find the next 'interpret as command' code. If there isn't one,
+            # the rest of the data is regular text
+            iac = data.find(self._IAC_BYTES, pos)
+            if iac == -1:
+                text += data[pos:]
+                return text
+
+            # everything up to the command code is regular text
+            text += data[pos:iac]
+
+            # if the read ends part way through a command, keep hold of it
+            # until the rest arrives with the next read
+            if iac + 1 == size:
+                client.telnet_buffer += data[iac:]
+                return text
+            code = data[iac + 1]
+
+            # the 'start of subnegotiation' command is followed by a list of
+            # options up to an 'end of subnegotiation' command. We don't use
+            # any of them, so if the end hasn't arrived yet we only remember
+            # that we're part way through one, and whether the read ended
+            # half way through the command ending it. This way a client can't
+            # make us hold on to, or search through, an endless subnegotiation
+            if code == self._TN_SUBNEGOTIATION_START:
+                sub_end = data.find(self._SUBNEG_END_BYTES, iac + 2)
+                if sub_end == -1:
+                    client.telnet_buffer += self._SUBNEG_START_BYTES
+                    if size > iac + 2 and data[-1] == self._TN_INTERPRET_AS_COMMAND:
+                        client.telnet_buffer += self._IAC_BYTES
+                    return text
+                pos = sub_end + 2
+
+            # the 'will', 'wont', 'do' and 'dont' commands are followed by
+            # an option code
+            elif self._TN_WILL <= code <= self._TN_DONT:
+                if iac + 2 == size:
+                    client.telnet_buffer += data[iac:]
+                    return text
+                self._handle_negotiation(client, code, data[iac + 2])
+                pos = iac + 3
+
+            # all other command codes have no accompanying data
+            else:
+                pos = iac + 2
+
+    def _apply_backspaces(self, line):
+        edited = bytearray()
+        for c in line:
+            if c == 8:
+                del edited[-1:]
+            else:
+                edited.append(c)
+        return edited
@@ -1,77 +1,79 @@
 from enum import Enum
 
-
-class AffectFlag(Enum):
-    BLIND = "A"  # *
-    INVIS = "B"
-
-    DETECTEVIL = "C"
-    DETECTINVIS = "D"
-    DETECTMAGIC = "E"
-    DETECTHIDDEN = "F"
-    DETECTGOOD = "G"
-
-    SANCTUARY = "H"
-    FAERIEFIRE = "I"  # *
-    INFRARED = "J"
-    CURSE = "K"
-    FLAMING = "L"
-    POISONED = "M"  # *)
-
-    PROTEVIL = "N"
-    PROTGOOD = "O"
-
-    SNEAK = "P"
-    HIDE = "Q"
-
-    SLEEP = "R"  # *
-    CHARM = "S"  # *
-
-    FLYING = "T"
-    PASSDOOR = "U"
-    HASTE = "V"
-
-    CALM = "W"  # *
-    PLAGUE = "X"  # *
-    WEAKEN = "Y"  # *
-    DARKVIS = "Z"
-    BESERK = "a"  # *
-    SWIM = "b"
-    REGEN = "c"
-    SLOW = "d"
+from poff_mud.flags import RomFlag, code_bit
+
+
+class AffectFlag(RomFlag):
+    BLIND = code_bit("A")  # *
+    INVIS = code_bit("B")
+
+    DETECTEVIL = code_bit("C")
+    DETECTINVIS = code_bit("D")
+    DETECTMAGIC = code_bit("E")
+    DETECTHIDDEN = code_bit("F")
+    DETECTGOOD = code_bit("G")
+
+    SANCTUARY = code_bit("H")
+    FAERIEFIRE = code_bit("I")  # *
+    INFRARED = code_bit("J")
+    CURSE = code_bit("K")
+    FLAMING = code_bit("L")
+    POISONED = code_bit("M")  # *)
+
+    PROTEVIL = code_bit("N")
+    PROTGOOD = code_bit("O")
+
+    SNEAK = code_bit("P")
+    HIDE = code_bit("Q")
+
+    SLEEP = code_bit("R")  # *
+    CHARM = code_bit("S")  # *
+
+    FLYING = code_bit("T")
+    PASSDOOR = code_bit("U")
+    HASTE = code_bit("V")
+
+    CALM = code_bit("W")  # *
+    PLAGUE = code_bit("X")  # *
+    WEAKEN = code_bit("Y")  # *
+    DARKVIS = code_bit("Z")
+    BESERK = code_bit("a")  # *
+    SWIM = code_bit("b")
+    REGEN = code_bit("c")
+    SLOW = code_bit("d")
     # * items will be detrimental to the character, possibly for cursed items.
 
 
 # Immune, Resist, Vulnerability Flags
 # Describes types of damage that a character
 # might be more or less resistant to
-class IRVFlag(Enum):
-    SUMMON = "A"  # Summoning and gating magic
-    CHARM = "B"  # Charm spells (the beguiling spell group)
-    MAGIC = "C"  # All magic (be very careful using this flag)
-
-    WEAPONS = "D"  # All physical attacks (be very careful using this flag)
-    BASH = "E"  # Blunt weapons
-    PIERCE = "F"  # Piercing weapons
-    SLASH = "G"  # Slashing weapons
-
-    FIRE = "H"  # Flame and heat attacks and spells
-    COLD = "I"  # Cold and ice attacks and spells
-    LIGHTNING = "J"  # Electrical attacks and spells
-    ACID = "K"  # Corrosive attacks and spells
-    POISON = "L"  # Venoms and toxic vapors
-    NEGATIVE = "M"  # Life draining attacks and spells, or unholy energies
-    HOLY = "N"  # Holy or blessed attacks
-    ENERGY = "O"  # Generic magical force (i.e. magic missile)
-    MENTAL = "P"  # Mental attacks (such as a mind flayer's mind blasts)
-    DISEASE = "Q"  # Disease, from the common cold to the black death
-    DROWNING = "R"  # Watery attacks and suffocation
-
-    LIGHT = "S"  # Light-based attacks, whether blinding or cutting
-    SOUND = "T"  # Sonic attacks and weapons, or deafening noises
-    WOOD = "X"  # Wooden weapons and creatures
-    SILVER = "Y"  # Silver or mithril weapons and creatures
-    IRON = "Z"  # Iron and steel weapons and creatures
+class IRVFlag(RomFlag):
+    SUMMON = code_bit("A")  # Summoning and gating magic
+    CHARM = code_bit("B")  # Charm spells (the beguiling spell group)
+    MAGIC = code_bit("C")  # All magic (be very careful using this flag)
+
+    WEAPONS = code_bit("D")  # All physical attacks (be very careful using this flag)
+    BASH = code_bit("E")  # Blunt weapons
+    PIERCE = code_bit("F")  # Piercing weapons
+    SLASH = code_bit("G")  # Slashing weapons
+
+    FIRE = code_bit("H")  # Flame and heat attacks and spells
+    COLD = code_bit("I")  # Cold and ice attacks and spells
+    LIGHTNING = code_bit("J")  # Electrical attacks and spells
+    ACID = code_bit("K")  # Corrosive attacks and spells
+    POISON = code_bit("L")  # Venoms and toxic vapors
+    NEGATIVE = code_bit("M")  # Life draining attacks and spells, or unholy energies
+    HOLY = code_bit("N")  # Holy or blessed attacks
+    ENERGY = code_bit("O")  # Generic magical force (i.e. magic missile)
+    MENTAL = code_bit("P")  # Mental attacks (such as a mind flayer's mind blasts)
+    DISEASE = code_bit("Q")  # Disease, from the common cold to the black death
+    DROWNING = code_bit("R")  # Watery attacks and suffocation
+
+    LIGHT = code_bit("S")  # Light-based attacks, whether blinding or cutting
+    SOUND = code_bit("T")  # Sonic attacks and weapons, or deafening noises
+    WOOD = code_bit("X")  # Wooden weapons and creatures
+    SILVER = code_bit("Y")  # Silver or mithril weapons and creatures
+    IRON = code_bit("Z")  # Iron and steel weapons and creatures
 
 
 class AffectWhere(Enum):
@@ -101,6 +103,17 @@ class AffectLocation(Enum):
 
 
 class Affect:
+    __slots__ = (
+        "where",
+        "type",
+        "level",
+        "duration",
+        "timer",
+        "location",
+        "modifier",
+        "flags",
+    )
+
     def __init__(self):
         self.where = AffectWhere.TO_AFFECTS
 
@@ -114,4 +127,4 @@ class Affect:
         self.location = AffectLocation.NONE
         self.modifier = 0
 
-        self.flags = []  # Could be IRV flags or Affect flags
+        self.flags = AffectFlag(0)  # Could be IRV flags or Affect flags
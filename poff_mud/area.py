@@ -1,5 +1,9 @@
 import copy
+import logging
+import re
+from collections import namedtuple
 from enum import Enum
+from functools import partial
 
 from poff_mud.enum_contains import EnumContains
 from poff_mud.spawn_pool import SpawnPoolType
@@ -8,13 +12,19 @@ from poff_mud.character import EquipmentSlot
 from poff_mud.room import Room, code_to_direction, DoorState
 from poff_mud.object import Object
 
-from poff_mud.file_helpers import (
-    peek_next_line,
-    read_until_tilde,
-    read_letter,
-    read_number,
-    read_until_delimiter,
-)
+from poff_mud.file_helpers import AreaLexer
+from poff_mud.lazy_records import LazyRecords
+
+logger = logging.getLogger(__name__)
+
+# Bump this whenever the loaders or the classes they build change, so that
+# areas compiled by an older version aren't used. See poff_mud.area_cache
+AREA_LOADER_VERSION = 7
+
+# Matches the '#vnum' line starting each mob, room and object, and the '#0'
+# line ending each section of them
+_RECORD_START_RE = re.compile(r"^#(\d+)[ \t]*$", re.MULTILINE)
+_SECTION_END_RE = re.compile(r"^#0[ \t]*$", re.MULTILINE)
 
 
 class ResetAction(Enum, metaclass=EnumContains):
@@ -45,6 +55,8 @@ class Area:
         self.vnum_max = 1
 
         self.resets = []
+        # The resets compiled into steps, see compile_resets
+        self.reset_plan = None
 
         self.rooms = {}
 
@@ -59,306 +71,410 @@ class Area:
         return f"AREA #{self.filename}: {self.name} By: {author} (Lvl {self.level_min} to {self.level_max})"
 
     def reset(self, gsp):
-        # Count all the spawned mobs and objects by vnum
-        all_spawned_mob_vnums = {}
-        all_spawned_obj_vnums = {}
-
-        for vnum in self.rooms:
-            rm = self.rooms[vnum]
-
-            for mob in rm.mobs:
-                all_spawned_mob_vnums[mob.vnum] = (
-                    all_spawned_mob_vnums.get(mob.vnum, 0) + 1
-                )
-
-            for obj in rm.objects:
-                all_spawned_obj_vnums[obj.vnum] = (
-                    all_spawned_obj_vnums.get(obj.vnum, 0) + 1
-                )
+        for _ in self.reset_steps(gsp):
+            pass
+
+    def reset_steps(self, gsp):
+        """
+        Resets the area one step at a time, yielding before each step so a
+        reset can be paused and carried on with later, like the area
+        updater does to spread resets over several ticks
+        """
+        # Global limits are checked against everything spawned so far in the
+        # whole world, wherever it is, see gsp.instances
 
         # Note: reset doesn't necessarily imply
         # resetting a zone from the ground up.
         # New things are basically spawned in if
         # needed or conditions are met.
 
-        # Apply resets
-        last = None
-        last_reset = None
-        for reset in self.resets:
-            print(f"Attempting reset: {reset['action']} with values {reset['values']}")
-
-            values = reset["values"]
-            if reset["action"] == ResetAction.MOB_SPAWN:
-                mob_vnum = values[1]
-                room_vnum = values[3]
+        # The resets are compiled the first time, once every area has added
+        # its mobs and objects to the spawn pool
+        if self.reset_plan is None:
+            self.reset_plan = self.compile_resets(gsp)
 
-                rm = self.rooms[room_vnum]
-                matching_mobs = [m for m in rm.mobs if m.vnum == mob_vnum]
+        # What each step spawned this time, for the steps that depend on it
+        spawned = [None] * len(self.reset_plan)
 
-                local_count = len(matching_mobs)
-                global_count = all_spawned_mob_vnums.get(mob_vnum, 0)
+        for i, step in enumerate(self.reset_plan):
+            yield
 
-                if local_count >= int(values[4]) or global_count >= int(values[2]):
-                    last = None
+            step_type = type(step)
+            if step_type is MobSpawnStep:
+                if step.spawner.count() >= step.global_limit:
                     continue
 
-                if gsp.contains(SpawnPoolType.MOB, mob_vnum):
-                    # We're good to spawn the mob
-                    mob = gsp.spawn(SpawnPoolType.MOB, mob_vnum)
-                    rm.mobs.append(mob)
-                    last = mob
-                else:
-                    print(f"WARNING: Mob {mob_vnum} not in global spawn pool")
-            elif reset["action"] == ResetAction.OBJ_SPAWN:
-                obj_vnum = values[1]
-                room_vnum = values[3]
-
-                if room_vnum not in self.rooms:
-                    # TODO: midgaard.are tries to do this. Idk why.
-                    print(
-                        "WARNING: Trying to spawn an object in a room not in the area"
-                    )
+                local_count = step.room.mobs.count_vnum(step.spawner.item_key)
+                if local_count >= step.local_limit:
                     continue
 
+                # We're good to spawn the mob
+                mob = step.spawner.spawn(step.room)
+                step.room.mobs.append(mob)
+                spawned[i] = mob
+            elif step_type is ObjSpawnStep:
                 # Don't spawn object if there's an object there already
-                rm = self.rooms[room_vnum]
-
-                matching_objs = [o for o in rm.objects if o.vnum == obj_vnum]
-                if len(matching_objs) > 0:
-                    last = None
+                if step.room.objects.count_vnum(step.spawner.item_key) > 0:
                     continue
 
                 # TODO: spec says to not spawn object if players
                 # are present but I kinda disagree.. not sure
                 # the reasoning but there probably is one
-                if len(rm.players) > 0:
-                    last = None
+                if len(step.room.players) > 0:
                     continue
 
-                if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
-                    obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum)
-                    rm.objects.append(obj)
-                    last = obj
+                obj = step.spawner.spawn(step.room)
+                step.room.objects.append(obj)
+                spawned[i] = obj
+            elif step_type is ObjInObjStep:
+                if step.spawner.count() >= step.global_limit:
+                    continue
+
+                # Put it in the container the step before spawned. If that
+                # didn't spawn one, use the newest one in the world like
+                # ROM's get_obj_type does
+                container = None
+                if step.container is not None:
+                    container = spawned[step.container]
+                if container is None:
+                    container = gsp.instances.newest(
+                        SpawnPoolType.OBJ, step.container_vnum
+                    )
+
+                # Couldn't find the object.. give up
+                if container is None:
+                    continue
+
+                prototype = step.spawner.prototype
+                local_count = 0
+                for o in container.contains:
+                    if o.prototype is prototype:
+                        local_count += 1
+                if local_count >= step.local_limit:
+                    continue
+
+                obj = step.spawner.spawn(container)
+                container.contains.append(obj)
+            elif step_type is GiveObjStep or step_type is EquipObjStep:
+                # TODO: There's a case here where the mob already existed
+                # so it didn't get reset and therefore won't get an item
+                # reset to it (since it wasn't newly created). I have to figure
+                # out if this is the intended behavior or if I should look up
+                # the mob in the area and give it the item if it doesn't exist
+                mob = spawned[step.mob]
+                if mob is None:
+                    continue
+
+                obj = step.spawner.spawn(mob)
+                if step_type is GiveObjStep:
+                    mob.inventory.append(obj)
+                else:
+                    mob.equip(obj, step.wear_slot)
+            elif step_type is SetDoorStep:
+                step.exit["door_state"] = step.door_state
+
+    def compile_resets(self, gsp):
+        """
+        Turns the resets as they're loaded, a list of actions with their
+        values as strings, into steps with everything they need looked up
+        already: numbers, rooms, exits and SpawnHandles for the mobs and
+        objects. Steps needing what an earlier step spawned, like a mob
+        being given an object, have that step's index in the plan.
+
+        Resets which can never work, like ones for mobs that don't exist,
+        are left out with a warning.
+        """
+        plan = []
+
+        # The index of the last mob or object spawning step
+        last = None
+        for reset in self.resets:
+            action = reset["action"]
+            values = reset["values"]
+
+            if action == ResetAction.MOB_SPAWN:
+                mob_vnum = values[1]
+                room_vnum = values[3]
+
+                last = None
+                if room_vnum not in self.rooms:
+                    logger.warning(
+                        "Trying to spawn mob %s in a room not in the area", mob_vnum
+                    )
+                elif not gsp.contains(SpawnPoolType.MOB, mob_vnum):
+                    logger.warning("Mob %s not in global spawn pool", mob_vnum)
+                else:
+                    last = len(plan)
+                    plan.append(
+                        MobSpawnStep(
+                            gsp.handle(SpawnPoolType.MOB, mob_vnum),
+                            self.rooms[room_vnum],
+                            int(values[2]),
+                            int(values[4]),
+                        )
+                    )
+            elif action == ResetAction.OBJ_SPAWN:
+                obj_vnum = values[1]
+                room_vnum = values[3]
+
+                last = None
+                if room_vnum not in self.rooms:
+                    # TODO: midgaard.are tries to do this. Idk why.
+                    logger.warning(
+                        "Trying to spawn obj %s in a room not in the area", obj_vnum
+                    )
+                elif not gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    logger.warning("Obj %s not in global spawn pool", obj_vnum)
                 else:
-                    print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
-            elif reset["action"] == ResetAction.OBJ_IN_OBJ:
+                    last = len(plan)
+                    plan.append(
+                        ObjSpawnStep(
+                            gsp.handle(SpawnPoolType.OBJ, obj_vnum),
+                            self.rooms[room_vnum],
+                        )
+                    )
+            elif action == ResetAction.OBJ_IN_OBJ:
                 obj_vnum = values[1]
-                global_limit = int(values[2])
                 obj_to_vnum = values[3]
-                local_limit = int(values[4])
 
-                # Global limit is arg 2
-                # WARNING: Possible Bug! This doesn't count stuff in containers!
-                # We might need to have a global way to find and count spawned objects
-                # that even might be within containers..
-                if all_spawned_obj_vnums.get(obj_vnum, 0) >= global_limit:
+                if not gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    logger.warning("Obj %s not in global spawn pool", obj_vnum)
                     continue
 
-                # I'm not entirely sure this is the correct behavior
-                # but the problem is that VNUM doesn't necessarily
-                # correspond to an instanced version so we have to rely
-                # on last pointer to figure out where to put the item
-
-                # But there's a new problem... sometimes an object might
-                # not get spawned in because it already exists. Fuck!
-
-                # Ok... Here's what I'm gonna do:
-                # If the last.vnum matches the expected vnum, give that
-                # object the target object. If it doesn't, try
-                # to look up the expected object in the room
-                if type(last).__name__ == "Object" and obj_to_vnum == last.vnum:
-                    # Local limit in container is 4
-                    local_count = len([o for o in last.contains if o.vnum == obj_vnum])
-                    if local_count >= local_limit:
-                        continue
-
-                    if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
-                        # We can give the object to this last object
-                        obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum)
-                        last.contains.append(obj)
-                    else:
-                        print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+                # The last object spawned goes in the container if it's
+                # the right one. Otherwise one is found when it's run
+                container = None
+                if (
+                    last is not None
+                    and type(plan[last]) is ObjSpawnStep
+                    and plan[last].spawner.item_key == obj_to_vnum
+                ):
+                    container = last
+
+                plan.append(
+                    ObjInObjStep(
+                        gsp.handle(SpawnPoolType.OBJ, obj_vnum),
+                        int(values[2]),
+                        obj_to_vnum,
+                        container,
+                        int(values[4]),
+                    )
+                )
+            elif action in (ResetAction.GIVE_OBJ, ResetAction.EQUIP_OBJ):
+                obj_vnum = values[1]
+
+                if last is None or type(plan[last]) is not MobSpawnStep:
+                    logger.warning(
+                        "Skipping %s %s as the last thing loaded wasn't a mob..",
+                        action,
+                        obj_vnum,
+                    )
+                    last = None
+                elif not gsp.contains(SpawnPoolType.OBJ, obj_vnum):
+                    logger.warning("Obj %s not in global spawn pool", obj_vnum)
+                elif action == ResetAction.GIVE_OBJ:
+                    plan.append(
+                        GiveObjStep(gsp.handle(SpawnPoolType.OBJ, obj_vnum), last)
+                    )
                 else:
-                    # Look up object
-                    target_object = None
+                    plan.append(
+                        EquipObjStep(
+                            gsp.handle(SpawnPoolType.OBJ, obj_vnum),
+                            last,
+                            EquipmentSlot(int(values[3])),
+                        )
+                    )
+            elif action == ResetAction.SET_DOOR:
+                room_vnum = values[1]
+                direction = code_to_direction[int(values[2])]
 
-                    if not last_reset:
-                        continue
-                    last_values = last_reset["values"]
-                    last_obj_vnum = values[1]
-                    last_room_vnum = values[3]
+                if room_vnum not in self.rooms:
+                    logger.warning(
+                        "Trying to set a door in room %s which is not in the area",
+                        room_vnum,
+                    )
+                    continue
 
-                    target_object = next(
-                        o for o in self.rooms[last_room_vnum] if o.vnum == last_obj_vnum
+                plan.append(
+                    SetDoorStep(
+                        self.rooms[room_vnum].exits[direction],
+                        DoorState(int(values[3])),
                     )
+                )
+
+        return plan
 
-                    # Couldn't find the object.. give up
-                    if target_object is None:
-                        continue
+    @classmethod
+    def load_from_file(cls, fp, gsp=None, lazy=False):
+        """Loads an area from an open .are file or an AreaLexer. If 'lazy'
+        is True, mobs, rooms and objects are only parsed when they're first
+        looked up, see LazyRecords.
+        """
+        area = cls()
+        if lazy:
+            area.mobs = LazyRecords()
+            area.rooms = LazyRecords()
+            area.objects = LazyRecords()
+
+        record_dicts = {Mobile: area.mobs, Room: area.rooms, Object: area.objects}
+
+        for record in iter_area_records(fp, lazy=lazy):
+            if type(record) is AreaHeader:
+                for field, value in record._asdict().items():
+                    setattr(area, field, value)
+            elif type(record) is AreaReset:
+                area.resets.append(record._asdict())
+            elif type(record) is LazyRecord:
+                record_dicts[record.record_cls].add_lazy(record.vnum, record.loader)
+            else:
+                record_dicts[type(record)][record.vnum] = record
 
-                    # Local limit in container is 4
-                    local_count = [
-                        o for o in target_object.contains if o.vnum == obj_vnum
-                    ]
-                    if local_count >= local_limit:
-                        continue
+        # If we're passing in a spawn pool, add relevant items to their pools
+        if gsp:
+            area.add_to_spawn_pool(gsp)
 
-                    if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
-                        obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum)
-                        target_object.contains.append(obj)
-                    else:
-                        print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
-            elif reset["action"] == ResetAction.GIVE_OBJ:
-                obj_vnum = values[1]
+        return area
 
-                if last and type(last).__name__ == "Mobile":
-                    if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
-                        obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum)
-                        last.inventory.append(obj)
-                    else:
-                        print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
+    def add_to_spawn_pool(self, gsp):
+        for pool_key, records in [
+            (SpawnPoolType.OBJ, self.objects),
+            (SpawnPoolType.MOB, self.mobs),
+        ]:
+            for vnum in records:
+                # Leave anything not loaded yet to be loaded by the pool
+                if isinstance(records, LazyRecords) and not records.is_loaded(vnum):
+                    gsp.add_lazy(pool_key, vnum, records.__getitem__)
                 else:
-                    # TODO: There's a case here where the mob already existed
-                    # so it didn't get reset and therefore won't get an item
-                    # reset to it (since it wasn't newly created). I have to figure
-                    # out if this is the intended behavior or if I should look up
-                    # the mob in the area and give it the item if it doesn't exist
-                    print("Skipping as the last thing loaded wasn't a mob..")
+                    gsp.add(pool_key, vnum, records[vnum])
 
-                    last = None
 
-            elif reset["action"] == ResetAction.EQUIP_OBJ:
-                obj_vnum = values[1]
-                wear_slot = EquipmentSlot(int(values[3]))
+# The records yielded by iter_area_records, besides Mobile, Room and Object
+AreaHeader = namedtuple(
+    "AreaHeader",
+    "filename name level_min level_max description vnum_min vnum_max",
+)
+AreaReset = namedtuple("AreaReset", "action values")
+# A mob, room or object which hasn't been parsed yet. 'loader(vnum)' parses it
+LazyRecord = namedtuple("LazyRecord", "record_cls vnum loader")
+
+# The steps of a compiled reset plan, see Area.compile_resets. 'spawner' is
+# a SpawnHandle, and 'container' and 'mob' are the index of an earlier step
+MobSpawnStep = namedtuple("MobSpawnStep", "spawner room global_limit local_limit")
+ObjSpawnStep = namedtuple("ObjSpawnStep", "spawner room")
+ObjInObjStep = namedtuple(
+    "ObjInObjStep", "spawner global_limit container_vnum container local_limit"
+)
+GiveObjStep = namedtuple("GiveObjStep", "spawner mob")
+EquipObjStep = namedtuple("EquipObjStep", "spawner mob wear_slot")
+SetDoorStep = namedtuple("SetDoorStep", "exit door_state")
 
-                if last and type(last).__name__ == "Mobile":
-                    if gsp.contains(SpawnPoolType.OBJ, obj_vnum):
-                        obj = gsp.spawn(SpawnPoolType.OBJ, obj_vnum)
-                        last.equip(obj, wear_slot)
-                    else:
-                        print(f"WARNING: Obj {obj_vnum} not in global spawn pool")
-                else:
-                    # TODO: There's a case here where the mob already existed
-                    # so it didn't get reset and therefore won't get an item
-                    # reset to it (since it wasn't newly created). I have to figure
-                    # out if this is the intended behavior or if I should look up
-                    # the mob in the area and give it the item if it doesn't exist
-                    print("Skipping as the last thing loaded wasn't a mob..")
 
-                    last = None
-            elif reset["action"] == ResetAction.SET_DOOR:
-                room_vnum = values[1]
-                direction = code_to_direction[int(values[2])]
-                door_state = DoorState(int(values[3]))
+def _load_area_header(lexer):
+    filename = lexer.read_until_tilde()
+    name = lexer.read_until_tilde()
 
-                rm = self.rooms[room_vnum]
-                rm.exits[direction]['door_state'] = door_state
+    lexer.read_letter()  # {
 
-            last_reset = reset
+    raw_level_str = lexer.read_until_delimiter("}")
+    if "All" in raw_level_str:
+        level_min = 1
+        level_max = 999
+    else:
+        level_min, level_max = raw_level_str.split()
 
-    @staticmethod
-    def load_area_block(fp, area):
-        area.filename = read_until_tilde(fp)
-        area.name = read_until_tilde(fp)
+    description = lexer.read_until_tilde().strip()
 
-        read_letter(fp)  # {
+    vnum_min = lexer.read_number()
+    vnum_max = lexer.read_number()
 
-        raw_level_str = read_until_delimiter(fp, "}")
-        if "All" in raw_level_str:
-            area.level_min = 1
-            area.level_max = 999
-        else:
-            area.level_min, area.level_max = raw_level_str.split()
+    lexer.readline()
 
-        area.description = read_until_tilde(fp).strip()
+    return AreaHeader(
+        filename, name, level_min, level_max, description, vnum_min, vnum_max
+    )
 
-        area.vnum_min = read_number(fp)
-        area.vnum_max = read_number(fp)
 
-        fp.readline()
+def _load_record(record_cls, text, offset, vnum):
+    return record_cls.load_from_file(AreaLexer(text, offset))
 
-    @classmethod
-    def load_from_file(cls, fp, gsp=None):
-        area = cls()
 
-        while True:
-            line_header = fp.readline()
-            if "#AREA" in line_header:
-                Area.load_area_block(fp, area)
-            elif "#MOBILES" in line_header:
-                next_line = peek_next_line(fp)
-                next_line = next_line.strip()
-
-                while next_line != "#0":
-                    mob = Mobile.load_from_file(fp)
-                    area.mobs[mob.vnum] = mob
-
-                    next_line = peek_next_line(fp)
-                    next_line = next_line.strip()
-
-                # Advance past #0
-                fp.readline()
-            elif "#ROOMS" in line_header:
-                next_line = peek_next_line(fp)
-                next_line = next_line.strip()
-
-                while next_line != "#0":
-                    room = Room.load_from_file(fp)
-                    area.rooms[room.vnum] = room
-
-                    next_line = peek_next_line(fp)
-                    next_line = next_line.strip()
-
-                # Advance past #0
-                fp.readline()
-            elif "#OBJECTS" in line_header:
-                next_line = peek_next_line(fp)
-                next_line = next_line.strip()
-
-                while next_line != "#0":
-                    obj = Object.load_from_file(fp)
-                    area.objects[obj.vnum] = obj
-
-                    next_line = peek_next_line(fp)
-                    next_line = next_line.strip()
-
-                # Advance past #0
-                fp.readline()
-            elif "#RESETS" in line_header:
-                next_line = peek_next_line(fp)
-                next_line = next_line.strip()
-
-                while next_line != "S":
-                    reset_line = fp.readline()
-
-                    if "\t" in reset_line:
-                        reset_line = reset_line.split("\t", 1)[0]
-
-                    reset_line_parts = reset_line.split()
-                    reset_info = {
-                        "action": ResetAction(reset_line_parts[0]),
-                        "values": reset_line_parts[1:],
-                    }
-                    area.resets.append(reset_info)
-
-                    next_line = peek_next_line(fp)
-                    next_line = next_line.strip()
-
-                # Advance past #0
-                fp.readline()
-            elif line_header == "\n":
-                continue
-            elif line_header == "":
-                break
-            else:
-                continue
+def _index_section(lexer, record_cls):
+    # Finds where each record in the section starts without parsing them
+    end = _SECTION_END_RE.search(lexer.text, lexer.pos)
+    end = end.start() if end else len(lexer.text)
 
-        # If we're passing in a spawn pool, add relevant items to their pools
-        if gsp:
-            for obj_vnum in area.objects:
-                gsp.add(SpawnPoolType.OBJ, obj_vnum, area.objects[obj_vnum])
+    for match in _RECORD_START_RE.finditer(lexer.text, lexer.pos, end):
+        yield LazyRecord(
+            record_cls,
+            match.group(1),
+            partial(_load_record, record_cls, lexer.text, match.start()),
+        )
 
-            for mob_vnum in area.mobs:
-                gsp.add(SpawnPoolType.MOB, mob_vnum, area.mobs[mob_vnum])
+    # Advance past #0
+    lexer.pos = end
+    lexer.readline()
 
-        return area
+
+def _load_section(lexer, record_cls):
+    next_line = lexer.peek_next_line()
+    next_line = next_line.strip()
+
+    while next_line != "#0":
+        yield record_cls.load_from_file(lexer)
+
+        next_line = lexer.peek_next_line()
+        next_line = next_line.strip()
+
+    # Advance past #0
+    lexer.readline()
+
+
+def _load_resets(lexer):
+    next_line = lexer.peek_next_line()
+    next_line = next_line.strip()
+
+    while next_line != "S":
+        reset_line = lexer.readline()
+
+        if "\t" in reset_line:
+            reset_line = reset_line.split("\t", 1)[0]
+
+        reset_line_parts = reset_line.split()
+        yield AreaReset(ResetAction(reset_line_parts[0]), reset_line_parts[1:])
+
+        next_line = lexer.peek_next_line()
+        next_line = next_line.strip()
+
+    # Advance past S
+    lexer.readline()
+
+
+def iter_area_records(fp, lazy=False):
+    """Yields the records in an open .are file or an AreaLexer one at a
+    time, in the order they appear: an AreaHeader, then Mobile, Room and
+    Object records and AreaResets. Nothing is kept once it's been yielded,
+    so tools can check or convert any number of areas without building
+    them all in memory.
+
+    If 'lazy' is True, mobs, rooms and objects are yielded as LazyRecords
+    without being parsed.
+    """
+    lexer = AreaLexer.from_file(fp)
+    sections = {"#MOBILES": Mobile, "#ROOMS": Room, "#OBJECTS": Object}
+
+    while True:
+        line_header = lexer.readline()
+        if "#AREA" in line_header:
+            yield _load_area_header(lexer)
+        elif "#RESETS" in line_header:
+            yield from _load_resets(lexer)
+        elif line_header == "":
+            break
+        else:
+            for section, record_cls in sections.items():
+                if section in line_header:
+                    if lazy:
+                        yield from _index_section(lexer, record_cls)
+                    else:
+                        yield from _load_section(lexer, record_cls)
+                    break
@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import os
+import pickle
+
+from poff_mud.area import Area, AREA_LOADER_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Compiled areas are written next to the .are file with this added to its name
+CACHE_SUFFIX = ".cache"
+
+
+def cache_path(path):
+    return path + CACHE_SUFFIX
+
+
+def _cache_key(path):
+    # An area is only loaded from its cache if the .are file is byte for byte
+    # the same as when the cache was written, and by the same loader
+    with open(path, "rb") as fp:
+        digest = hashlib.sha256(fp.read()).hexdigest()
+
+    return (AREA_LOADER_VERSION, digest)
+
+
+def _read_cache(path, key):
+    try:
+        with open(cache_path(path), "rb") as fp:
+            # The key is pickled on its own in front of the area so we can
+            # check it before unpickling the rest
+            if pickle.load(fp) != key:
+                return None
+
+            return pickle.load(fp)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("Ignoring unreadable area cache %s: %s", cache_path(path), e)
+        return None
+
+
+def _write_cache(path, key, area):
+    # Write to a temporary file first so a crash can't leave half a cache
+    temp_path = f"{cache_path(path)}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as fp:
+            pickle.dump(key, fp, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(area, fp, pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temp_path, cache_path(path))
+    except OSError as e:
+        logger.warning("Couldn't write area cache %s: %s", cache_path(path), e)
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_area(path, gsp=None, use_cache=True, lazy=False):
+    """Loads the area in the .are file at 'path', using the compiled copy
+    from the last time it was loaded if the file hasn't changed since.
+    Otherwise the file is parsed and a new compiled copy written.
+
+    Lazily loaded areas (see Area.load_from_file) don't use the cache, as
+    they're quicker to index than to unpickle.
+    """
+    if not use_cache or lazy:
+        with open(path) as fp:
+            return Area.load_from_file(fp, gsp=gsp, lazy=lazy)
+
+    key = _cache_key(path)
+
+    area = _read_cache(path, key)
+    if area is None:
+        with open(path) as fp:
+            area = Area.load_from_file(fp)
+
+        _write_cache(path, key, area)
+
+    if gsp:
+        area.add_to_spawn_pool(gsp)
+
+    return area
@@ -0,0 +1,210 @@
+import logging
+import random
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# How often each area ages, as ROM's PULSE_AREA. Every area gets its own
+# timer and each pulse is somewhere between half and one and a half of
+# this, so areas don't all age, and reset, at the same moment
+AREA_PULSE_MS = 120_000
+
+# As in ROM's area_update, counted in pulses. Nothing resets before
+# MIN_AGE. After that an area players have been in since its last reset
+# resets once they've all left, or at OCCUPIED_AGE if they haven't. Areas
+# nobody has been in wait until MAX_AGE
+MIN_AGE = 3
+OCCUPIED_AGE = 15
+MAX_AGE = 31
+
+# How long resets may take each tick. Once a tick has spent this long the
+# rest is left for the next ticks
+RESET_BUDGET_MS = 0.5
+
+
+class AreaState:
+    """How an area is doing between resets"""
+
+    __slots__ = (
+        "area",
+        "age",
+        "empty",
+        "queued",
+        "resets",
+        "last_reset_ms",
+        "total_reset_ms",
+    )
+
+    def __init__(self, area):
+        self.area = area
+        # Pulses since the last reset
+        self.age = 0
+        # Whether nobody has been in the area since it last reset. Players
+        # are looked for on each pulse
+        self.empty = False
+        # Whether it's waiting for its turn to reset
+        self.queued = False
+
+        self.resets = 0
+        self.last_reset_ms = None
+        self.total_reset_ms = 0.0
+
+
+class AreaUpdater:
+    """Resets areas periodically like ROM's area_update: each area ages on
+    its own timer and once it's old enough it's queued to be reset. Areas
+    which players are in are left alone for longer.
+
+    run() is called once per tick and resets queued areas until the tick's
+    reset budget is used up, so areas which come due together, or one big
+    area, are reset over several ticks rather than in one long one.
+    """
+
+    def __init__(
+        self,
+        areas,
+        gsp,
+        gs,
+        pulse_ms=AREA_PULSE_MS,
+        budget_ms=RESET_BUDGET_MS,
+        rng=None,
+    ):
+        self.gsp = gsp
+        self.gs = gs
+        self.pulse_ms = pulse_ms
+        self.budget_ms = budget_ms
+        self.rng = rng or random.Random()
+
+        self.states = {area: AreaState(area) for area in areas}
+        self._queue = deque()
+        self.timer_manager = None
+
+        # The area run() is part way through resetting, its reset_steps()
+        # and the time spent on it so far
+        self._resetting = None
+        self._steps = None
+        self._reset_ms = 0.0
+
+    def start(self, timer_manager):
+        """Starts every area's pulse timer. The first pulses are spread out
+        across one pulse
+        """
+        self.timer_manager = timer_manager
+
+        for state in self.states.values():
+            self._schedule_pulse(state, self.rng.randrange(self.pulse_ms))
+
+    def _schedule_pulse(self, state, delay_ms):
+        def pulse():
+            self.age_area(state.area)
+            self._schedule_pulse(
+                state,
+                self.rng.randint(self.pulse_ms // 2, self.pulse_ms * 3 // 2),
+            )
+
+        self.timer_manager.add_timer(delay_ms, pulse)
+
+    def count_players(self, area):
+        """How many players are in 'area' right now"""
+        count = 0
+        for player in self.gs.players.values():
+            if player["room"] is not None and player["room"] in area.rooms:
+                count += 1
+
+        return count
+
+    def age_area(self, area):
+        """Ages 'area' by one pulse and queues it to be reset if it's due"""
+        state = self.states[area]
+        state.age += 1
+        if state.age < MIN_AGE or state.queued:
+            return
+
+        players = self.count_players(area)
+        if players > 0:
+            state.empty = False
+
+        if (not state.empty and (players == 0 or state.age >= OCCUPIED_AGE)) or (
+            state.age >= MAX_AGE
+        ):
+            state.queued = True
+            self._queue.append(state)
+
+    def reset_area(self, area):
+        """Resets 'area' now, all in one go, recording how long it took"""
+        start = time.perf_counter()
+        area.reset(self.gsp)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self._reset_done(self.states[area], elapsed_ms)
+        return elapsed_ms
+
+    def _reset_done(self, state, elapsed_ms):
+        logger.debug("Reset %s in %.3f ms", state.area.filename, elapsed_ms)
+
+        state.resets += 1
+        state.last_reset_ms = elapsed_ms
+        state.total_reset_ms += elapsed_ms
+
+        # Areas start ageing again from a random age, 0 to 3 as in ROM, so
+        # they drift apart
+        state.age = self.rng.randint(0, 3)
+        state.empty = self.count_players(state.area) == 0
+        state.queued = False
+
+    def reset_all(self):
+        """Resets every area at once, as at startup"""
+        for area in self.states:
+            self.reset_area(area)
+
+    def run(self):
+        """Carries on resetting the queued areas, oldest first, until this
+        tick's budget is used up. Resets are paused between their steps, so
+        a big area may take several ticks, and at least one step is done
+        each time so they always get finished. Returns how many areas
+        finished resetting
+        """
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        stepped = False
+        done = 0
+
+        while self._resetting is not None or self._queue:
+            if self._resetting is None:
+                self._resetting = self._queue.popleft()
+                self._steps = self._resetting.area.reset_steps(self.gsp)
+                self._reset_ms = 0.0
+
+            start = time.perf_counter()
+            finished = True
+            for _ in self._steps:
+                if stepped and time.perf_counter() >= deadline:
+                    finished = False
+                    break
+                stepped = True
+            self._reset_ms += (time.perf_counter() - start) * 1000
+
+            if not finished:
+                break
+
+            self._reset_done(self._resetting, self._reset_ms)
+            self._resetting = None
+            self._steps = None
+            done += 1
+
+        return done
+
+    @property
+    def queued(self):
+        """How many areas are waiting to be reset, or part way through"""
+        return len(self._queue) + (self._resetting is not None)
+
+    def reset_durations(self):
+        """Returns how long each area's last reset took in milliseconds, by
+        area file name. Areas which haven't been reset yet are left out
+        """
+        return {
+            state.area.filename: state.last_reset_ms
+            for state in self.states.values()
+            if state.last_reset_ms is not None
+        }
@@ -38,6 +38,18 @@ class EquipmentSlot(Enum):
 
 
 class Character:
+    __slots__ = (
+        "level",
+        "hp",
+        "max_hp",
+        "mana",
+        "max_mana",
+        "move",
+        "max_move",
+        "inventory",
+        "equipment",
+    )
+
     def __init__(self):
         self.level = 1
 
@@ -81,7 +93,7 @@ class Character:
         # it in the inventory
         if self.equipment[slot]:
             already_eqd_obj = self.equipment[slot]
-            self.inventory.push(already_eqd_obj)
+            self.inventory.append(already_eqd_obj)
 
         # Equip the item
         self.equipment[slot] = obj
@@ -1,5 +1,6 @@
 from termcolor import colored
 
+from poff_mud.indexed_contents import parse_ordinal
 from poff_mud.room import code_to_direction, exit_shorthand_to_dir
 from poff_mud.room_utils import get_room_display_str
 from .base_command import BaseCommand
@@ -14,19 +15,29 @@ class LookCommand(BaseCommand):
         rm = self.gs.rooms[player["room"]]
 
         if params:
-            # Look at mobs
-            for m in rm.mobs:
-                for kw in m.keywords:
-                    if params == kw:
-                        yield m.look_desc
-                        return
-
-            # Look at objects
-            for o in rm.objects:
-                for kw in o.extra_description:
-                    if params == kw:
-                        yield o.extra_description[kw]
-                        return
+            # Look at mobs. Mobs and objects can be numbered, e.g.
+            # 'look 2.guard' for the second guard
+            m = rm.mobs.find(params)
+            if m is not None:
+                yield m.look_desc
+                return
+
+            # Look at objects, showing their extra description for the
+            # keyword if they have one. Keywords are matched ignoring case,
+            # as find does
+            o = rm.objects.find(params)
+            if o is not None:
+                _, keyword = parse_ordinal(params)
+                keyword = keyword.casefold()
+                yield next(
+                    (
+                        desc
+                        for k, desc in o.extra_description.items()
+                        if k.casefold() == keyword
+                    ),
+                    o.long_desc,
+                )
+                return
 
             # TODO: Look at players
 
@@ -34,8 +34,13 @@ class MoveCommand(BaseCommand):
 
         ex = exit_shorthand_to_dir.get(ex, ex)
 
+        # exits can lead into areas which haven't been loaded. Treat those
+        # as blocked rather than letting the lookup below fail
+        if ex in rm.exits and rm.exits[ex]["exit_vnum"] not in self.gs.rooms:
+            yield "You can't go that way right now."
+
         # if the specified exit is found in the room's exits list
-        if ex in rm.exits:
+        elif ex in rm.exits:
 
             # go through all the gs.players in the game
             for pid, pl in self.gs.players.items():
@@ -1,14 +1,103 @@
-from copy import deepcopy
+from copy import copy, deepcopy
+
+
+def _own_attributes(obj):
+    # The attributes set on 'obj' itself, whether they're kept in slots or
+    # in its __dict__. Unset slots are left out
+    attributes = {}
+    for cls in reversed(type(obj).__mro__):
+        for name in cls.__dict__.get("__slots__", ()):
+            try:
+                attributes[name] = object.__getattribute__(obj, name)
+            except AttributeError:
+                pass
+
+    try:
+        attributes.update(object.__getattribute__(obj, "__dict__"))
+    except AttributeError:
+        pass
+
+    return attributes
+
+
+# Class -> the names _shared_slots returns for it
+_shared_slot_names = {}
+
+
+def _shared_slots(cls):
+    # The slots an instance of 'cls' shares with its prototype: all of them
+    # but its instance attributes and the prototype itself
+    names = []
+    for base in reversed(cls.__mro__):
+        for name in base.__dict__.get("__slots__", ()):
+            if name != "prototype" and name not in cls.instance_attributes:
+                names.append(name)
+
+    return tuple(names)
 
 
 class Copyable:
+    # Subclasses using __slots__ need a "prototype" slot. Copyable itself
+    # has no slots so it can be mixed in with other slotted classes
+    __slots__ = ()
+
+    # Attributes which are changed in place, like inventory lists. Every
+    # instance spawned from a prototype gets its own shallow copy of these.
+    # Everything else is shared with the prototype until the instance
+    # assigns its own value, so shared containers like dicts must be
+    # replaced rather than changed in place
+    instance_attributes = ()
+
+    def spawn(self):
+        """Returns a new instance of this prototype which shares everything
+        but its instance attributes with it
+        """
+        cls = self.__class__
+        instance = cls.__new__(cls)
+
+        # The instance's slots point at the same values as the prototype's,
+        # so reading them is as quick as on any other object and takes no
+        # more memory than the slots themselves
+        names = _shared_slot_names.get(cls)
+        if names is None:
+            names = _shared_slot_names[cls] = _shared_slots(cls)
+        for name in names:
+            try:
+                setattr(instance, name, getattr(self, name))
+            except AttributeError:
+                pass
+
+        instance.prototype = self
+        for name in cls.instance_attributes:
+            setattr(instance, name, copy(getattr(self, name)))
+
+        return instance
+
+    def __getattr__(self, name):
+        # Only called when the instance doesn't have the attribute itself,
+        # e.g. one the prototype had no value for when it was spawned, in
+        # which case it's the prototype's
+        try:
+            prototype = object.__getattribute__(self, "prototype")
+        except AttributeError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+
+        return getattr(prototype, name)
+
     def __deepcopy__(self, memo):
         cls = self.__class__  # Extract the class of the object
         result = cls.__new__(
             cls
         )  # Create a new instance of the object based on extracted class
         memo[id(self)] = result
-        for k, v in self.__dict__.items():
+        for k, v in _own_attributes(self).items():
+            # Copies of an instance share its prototype
+            if k == "prototype":
+                setattr(result, k, v)
+                continue
+
             setattr(
                 result, k, deepcopy(v, memo)
             )  # Copy over attributes by copying directly or in case of complex objects like lists for exaample calling the `__deepcopy()__` method defined by them. Thus recursively copying the whole tree of objects.
@@ -3,8 +3,12 @@ from enum import EnumMeta
 
 class EnumContains(EnumMeta):
     def __contains__(cls, item):
+        # True for members and for the values of members
+        if isinstance(item, cls):
+            return True
+
         try:
-            cls(item)
-        except ValueError:
+            return item in cls._value2member_map_
+        except TypeError:
+            # Unhashable, so it can't be a value
             return False
-        return True
@@ -1,108 +1,122 @@
-def peek_next_line(fp):
-    pos = fp.tell()
-    line = fp.readline()
-    fp.seek(pos)
+import re
 
-    return line
+# Fields in the area files are separated by spaces and newlines. Tabs are
+# part of the field they're in. Each pattern matches a field along with the
+# one separator after it, and the last also skips any separators before it
+_FIELD_RE = re.compile(r"([^ \n]*)[ \n]?")
+_QUOTED_RE = re.compile(r"([^']*)'?")
+_STRING_PART_RE = re.compile(r"([^ \n']*)([ \n']?)")
+_SPACED_FIELD_RE = re.compile(r"[ \n]*([^ \n]*)[ \n]?")
 
 
-def read_until_delimiter(fp, demlimiter):
-    result = ""
-    last_char = ""
+class AreaLexer:
+    """Reads the fields of an area file.
 
-    # Skip through until we get to actual data
-    while last_char in [" ", "\n"]:
-        last_char = fp.read(1)
+    The whole file is held as one string and a cursor is moved along it,
+    so each field is found with a single search rather than by reading
+    one character at a time.
+    """
 
-    while True:
-        last_char = fp.read(1)
-
-        if last_char == demlimiter:
-            break
-        elif last_char == "":
-            # EOF
-            return result
-
-        result = result + last_char
-
-    return result
+    def __init__(self, text, pos=0):
+        self.text = text
+        self.pos = pos
 
+    @classmethod
+    def from_file(cls, fp):
+        """Returns a lexer for the rest of an open area file, which is
+        read to the end. If given a lexer, returns it unchanged so loaders
+        can take either. Only use this where the whole rest of the file
+        is to be read, as in iter_area_records; loaders for single
+        records, like Room.load_from_file, take a lexer.
+        """
+        if isinstance(fp, cls):
+            return fp
 
-def read_until_tilde(fp):
-    result = read_until_delimiter(fp, "~")
+        return cls(fp.read())
 
-    # TODO: This next line is a little hacky and might
-    # cause confusion as we read one more character in order
-    # to skip past the newline character or a space after the tilde.
-    # This works for the use case of the area files since there is
-    # almost always one of those delimter characters following the tilde
-    fp.read(1)
+    def read(self, count=1):
+        result = self.text[self.pos : self.pos + count]
+        self.pos += len(result)
 
-    return result
+        return result
 
+    def readline(self):
+        end = self.text.find("\n", self.pos)
+        end = len(self.text) if end == -1 else end + 1
 
-def read_flagset(fp):
-    flagset = []
+        line = self.text[self.pos : end]
+        self.pos = end
 
-    last_char = fp.read(1)
-    while last_char not in [" ", "\n"]:
-        if last_char != "0":
-            flagset.append(last_char)
+        return line
 
-        last_char = fp.read(1)
+    def peek_next_line(self):
+        end = self.text.find("\n", self.pos)
+        end = len(self.text) if end == -1 else end + 1
 
-    return flagset
+        return self.text[self.pos : end]
 
+    def read_until_delimiter(self, delimiter):
+        end = self.text.find(delimiter, self.pos)
+        if end == -1:
+            # EOF
+            result = self.text[self.pos :]
+            self.pos = len(self.text)
+            return result
 
-def read_string(fp):
-    result = ""
-
-    last_char = fp.read(1)
-
-    # Skip through until we get to actual data
-    while last_char in [" ", "\n"]:
-        last_char = fp.read(1)
+        result = self.text[self.pos : end]
+        self.pos = end + 1
 
-    quote_mode = False
-    while quote_mode or last_char not in [" ", "\n"]:
-        if last_char == "'":
-            quote_mode = not quote_mode
-        else:
-            result = result + last_char
+        return result
 
-        last_char = fp.read(1)
+    def read_until_tilde(self):
+        result = self.read_until_delimiter("~")
 
-    return result
+        # TODO: This next line is a little hacky and might
+        # cause confusion as we read one more character in order
+        # to skip past the newline character or a space after the tilde.
+        # This works for the use case of the area files since there is
+        # almost always one of those delimter characters following the tilde
+        self.read(1)
 
+        return result
 
-def read_number(fp, delimiter_group=[" ", "\n"]):
-    result = ""
+    def _match(self, pattern):
+        match = pattern.match(self.text, self.pos)
+        self.pos = match.end()
 
-    last_char = fp.read(1)
+        return match
 
-    # Skip through until we get to actual data
-    while last_char in [" ", "\n"]:
-        last_char = fp.read(1)
+    def read_flagset(self):
+        # Zeroes mean no flags at all
+        return [c for c in self._match(_FIELD_RE).group(1) if c != "0"]
 
-    while last_char not in delimiter_group:
-        result = result + last_char
+    def read_string(self):
+        while self.text[self.pos : self.pos + 1] in (" ", "\n"):
+            self.pos += 1
 
-        last_char = fp.read(1)
+        # Quotes can wrap parts of the string containing spaces. The
+        # quotes themselves are dropped
+        match = self._match(_STRING_PART_RE)
+        if match.group(2) != "'":
+            return match.group(1)
 
-    if result == "":
-        return 0
+        parts = [match.group(1)]
+        while match.group(2) == "'":
+            parts.append(self._match(_QUOTED_RE).group(1))
 
-    return int(result)
+            match = self._match(_STRING_PART_RE)
+            parts.append(match.group(1))
 
+        return "".join(parts)
 
-def read_letter(fp):
-    """Read the next A-Z letter"""
-    last_char = fp.read(1)
-    while last_char in [" ", "\n"] and last_char.isnumeric():
-        last_char = fp.read(1)
+    def read_number(self):
+        result = self._match(_SPACED_FIELD_RE).group(1)
+        if result == "":
+            return 0
 
-    if last_char == "":
-        return ""
+        return int(result)
 
-    # CAREFUL! This does not move past the next whitespace/newline
-    return last_char
+    def read_letter(self):
+        """Read the next A-Z letter"""
+        # CAREFUL! This does not move past the next whitespace/newline
+        return self.read(1)
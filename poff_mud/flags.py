@@ -0,0 +1,61 @@
+from enum import IntFlag
+
+# ROM's flag letters, lowest bit first. A to Z are bits 0 to 25 and a to f
+# carry on from bit 26
+_CODE_BITS = {
+    code: 1 << bit for bit, code in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdef")
+}
+
+
+def code_bit(code):
+    """Returns the bit for a ROM flag letter, or 0 if it isn't one"""
+    return _CODE_BITS.get(code, 0)
+
+
+class RomFlag(IntFlag):
+    """Flags read from the letter codes in area files, e.g. "ABT", held as
+    the bits of one number as ROM does. Testing for a flag is a single
+    bitwise and, and sets of flags can be combined with | & and ~.
+
+    Members are declared with the bit for their letter:
+
+        class ActFlag(RomFlag):
+            NPC = code_bit("A")
+    """
+
+    @classmethod
+    def from_codes(cls, codes):
+        """Returns the flags for the letters in 'codes'. Letters which
+        aren't one of the flags are ignored
+        """
+        bits = 0
+        for code in codes:
+            bits |= code_bit(code)
+
+        return cls(bits & sum(cls))
+
+    @property
+    def codes(self):
+        """The letters for the flags that are set, as in the area files"""
+        return "".join(code for code, bit in _CODE_BITS.items() if bit & self._value_)
+
+    def __iter__(self):
+        # Flags are only iterable from Python 3.11, so this gives the flags
+        # that are set, lowest bit first, as 3.11 does
+        cls = self.__class__
+        return (cls(bit) for bit in _CODE_BITS.values() if bit & self._value_)
+
+    def __contains__(self, flag):
+        # Done on the values, as Flag's own check is several times slower
+        # than the list scans these replaced
+        if type(flag) is self.__class__:
+            return flag._value_ & self._value_ == flag._value_
+
+        # Flags used to be lists of names like "stay area" or "NPC", so
+        # those are still understood. Unknown names are never set
+        if isinstance(flag, str):
+            flag = self.__class__.__members__.get(flag.upper().replace(" ", "_"))
+            if flag is None:
+                return False
+
+        return super().__contains__(flag)
@@ -0,0 +1,101 @@
+from itertools import islice
+
+
+def parse_ordinal(name):
+    """Splits a name like "2.sword", meaning the second sword, into its
+    number and keyword, as ROM's number_argument does. Names without a
+    number are the first one: "sword" is (1, "sword")
+    """
+    number, dot, keyword = name.partition(".")
+    if dot and number.isdigit():
+        return int(number), keyword
+
+    return 1, name
+
+
+class IndexedContents:
+    """The mobs or objects in a room. They're kept in the order they were
+    added, like a list, along with indexes of them by vnum and by keyword
+    so they can be counted or found without going through them all.
+
+    'keywords_of' returns the keywords an instance can be found by. They
+    are matched without case
+    """
+
+    __slots__ = ("keywords_of", "_instances", "_by_vnum", "_by_keyword")
+
+    def __init__(self, keywords_of):
+        self.keywords_of = keywords_of
+
+        # The dicts are used as ordered sets, their values are unused
+        self._instances = {}
+        # vnum -> its instances here
+        self._by_vnum = {}
+        # keyword -> instances here with it
+        self._by_keyword = {}
+
+    def append(self, instance):
+        self._instances[instance] = None
+        self._by_vnum.setdefault(instance.vnum, {})[instance] = None
+        for keyword in _folded(self.keywords_of(instance)):
+            self._by_keyword.setdefault(keyword, {})[instance] = None
+
+    def remove(self, instance):
+        del self._instances[instance]
+        _discard(self._by_vnum, instance.vnum, instance)
+        for keyword in _folded(self.keywords_of(instance)):
+            _discard(self._by_keyword, keyword, instance)
+
+    def count_vnum(self, vnum):
+        """How many instances of 'vnum' are here"""
+        return len(self._by_vnum.get(vnum, ()))
+
+    def find(self, name):
+        """Returns the instance 'name' refers to, which may be numbered
+        like "2.sword", or None if there isn't one
+        """
+        number, keyword = parse_ordinal(name)
+        if number < 1:
+            return None
+
+        matches = self._by_keyword.get(keyword.casefold(), ())
+        return next(islice(matches, number - 1, None), None)
+
+    def __iter__(self):
+        return iter(self._instances)
+
+    def __len__(self):
+        return len(self._instances)
+
+    def __contains__(self, instance):
+        return instance in self._instances
+
+    def __repr__(self):
+        return f"IndexedContents({list(self._instances)})"
+
+
+# keywords -> the same keywords without case. Instances share their
+# prototype's keywords, so there's one of these for each prototype
+_folded_keywords = {}
+
+
+def _folded(keywords):
+    # Keywords are lists when they aren't interned
+    if type(keywords) is not tuple:
+        keywords = tuple(keywords)
+
+    folded = _folded_keywords.get(keywords)
+    if folded is None:
+        folded = _folded_keywords[keywords] = tuple(k.casefold() for k in keywords)
+    return folded
+
+
+def _discard(index, key, instance):
+    # The same keyword may be listed twice, so it may be gone already
+    instances = index.get(key)
+    if instances is None:
+        return
+
+    instances.pop(instance, None)
+    if not instances:
+        del index[key]
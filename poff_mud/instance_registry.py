@@ -0,0 +1,45 @@
+class InstanceRegistry:
+    """Keeps track of every mob and object spawned into the world: how many
+    there are of each item and where each one is. A location is whatever
+    holds the instance, like the room a mob is in, the mob carrying or
+    wearing an object, or the container an object is in.
+
+    Nothing in the game moves an instance to another location or destroys
+    one yet, so locations are where things were spawned. Whatever first
+    does either needs to record it here too.
+    """
+
+    def __init__(self):
+        # instance -> location
+        self._locations = {}
+        # (pool key, item key) -> its instances, oldest first. The dicts
+        # are used as ordered sets, their values are unused
+        self._instances = {}
+
+    def add(self, instance, pool_key, item_key, location=None):
+        """Records a newly spawned instance of 'item_key' from 'pool_key'"""
+        self._locations[instance] = location
+        self._instances.setdefault((pool_key, item_key), {})[instance] = None
+
+    def count(self, pool_key, item_key):
+        """How many instances of 'item_key' there are"""
+        return len(self._instances.get((pool_key, item_key), ()))
+
+    def newest(self, pool_key, item_key):
+        """The instance of 'item_key' spawned last, or None if there aren't
+        any
+        """
+        instances = self._instances.get((pool_key, item_key))
+        if not instances:
+            return None
+
+        return next(reversed(instances))
+
+    def location(self, instance):
+        return self._locations[instance]
+
+    def __contains__(self, instance):
+        return instance in self._locations
+
+    def __len__(self):
+        return len(self._locations)
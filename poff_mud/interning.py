@@ -0,0 +1,35 @@
+import sys
+
+# The area loaders pass the keywords, races, materials and so on they read
+# through here, so that prototypes with the same values share one copy of
+# them. Keywords become tuples, as shared lists could be changed through any
+# one of the things sharing them. Flags don't need this, see poff_mud.flags
+
+# Set to False to have the loaders build their own lists and strings for
+# everything. Only useful for measuring what interning saves
+enabled = True
+
+# Every tuple handed out so far, mapped to itself
+_tuples = {}
+
+
+def intern_string(string):
+    if not enabled:
+        return string
+
+    return sys.intern(string)
+
+
+def intern_tuple(items):
+    if not enabled:
+        return list(items)
+
+    items = tuple(items)
+    return _tuples.setdefault(items, items)
+
+
+def intern_strings(strings):
+    if not enabled:
+        return list(strings)
+
+    return intern_tuple(sys.intern(s) for s in strings)
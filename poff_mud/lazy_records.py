@@ -0,0 +1,57 @@
+from collections.abc import MutableMapping
+
+
+class _Pending:
+    # Stands in for a record that hasn't been built yet
+    __slots__ = ("loader",)
+
+    def __init__(self, loader):
+        self.loader = loader
+
+
+class LazyRecords(MutableMapping):
+    """A dict of records (rooms, mobs, objects...) keyed by vnum, where
+    records can be added as a loader to be called the first time they're
+    looked up. Checking for a vnum or going through the vnums doesn't load
+    anything, but going through the values or items loads everything.
+    """
+
+    def __init__(self, records=None):
+        self._records = {}
+        if records:
+            self._records.update(records)
+
+    def add_lazy(self, key, loader):
+        """Adds the record for 'key', which will be 'loader(key)' once it's
+        first looked up
+        """
+        self._records[key] = _Pending(loader)
+
+    def is_loaded(self, key):
+        return type(self._records[key]) is not _Pending
+
+    def __getitem__(self, key):
+        record = self._records[key]
+        if type(record) is _Pending:
+            record = self._records[key] = record.loader(key)
+
+        return record
+
+    def __setitem__(self, key, record):
+        self._records[key] = record
+
+    def __delitem__(self, key):
+        del self._records[key]
+
+    def __contains__(self, key):
+        return key in self._records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __repr__(self):
+        loaded = sum(1 for key in self._records if self.is_loaded(key))
+        return f"<LazyRecords: {loaded} of {len(self._records)} loaded>"
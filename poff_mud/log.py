@@ -0,0 +1,162 @@
+import atexit
+import logging
+import multiprocessing
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+# Levels for each part of the game, by logger name. Each module logs to its
+# own logger named after it, e.g. poff_mud.area, so these can be set for a
+# whole package or a single module
+DEFAULT_LEVELS = {
+    "poff_mud": logging.INFO,
+}
+
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# The queue log records are put on to be written by the listener, once
+# setup_logging has been called
+_queue = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets through at most 'burst' records with the same message every
+    'period' seconds, so warnings repeated for every area or every reset
+    don't flood the log. Messages are told apart before their arguments
+    are filled in, so "Obj %s not in global spawn pool" is one message
+    whatever the vnum. Only warnings are limited, so errors and anything
+    logged with an exception, e.g. by logger.exception, always get through.
+
+    setup_logging puts it on the handler writing the log, so it sees what
+    every process logs. Records which have been through a queue are told
+    apart by the message they were logged with, see _QueueHandler
+
+    The first record let through after some were held back says how many
+    """
+
+    def __init__(self, burst=5, period=60.0):
+        super().__init__()
+        self.burst = burst
+        self.period = period
+
+        # (logger name, message) -> [window start, records in it, dropped]
+        self._windows = {}
+
+    def filter(self, record):
+        if record.levelno != logging.WARNING or record.exc_info:
+            return True
+        if getattr(record, "had_exc_info", False):
+            return True
+
+        now = time.monotonic()
+        key = (record.name, getattr(record, "unformatted_msg", record.msg))
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= self.period:
+            dropped = window[2] if window is not None else 0
+            window = self._windows[key] = [now, 0, 0]
+            if dropped:
+                record.msg = f"{record.msg} ({dropped} similar messages suppressed)"
+
+        window[1] += 1
+        if window[1] > self.burst:
+            window[2] += 1
+            return False
+
+        return True
+
+
+class _QueueHandler(QueueHandler):
+    # QueueHandler fills the arguments into the message and drops the
+    # exception before putting a record on the queue. RateLimitFilter needs
+    # both, so the message as it was logged, and whether there was an
+    # exception, go along with the record
+    def prepare(self, record):
+        message = record.msg
+        exc_info = record.exc_info
+
+        record = super().prepare(record)
+        record.unformatted_msg = str(message)
+        record.had_exc_info = bool(exc_info)
+        return record
+
+
+class _QueueListener(QueueListener):
+    # Can be stopped more than once, e.g. by whoever set up logging and
+    # then again when the program exits
+    _running = False
+
+    def start(self):
+        super().start()
+        self._running = True
+
+    def stop(self):
+        if self._running:
+            self._running = False
+            super().stop()
+
+
+def setup_logging(level=None, levels=None, stream=None, rate_limit=True):
+    """Sends everything logged to 'stream', by default stdout, from a
+    background thread so the game loop never waits on a write. Records go
+    on a queue and a QueueListener writes them out.
+
+    'levels' maps logger names to levels, on top of DEFAULT_LEVELS. If
+    'level' is given every poff_mud logger uses it instead. Returns the
+    listener, which is stopped when the program exits
+    """
+    global _queue
+
+    levels = {**DEFAULT_LEVELS, **(levels or {})}
+    if level is not None:
+        levels = {name: level for name in levels}
+    for name, name_level in levels.items():
+        logging.getLogger(name).setLevel(name_level)
+
+    # A multiprocessing queue so worker processes, like those loading the
+    # areas, can log through it too
+    _queue = multiprocessing.Queue(-1)
+
+    # The rate limit is applied as records are written, so it covers the
+    # worker processes too
+    handler = logging.StreamHandler(stream or sys.stdout)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    if rate_limit:
+        handler.addFilter(RateLimitFilter())
+    listener = _QueueListener(_queue, handler, respect_handler_level=True)
+    listener.start()
+
+    # Writes out whatever is still queued
+    atexit.register(listener.stop)
+
+    _install_handler(_QueueHandler(_queue))
+
+    return listener
+
+
+def _install_handler(handler):
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    root.addHandler(handler)
+
+
+def _init_worker(queue, levels):
+    for name, level in levels.items():
+        logging.getLogger(name).setLevel(level)
+    _install_handler(_QueueHandler(queue))
+
+
+def worker_initializer():
+    """Returns the initializer and its arguments for a process pool, so that
+    what its workers log is written by this process's listener. If
+    logging hasn't been set up there's no initializer
+    """
+    if _queue is None:
+        return None, ()
+
+    levels = {
+        name: logger.level
+        for name, logger in logging.root.manager.loggerDict.items()
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET
+    }
+    return _init_worker, (_queue, levels)
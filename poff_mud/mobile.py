@@ -1,15 +1,12 @@
+from collections import namedtuple
 from enum import Enum
 from copy import deepcopy
 
-from poff_mud.file_helpers import (
-    read_number,
-    read_string,
-    read_flagset,
-    read_until_tilde,
-)
+from poff_mud.interning import intern_string, intern_strings
 from poff_mud.character import Character
 from poff_mud.copyable import Copyable
-from poff_mud.airv import IRVFlag
+from poff_mud.flags import RomFlag, code_bit
+from poff_mud.airv import AffectFlag, IRVFlag
 
 specific_to_general_damage = {
     "bite": "pierce",
@@ -52,132 +49,114 @@ specific_to_general_damage = {
     "drain": "magic",
 }
 
-code_to_act_flag = {
-    "A": "NPC",  # Mobile is an NPC (set automatically by the game)
-    "B": "sentinel",  # Mobile doesn't wander
-    "C": "scavenger",  # Mobile picks up items on the floor
-    "F": "aggressive",  # Mobile attacks any character in the same room (see the section dealing with aggression)
-    "G": "stay area",  # Mobile will not, leave a zone (this should be set)
-    "H": "wimpy",  # Mobile will fly when badly hurt
-    "I": "pet",  # Mobile is a pet (and hence safe from attack)
-    "J": "train",  # Mobile can train statistics
-    "K": "practice",  # Mobile can practice statistics
-    "O": "undead",  # Mobile has special undead powers (i.e. life draining)
-    "Q": "cleric",  # Mobile has cleric casting powers
-    "R": "mage",  # Mobile has mage casting powers
-    "S": "thief",  # Mobile has thief combat skills (backstab, etc.)
-    "T": "warrior",  # Mobile has warrior combat skills (disarm, parry, etc.)
-    "U": "noalign",  # Mobile is unaligned (unintelligent animals, golems, etc.)
-    "V": "nopurge",  # Mobile isn't removed by the purge command
-    "W": "outdoors",  # Mobile will not wander outside a building
-    "Y": "indoors",  # Mobile will not wander into a building
-    "a": "healer",  # Mobile can heal characters (i.e. the heal command)
-    "b": "gain",  # Mobile can grant new skills (i.e. the gain command)
-    "c": "update",  # Mobile is always updated, even in idle zones (rarely needed)
-    "d": "changer",  # Mobile can change coins (i.e. Otho the Money Changer)
-}
-
-code_to_affect_flag = {
-    "B": "invisible",  # Mobile is invisible
-    "C": "detect evil",  # Mobile can sense evil
-    "D": "detect invis",  # Mobile can see invisible. **
-    "E": "detect magic",  # Mobile can see magic
-    "F": "detect hide",  # Mobile can see hidden (sneaking/hiding) characters
-    "G": "detect good",  # Mobile can sense good
-    "H": "sanctuary",  # Mobile is protected by a sanctuary spell. **
-    "I": "faerie fire",  # Mobile is surrounded by faerie fire (a hindrance)
-    "J": "infravision",  # Mobile can see heat sources in the dark
-    "N": "protect evil",  # Mobile takes less damage from evil characters
-    "O": "protect good",  # Mobile takes less damage from good characters
-    "P": "sneaking",  # Mobile is sneaking (hard to detect while moving)
-    "Q": "hiding",  # Mobile is hiding (cannot be seen without detect hidden)
-    "T": "flying",  # Mobile is flying
-    "U": "pass door",  # Mobile can walk through closed doors
-    "V": "haste",  # Mobile is affected by a haste spell
-    "Z": "dark vision",  # Mobile can see in the dark without a light source
-    "b": "swimming",  # Mobile is swimming (or capable of swimming)
-    "c": "regeneration",  # Mobile recovers hit points and mana faster than usual
-}
-
-code_to_offensive_flag = {
-    "A": "area attack",  # Mobile hits all characters fighting against it. Very powerful.
-    "B": "backstab",  # Mobile can backstab to start a combat
-    "C": "bash",  # Mobile can bash characters off their feet
-    "D": "berserk",  # Mobile may go berserk in a fight
-    "E": "disarm",  # Mobile can disarm _without_ a weapon wielded**
-    "F": "dodge",  # Mobile dodges blows
-    "G": "fade",  # Mobile can fade "out of phase" to avoid blows
-    "H": "fast",  # Mobile is faster than most others, so has extra attacks
-    "I": "kick",  # Mobile can kick in combat for extra damage
-    "J": "kick dirt",  # Mobile kicks dirt, blinding opponents
-    "K": "parry",  # Mobile can parry _without_ a weapon wielded**
-    "L": "rescue",  # Mobile may rescue allies in a fight
-    "M": "tail",  # Mobile can legsweep with its tail or tentacles
-    "N": "trip",  # Mobile trips in combat
-    "O": "crush",  # Mobile can crush opponents in its arms
-    "P": "all",  # Mobile helps all other mobiles in combat
-    "Q": "align",  # Mobile assists mobiles of like alignment
-    "R": "race",  # Mobile will assist other mobiles of the same race
-    "S": "players",  # Mobile will assist players (by race/alignment)
-    "T": "guard",  # Mobile assists as a cityguard
-    "U": "vnum",  # Mobile assists mobiles of the same number only
-}
 
-code_to_form_flag = {
+class ActFlag(RomFlag):
+    NPC = code_bit("A")  # Mobile is an NPC (set automatically by the game)
+    SENTINEL = code_bit("B")  # Mobile doesn't wander
+    SCAVENGER = code_bit("C")  # Mobile picks up items on the floor
+    # Mobile attacks any character in the same room (see the section dealing with aggression)
+    AGGRESSIVE = code_bit("F")
+    STAY_AREA = code_bit("G")  # Mobile will not, leave a zone (this should be set)
+    WIMPY = code_bit("H")  # Mobile will fly when badly hurt
+    PET = code_bit("I")  # Mobile is a pet (and hence safe from attack)
+    TRAIN = code_bit("J")  # Mobile can train statistics
+    PRACTICE = code_bit("K")  # Mobile can practice statistics
+    UNDEAD = code_bit("O")  # Mobile has special undead powers (i.e. life draining)
+    CLERIC = code_bit("Q")  # Mobile has cleric casting powers
+    MAGE = code_bit("R")  # Mobile has mage casting powers
+    THIEF = code_bit("S")  # Mobile has thief combat skills (backstab, etc.)
+    WARRIOR = code_bit("T")  # Mobile has warrior combat skills (disarm, parry, etc.)
+    NOALIGN = code_bit("U")  # Mobile is unaligned (unintelligent animals, golems, etc.)
+    NOPURGE = code_bit("V")  # Mobile isn't removed by the purge command
+    OUTDOORS = code_bit("W")  # Mobile will not wander outside a building
+    INDOORS = code_bit("Y")  # Mobile will not wander into a building
+    HEALER = code_bit("a")  # Mobile can heal characters (i.e. the heal command)
+    GAIN = code_bit("b")  # Mobile can grant new skills (i.e. the gain command)
+    # Mobile is always updated, even in idle zones (rarely needed)
+    UPDATE = code_bit("c")
+    CHANGER = code_bit("d")  # Mobile can change coins (i.e. Otho the Money Changer)
+
+
+class OffensiveFlag(RomFlag):
+    # Mobile hits all characters fighting against it. Very powerful.
+    AREA_ATTACK = code_bit("A")
+    BACKSTAB = code_bit("B")  # Mobile can backstab to start a combat
+    BASH = code_bit("C")  # Mobile can bash characters off their feet
+    BERSERK = code_bit("D")  # Mobile may go berserk in a fight
+    DISARM = code_bit("E")  # Mobile can disarm _without_ a weapon wielded**
+    DODGE = code_bit("F")  # Mobile dodges blows
+    FADE = code_bit("G")  # Mobile can fade "out of phase" to avoid blows
+    FAST = code_bit("H")  # Mobile is faster than most others, so has extra attacks
+    KICK = code_bit("I")  # Mobile can kick in combat for extra damage
+    KICK_DIRT = code_bit("J")  # Mobile kicks dirt, blinding opponents
+    PARRY = code_bit("K")  # Mobile can parry _without_ a weapon wielded**
+    RESCUE = code_bit("L")  # Mobile may rescue allies in a fight
+    TAIL = code_bit("M")  # Mobile can legsweep with its tail or tentacles
+    TRIP = code_bit("N")  # Mobile trips in combat
+    CRUSH = code_bit("O")  # Mobile can crush opponents in its arms
+    ALL = code_bit("P")  # Mobile helps all other mobiles in combat
+    ALIGN = code_bit("Q")  # Mobile assists mobiles of like alignment
+    RACE = code_bit("R")  # Mobile will assist other mobiles of the same race
+    PLAYERS = code_bit("S")  # Mobile will assist players (by race/alignment)
+    GUARD = code_bit("T")  # Mobile assists as a cityguard
+    VNUM = code_bit("U")  # Mobile assists mobiles of the same number only
+
+
+class FormFlag(RomFlag):
     # Corpse flags
-    "A": "edible",  # Mobile can be eaten
-    "B": "poison",  # Mobile is poisonous when eaten (should also be edible)
-    "C": "magical",  # Mobile's magic nature causes strange effects when eaten
-    "D": "vanishes",  # Mobile vanishes after death (i.e. a wraith)
-    "E": "other",  # Mobile is not flesh and blood (defined by material type)
+    EDIBLE = code_bit("A")  # Mobile can be eaten
+    POISON = code_bit("B")  # Mobile is poisonous when eaten (should also be edible)
+    MAGICAL = code_bit("C")  # Mobile's magic nature causes strange effects when eaten
+    VANISHES = code_bit("D")  # Mobile vanishes after death (i.e. a wraith)
+    OTHER = code_bit("E")  # Mobile is not flesh and blood (defined by material type)
     # Form flags
-    "G": "animal",  # Mobile is a "dumb" animal
-    "H": "sentient",  # Mobile is capable of higher reasoning
-    "I": "undead",  # Mobile is an undead, and not truly alive at all
-    "J": "construct",  # Mobile is a magical construct, such as a golem
-    "K": "mist",  # Mobile is a partially material mist
-    "L": "intangible",  # Mobile is immaterial (like a ghost)
-    "M": "biped",  # Mobile is bipedal (like a human)
-    "N": "centaur",  # Mobile has a humanoid torso, but a beast's lower body
-    "O": "insect",  # Mobile is an insect
-    "P": "spider",  # Mobile is an arachnid
-    "Q": "crustacean",  # Mobile is a crustacean (i.e. a crab or lobster)
-    "R": "worm",  # Mobile is a worm, that is a tube-shaped invertebrate
-    "S": "blob",  # Mobile is a formless blob (when used with mist, a cloud)
-    "V": "mammal",  # Mobile is a mammal
-    "W": "bird",  # Mobile is a bird
-    "X": "reptile",  # Mobile is a reptile (and should be cold-blooded)
-    "Y": "snake",  # Mobile is a snake (and should be a reptile)
-    "Z": "dragon",  # Mobile is a dragon
-    "a": "amphibian",  # Mobile is an amphibian (and should be able to swim)
-    "b": "fish",  # Mobile is a fish (and should be able to swim)
-    "c": "cold blood",  # Mobile is cold-blooded, cannot be seen with infravis.
-}
+    ANIMAL = code_bit("G")  # Mobile is a "dumb" animal
+    SENTIENT = code_bit("H")  # Mobile is capable of higher reasoning
+    UNDEAD = code_bit("I")  # Mobile is an undead, and not truly alive at all
+    CONSTRUCT = code_bit("J")  # Mobile is a magical construct, such as a golem
+    MIST = code_bit("K")  # Mobile is a partially material mist
+    INTANGIBLE = code_bit("L")  # Mobile is immaterial (like a ghost)
+    BIPED = code_bit("M")  # Mobile is bipedal (like a human)
+    CENTAUR = code_bit("N")  # Mobile has a humanoid torso, but a beast's lower body
+    INSECT = code_bit("O")  # Mobile is an insect
+    SPIDER = code_bit("P")  # Mobile is an arachnid
+    CRUSTACEAN = code_bit("Q")  # Mobile is a crustacean (i.e. a crab or lobster)
+    WORM = code_bit("R")  # Mobile is a worm, that is a tube-shaped invertebrate
+    BLOB = code_bit("S")  # Mobile is a formless blob (when used with mist, a cloud)
+    MAMMAL = code_bit("V")  # Mobile is a mammal
+    BIRD = code_bit("W")  # Mobile is a bird
+    REPTILE = code_bit("X")  # Mobile is a reptile (and should be cold-blooded)
+    SNAKE = code_bit("Y")  # Mobile is a snake (and should be a reptile)
+    DRAGON = code_bit("Z")  # Mobile is a dragon
+    AMPHIBIAN = code_bit("a")  # Mobile is an amphibian (and should be able to swim)
+    FISH = code_bit("b")  # Mobile is a fish (and should be able to swim)
+    COLD_BLOOD = code_bit("c")  # Mobile is cold-blooded, cannot be seen with infravis.
+
+
+class PartsFlag(RomFlag):
+    HEAD = code_bit("A")  # Mobile has a head
+    ARMS = code_bit("B")  # Mobile has arm(s) (usually assumed to be 2)
+    LEGS = code_bit("C")  # Mobile has leg(s)
+    HEART = code_bit("D")  # Mobile has a heart
+    BRAINS = code_bit("E")  # Mobile has brains (not all mobs with heads have brains)
+    GUTS = code_bit("F")  # Mobile has intestines
+    HANDS = code_bit("G")  # Mobile has hands capable of manipulating objects
+    FEET = code_bit("H")  # Mobile has feet
+    FINGERS = code_bit("I")  # Mobile has fingers capable of wearing rings
+    EAR = code_bit("J")  # Mobile has ear(s)
+    EYE = code_bit("K")  # Mobile has eye(s)
+    TONGUE = code_bit("L")  # Mobile has a _long_ tongue (like a lizard)
+    EYESTALKS = code_bit("M")  # Mobile has eyestalks (it should also have eyes)
+    TENTACLES = code_bit("N")  # Mobile has one or more tentacles
+    FINS = code_bit("O")  # Mobile has fins
+    WINGS = code_bit("P")  # Mobile has wings
+    TAIL = code_bit("Q")  # Mobile has a usable tail (no stubs)
+    CLAWS = code_bit("U")  # Mobile has combat-capable claws
+    FANGS = code_bit("V")  # Mobile has combat-capable teeth
+    HORNS = code_bit("W")  # Mobile has horns, not necessarily dangerous ones
+    SCALES = code_bit("X")  # Mobile is covered with scales
+    TUSKS = code_bit("Y")  # Mobile has some teeth elongated into tusks
 
-code_to_parts_flag = {
-    "A": "head",  # Mobile has a head
-    "B": "arms",  # Mobile has arm(s) (usually assumed to be 2)
-    "C": "legs",  # Mobile has leg(s)
-    "D": "heart",  # Mobile has a heart
-    "E": "brains",  # Mobile has brains (not all mobs with heads have brains)
-    "F": "guts",  # Mobile has intestines
-    "G": "hands",  # Mobile has hands capable of manipulating objects
-    "H": "feet",  # Mobile has feet
-    "I": "fingers",  # Mobile has fingers capable of wearing rings
-    "J": "ear",  # Mobile has ear(s)
-    "K": "eye",  # Mobile has eye(s)
-    "L": "tongue",  # Mobile has a _long_ tongue (like a lizard)
-    "M": "eyestalks",  # Mobile has eyestalks (it should also have eyes)
-    "N": "tentacles",  # Mobile has one or more tentacles
-    "O": "fins",  # Mobile has fins
-    "P": "wings",  # Mobile has wings
-    "Q": "tail",  # Mobile has a usable tail (no stubs)
-    "U": "claws",  # Mobile has combat-capable claws
-    "V": "fangs",  # Mobile has combat-capable teeth
-    "W": "horns",  # Mobile has horns, not necessarily dangerous ones
-    "X": "scales",  # Mobile is covered with scales
-    "Y": "tusks",  # Mobile has some teeth elongated into tusks
-}
 
 # ZX01 - VNUM
 # Sample~ - Name list
@@ -196,7 +175,50 @@ code_to_parts_flag = {
 # 0 <form flags> 0 <part flags> medium <size> 0 <material>
 
 
+# A mob's armor class against each kind of damage. It's a tuple as spawned
+# mobs share their prototype's, so a mob's armor class is changed by
+# giving it a new one, e.g. mob.ac._replace(pierce=-30)
+ArmorClass = namedtuple("ArmorClass", "pierce bash slash magic")
+
+
 class Mobile(Copyable, Character):
+    # Each spawned mob carries and wears its own things
+    instance_attributes = ("inventory", "equipment")
+
+    # Character's attributes are in its own slots
+    __slots__ = (
+        "prototype",
+        "vnum",
+        "keywords",
+        "short_desc",
+        "long_desc",
+        "look_desc",
+        "race",
+        "act_flags",
+        "affect_flags",
+        "alignment",
+        "mob_group",
+        "area_mob_group",
+        "bonus_to_hit",
+        "hit_dice",
+        "mana_dice",
+        "dmg_dice",
+        "damage_type",
+        "ac",
+        "offensive_flags",
+        "immunity_flags",
+        "resistance_flags",
+        "vulnerability_flags",
+        "start_pos",
+        "default_pos",
+        "current_pos",
+        "treasure",
+        "form_flags",
+        "parts_flags",
+        "size",
+        "material",
+    )
+
     def __init__(self):
         Character.__init__(self)
 
@@ -210,8 +232,8 @@ class Mobile(Copyable, Character):
 
         self.race = "human"
 
-        self.act_flags = []
-        self.affect_flags = []
+        self.act_flags = ActFlag(0)
+        self.affect_flags = AffectFlag(0)
         self.alignment = 0  # -1000 (satan) to 1000 (saintly)
 
         self.mob_group = None  # New
@@ -226,12 +248,12 @@ class Mobile(Copyable, Character):
 
         self.damage_type = "crush"
 
-        self.ac = {"pierce": -25, "bash": -25, "slash": -15, "magic": -15}
+        self.ac = ArmorClass(pierce=-25, bash=-25, slash=-15, magic=-15)
 
-        self.offensive_flags = []
-        self.immunity_flags = []
-        self.resistance_flags = []
-        self.vulnerability_flags = []
+        self.offensive_flags = OffensiveFlag(0)
+        self.immunity_flags = IRVFlag(0)
+        self.resistance_flags = IRVFlag(0)
+        self.vulnerability_flags = IRVFlag(0)
 
         self.start_pos = "stand"
         self.default_pos = "stand"
@@ -240,8 +262,8 @@ class Mobile(Copyable, Character):
 
         self.treasure = 0  # In silver pieces
 
-        self.form_flags = []
-        self.parts_flags = []
+        self.form_flags = FormFlag(0)
+        self.parts_flags = PartsFlag(0)
 
         self.size = "medium"
 
@@ -251,89 +273,88 @@ class Mobile(Copyable, Character):
         return f"MOB #{self.vnum}: {self.short_desc} (Level {self.level})"
 
     def has_act_flag(self, act_flag):
+        """Takes an ActFlag, or the name of one like "sentinel" """
         return act_flag in self.act_flags
 
     @classmethod
-    def load_from_file(cls, fp):
+    def load_from_file(cls, lexer):
+        """Reads a mob from an AreaLexer at its #vnum line, leaving the
+        lexer just past it. Open files aren't accepted, as reading one
+        record from a file would use up the rest of it
+        """
         mob = cls()
 
-        vnum = fp.readline()
+        vnum = lexer.readline()
         vnum = vnum.strip()
         vnum = vnum[1:]  # Remove leading #-sign
-        mob.vnum = vnum
+        mob.vnum = intern_string(vnum)
 
-        keyword_str = read_until_tilde(fp)
+        keyword_str = lexer.read_until_tilde()
         keyword_str = keyword_str.strip()
-        mob.keywords = keyword_str.split(" ")
+        mob.keywords = intern_strings(keyword_str.split(" "))
 
-        mob.short_desc = read_until_tilde(fp)
-        mob.long_desc = read_until_tilde(fp)
-        mob.look_desc = read_until_tilde(fp)
+        mob.short_desc = lexer.read_until_tilde()
+        mob.long_desc = lexer.read_until_tilde()
+        mob.look_desc = lexer.read_until_tilde()
 
-        mob.race = read_until_tilde(fp)
+        mob.race = intern_string(lexer.read_until_tilde())
 
         # TODO: act and affect (and maybe other flags) are affected by
         # race
-        raw_act_flags = read_flagset(fp)
-        for flag_code in raw_act_flags:
-            mob.act_flags.append(code_to_act_flag[flag_code])
+        raw_act_flags = lexer.read_flagset()
+        mob.act_flags = ActFlag.from_codes(raw_act_flags)
 
-        raw_affect_flags = read_flagset(fp)
-        for flag_code in raw_affect_flags:
-            mob.affect_flags.append(code_to_affect_flag[flag_code])
+        raw_affect_flags = lexer.read_flagset()
+        mob.affect_flags = AffectFlag.from_codes(raw_affect_flags)
 
-        mob.alignment = read_number(fp)
-        mob.area_mob_group = read_number(fp)
+        mob.alignment = lexer.read_number()
+        mob.area_mob_group = lexer.read_number()
 
-        mob.level = read_number(fp)
-        mob.bonus_to_hit = read_number(fp)
+        mob.level = lexer.read_number()
+        mob.bonus_to_hit = lexer.read_number()
 
-        mob.hit_dice = read_string(fp)
-        mob.mana_dice = read_string(fp)
-        mob.dmg_dice = read_string(fp)
-        mob.damage_type = read_string(fp)
+        mob.hit_dice = intern_string(lexer.read_string())
+        mob.mana_dice = intern_string(lexer.read_string())
+        mob.dmg_dice = intern_string(lexer.read_string())
+        mob.damage_type = intern_string(lexer.read_string())
 
-        mob.ac["pierce"] = read_number(fp)
-        mob.ac["bash"] = read_number(fp)
-        mob.ac["slash"] = read_number(fp)
-        mob.ac["magic"] = read_number(fp)
+        mob.ac = ArmorClass(
+            pierce=lexer.read_number(),
+            bash=lexer.read_number(),
+            slash=lexer.read_number(),
+            magic=lexer.read_number(),
+        )
 
-        raw_off_flags = read_flagset(fp)
-        for flag_code in raw_off_flags:
-            mob.offensive_flags.append(code_to_offensive_flag[flag_code])
+        raw_off_flags = lexer.read_flagset()
+        mob.offensive_flags = OffensiveFlag.from_codes(raw_off_flags)
 
-        raw_imm_flags = read_flagset(fp)
-        for flag_code in raw_imm_flags:
-            mob.immunity_flags.append(IRVFlag(flag_code))
+        raw_imm_flags = lexer.read_flagset()
+        mob.immunity_flags = IRVFlag.from_codes(raw_imm_flags)
 
-        raw_res_flags = read_flagset(fp)
-        for flag_code in raw_res_flags:
-            mob.resistance_flags.append(IRVFlag(flag_code))
+        raw_res_flags = lexer.read_flagset()
+        mob.resistance_flags = IRVFlag.from_codes(raw_res_flags)
 
-        raw_vul_flags = read_flagset(fp)
-        for flag_code in raw_vul_flags:
-            mob.vulnerability_flags.append(IRVFlag(flag_code))
+        raw_vul_flags = lexer.read_flagset()
+        mob.vulnerability_flags = IRVFlag.from_codes(raw_vul_flags)
 
-        mob.start_pos = read_string(fp)
-        mob.default_pos = read_string(fp)
+        mob.start_pos = intern_string(lexer.read_string())
+        mob.default_pos = intern_string(lexer.read_string())
 
         mob.current_pos = mob.start_pos
 
-        read_string(fp)
+        lexer.read_string()
 
-        mob.treasure = read_number(fp)
+        mob.treasure = lexer.read_number()
 
-        raw_form_flags = read_flagset(fp)
-        for flag_code in raw_form_flags:
-            mob.form_flags.append(code_to_form_flag[flag_code])
+        raw_form_flags = lexer.read_flagset()
+        mob.form_flags = FormFlag.from_codes(raw_form_flags)
 
-        raw_part_flags = read_flagset(fp)
-        for flag_code in raw_part_flags:
-            mob.parts_flags.append(code_to_parts_flag[flag_code])
+        raw_part_flags = lexer.read_flagset()
+        mob.parts_flags = PartsFlag.from_codes(raw_part_flags)
 
-        mob.size = read_string(fp)
-        raw_material = read_string(fp)
+        mob.size = intern_string(lexer.read_string())
+        raw_material = lexer.read_string()
         if raw_material != "0":
-            mob.material = raw_material
+            mob.material = intern_string(raw_material)
 
         return mob
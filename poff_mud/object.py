@@ -1,70 +1,64 @@
 from enum import Enum
 from poff_mud.enum_contains import EnumContains
-from poff_mud.file_helpers import (
-    read_number,
-    read_string,
-    read_flagset,
-    read_until_tilde,
-    read_letter,
-    peek_next_line,
-)
+from poff_mud.flags import RomFlag, code_bit
+from poff_mud.interning import intern_string, intern_strings
 from poff_mud.copyable import Copyable
 
 from poff_mud.airv import IRVFlag, AffectFlag, AffectWhere, AffectLocation, Affect
 
 
-class ObjectExtraFlag(Enum, metaclass=EnumContains):
-    GLOWING = "A"
-    HUMMING = "B"
-    DARK = "C"
-    EVIL = "E"
-    INVIS = "F"
-    MAGIC = "G"
-    NODROP = "H"
-    BLESS = "I"
-    ANTIGOOD = "J"
-    ANTIEVIL = "K"
-    ANTINEUTRAL = "L"
-    NOREMOVE = "M"
-    INVENTORY = "N"
-    NOPURGE = "O"
-    ROTDEATH = "P"
-    VISDEATH = "Q"
-    NOSAC = "R"
-    NOLOCATE = "T"
-    MELTDROP = "U"
-    SELLEXTRACT = "W"
-    BURNPROOF = "Y"
-
-
-class ObjectWearFlag(Enum, metaclass=EnumContains):
-    TAKE = "A"
-    FINGER = "B"
-    NECK = "C"
-    BODY = "D"
-    HEAD = "E"
-    LEGS = "F"
-    FEET = "G"
-    HANDS = "H"
-    ARMS = "I"
-    SHIELD = "J"
-    ABOUTBODY = "K"
-    WAIST = "L"
-    WRIST = "M"
-    WIELD = "N"
-    HOLD = "O"
-    FLOAT = "Q"
-
-
-class ObjectWeaponFlag(Enum, metaclass=EnumContains):
-    FLAMING = "A"
-    FROST = "B"
-    VAMPIRIC = "C"
-    SHARP = "D"
-    VORPAL = "E"
-    TWOHANDED = "F"
-    SHOCKING = "G"
-    POISONED = "H"
+class ObjectExtraFlag(RomFlag):
+    GLOWING = code_bit("A")
+    HUMMING = code_bit("B")
+    DARK = code_bit("C")
+    EVIL = code_bit("E")
+    INVIS = code_bit("F")
+    MAGIC = code_bit("G")
+    NODROP = code_bit("H")
+    BLESS = code_bit("I")
+    ANTIGOOD = code_bit("J")
+    ANTIEVIL = code_bit("K")
+    ANTINEUTRAL = code_bit("L")
+    NOREMOVE = code_bit("M")
+    INVENTORY = code_bit("N")
+    NOPURGE = code_bit("O")
+    ROTDEATH = code_bit("P")
+    VISDEATH = code_bit("Q")
+    NOSAC = code_bit("R")
+    NOLOCATE = code_bit("T")
+    MELTDROP = code_bit("U")
+    SELLEXTRACT = code_bit("W")
+    BURNPROOF = code_bit("Y")
+
+
+class ObjectWearFlag(RomFlag):
+    TAKE = code_bit("A")
+    FINGER = code_bit("B")
+    NECK = code_bit("C")
+    BODY = code_bit("D")
+    HEAD = code_bit("E")
+    LEGS = code_bit("F")
+    FEET = code_bit("G")
+    HANDS = code_bit("H")
+    ARMS = code_bit("I")
+    SHIELD = code_bit("J")
+    ABOUTBODY = code_bit("K")
+    WAIST = code_bit("L")
+    WRIST = code_bit("M")
+    WIELD = code_bit("N")
+    HOLD = code_bit("O")
+    FLOAT = code_bit("Q")
+
+
+class ObjectWeaponFlag(RomFlag):
+    FLAMING = code_bit("A")
+    FROST = code_bit("B")
+    VAMPIRIC = code_bit("C")
+    SHARP = code_bit("D")
+    VORPAL = code_bit("E")
+    TWOHANDED = code_bit("F")
+    SHOCKING = code_bit("G")
+    POISONED = code_bit("H")
 
 
 class ObjectType(Enum, metaclass=EnumContains):
@@ -100,6 +94,29 @@ code_to_condition = {"P": 100, "G": 90, "A": 75, "W": 50, "D": 25, "B": 10, "R":
 
 
 class Object(Copyable):
+    # Each spawned container holds its own things
+    instance_attributes = ("contains",)
+
+    __slots__ = (
+        "prototype",
+        "vnum",
+        "keywords",
+        "short_desc",
+        "long_desc",
+        "material",
+        "item_type",
+        "special_values",
+        "extra_flags",
+        "wear_flags",
+        "level",
+        "weight",
+        "cost",
+        "condition",
+        "extra_description",
+        "affects",
+        "contains",
+    )
+
     def __init__(self):
         self.vnum = "###"
         self.keywords = []
@@ -110,13 +127,15 @@ class Object(Copyable):
         self.material = ""
 
         self.item_type = ObjectType.TRASH
-        self.special_values = [0, 0, 0, 0, 0]  # Depend on item_type
+        # Depend on item_type. This and 'affects' are tuples, as spawned
+        # objects share their prototype's, see Copyable
+        self.special_values = (0, 0, 0, 0, 0)
 
         # Extra Flags
-        self.extra_flags = []
+        self.extra_flags = ObjectExtraFlag(0)
 
         # Wear Flags
-        self.wear_flags = []
+        self.wear_flags = ObjectWearFlag(0)
 
         self.level = -1
         self.weight = -1
@@ -129,7 +148,7 @@ class Object(Copyable):
         # {keyword: description}
         self.extra_description = {}
 
-        self.affects = []
+        self.affects = ()
 
         # If item is container, it can hold stuff
         self.contains = []
@@ -138,35 +157,38 @@ class Object(Copyable):
         return f"OBJ #{self.vnum}: {self.short_desc} ({self.item_type} - Level {self.level})"
 
     @classmethod
-    def load_from_file(cls, fp):
+    def load_from_file(cls, lexer):
+        """Reads an object from an AreaLexer at its #vnum line, leaving the
+        lexer just past it. Open files aren't accepted, as reading one
+        record from a file would use up the rest of it
+        """
         obj = cls()
 
-        vnum = fp.readline()
+        vnum = lexer.readline()
         vnum = vnum.strip()
         vnum = vnum[1:]  # Remove leading #-sign
-        obj.vnum = vnum
+        obj.vnum = intern_string(vnum)
 
-        keyword_str = read_until_tilde(fp)
+        keyword_str = lexer.read_until_tilde()
         keyword_str = keyword_str.strip()
-        obj.keywords = keyword_str.split(" ")
+        obj.keywords = intern_strings(keyword_str.split(" "))
 
-        obj.short_desc = read_until_tilde(fp)
-        obj.long_desc = read_until_tilde(fp)
+        obj.short_desc = lexer.read_until_tilde()
+        obj.long_desc = lexer.read_until_tilde()
 
-        obj.material = read_until_tilde(fp)
+        obj.material = intern_string(lexer.read_until_tilde())
 
-        obj.item_type = ObjectType(read_string(fp))
+        obj.item_type = ObjectType(lexer.read_string())
 
-        raw_extra_flags = read_flagset(fp)
-        for f in raw_extra_flags:
-            obj.extra_flags.append(ObjectExtraFlag(f))
+        raw_extra_flags = lexer.read_flagset()
+        obj.extra_flags = ObjectExtraFlag.from_codes(raw_extra_flags)
 
-        raw_wear_flags = read_flagset(fp)
-        for f in raw_wear_flags:
-            obj.wear_flags.append(ObjectWearFlag(f))
+        raw_wear_flags = lexer.read_flagset()
+        obj.wear_flags = ObjectWearFlag.from_codes(raw_wear_flags)
 
+        special_values = list(obj.special_values)
         for i in [0, 1, 2, 3, 4]:
-            raw_value = read_string(fp)
+            raw_value = lexer.read_string()
             if raw_value.isnumeric() and raw_value != "0":
                 raw_value = int(raw_value)
 
@@ -175,39 +197,41 @@ class Object(Copyable):
                 raw_weapon_tags = raw_value.split()
                 weapon_flags = [ObjectWeaponFlag[f] for f in raw_wear_flags]
 
-                obj.special_values[i] = weapon_flags
+                special_values[i] = tuple(weapon_flags)
                 continue
 
-            obj.special_values[i] = raw_value
+            special_values[i] = raw_value
+        obj.special_values = tuple(special_values)
 
-        obj.level = read_number(fp)
-        obj.weight = read_number(fp)
-        obj.cost = read_number(fp)
+        obj.level = lexer.read_number()
+        obj.weight = lexer.read_number()
+        obj.cost = lexer.read_number()
 
-        cond_code = read_string(fp)
+        cond_code = lexer.read_string()
         obj.condition = code_to_condition[cond_code]
 
         # There's no delimter for each object and there can be
         # infinite E, F, or A entries so we need to consume
         # until we don't have an E, F, A entry
-        next_line = peek_next_line(fp)
+        affects = []
+        next_line = lexer.peek_next_line()
         next_line = next_line.strip()
         while next_line in ["E", "F", "A"]:
             # Advance the file pointer
-            fp.readline()
+            lexer.readline()
 
             if next_line == "E":
-                keyword_str = read_until_tilde(fp)
+                keyword_str = lexer.read_until_tilde()
                 keyword_str = keyword_str.strip()
 
-                extra_desc = read_until_tilde(fp)
+                extra_desc = lexer.read_until_tilde()
 
                 for k in keyword_str.split(" "):
-                    obj.extra_description[k] = extra_desc
+                    obj.extra_description[intern_string(k)] = extra_desc
             elif next_line == "F":
                 aff = Affect()
 
-                aff_type = read_string(fp)
+                aff_type = lexer.read_string()
                 if aff_type == "A":
                     aff.where = AffectWhere.TO_AFFECTS
                 elif aff_type == "I":
@@ -219,34 +243,35 @@ class Object(Copyable):
 
                 aff.level = obj.level
 
-                location = read_number(fp)
+                location = lexer.read_number()
                 aff.location = (
                     AffectLocation(location) if location != 6 else AffectLocation.NONE
                 )
-                aff.modifier = read_number(fp)
+                aff.modifier = lexer.read_number()
 
-                raw_flags = read_flagset(fp)
+                raw_flags = lexer.read_flagset()
                 if aff.where == AffectWhere.TO_AFFECTS:
-                    aff.flags = [AffectFlag(f) for f in raw_flags]
+                    aff.flags = AffectFlag.from_codes(raw_flags)
                 else:
-                    aff.flags = [IRVFlag(f) for f in raw_flags]
+                    aff.flags = IRVFlag.from_codes(raw_flags)
 
-                obj.affects.append(aff)
+                affects.append(aff)
             elif next_line == "A":
                 aff = Affect()
                 aff.where = AffectWhere.TO_OBJECT
                 aff.level = obj.level
 
-                location = read_number(fp)
+                location = lexer.read_number()
                 aff.location = (
                     AffectLocation(location) if location != 6 else AffectLocation.NONE
                 )
 
-                aff.modifier = read_number(fp)
+                aff.modifier = lexer.read_number()
 
-                obj.affects.append(aff)
+                affects.append(aff)
 
-            next_line = peek_next_line(fp)
+            next_line = lexer.peek_next_line()
             next_line = next_line.strip()
 
+        obj.affects = tuple(affects)
         return obj
@@ -1,30 +1,27 @@
 from enum import Enum
 from poff_mud.enum_contains import EnumContains
-from poff_mud.file_helpers import (
-    read_number,
-    read_string,
-    read_flagset,
-    read_until_tilde,
-    read_letter,
-)
-
-
-class RoomFlag(Enum, metaclass=EnumContains):
-    DARK = "A"  # (A)  A light source must be carried to see in this room
-    NO_MOB = "C"  # (C)  Monsters cannot enter this room
-    INDOORS = "D"  # (D)  Room is inside (i.e. not affected by weather)
-    PRIVATE = "J"  # (J)  Room is limited to two characters (i.e. chat rooms)
-    SAFE = "K"  # (K)  Safe from pkilling and aggressive mobs
-    SOLITARY = "L"  # (L)  One character only can enter this room
-    PET_SHOP = "M"  # (M)  see addendum about pet shops
-    NO_RECALL = "N"  # (N)  players cannot use the 'recall' command to leave this room
+from poff_mud.flags import RomFlag, code_bit
+from poff_mud.indexed_contents import IndexedContents
+from poff_mud.interning import intern_string, intern_strings
+
+
+class RoomFlag(RomFlag):
+    DARK = code_bit("A")  # (A)  A light source must be carried to see in this room
+    NO_MOB = code_bit("C")  # (C)  Monsters cannot enter this room
+    INDOORS = code_bit("D")  # (D)  Room is inside (i.e. not affected by weather)
+    PRIVATE = code_bit("J")  # (J)  Room is limited to two characters (i.e. chat rooms)
+    SAFE = code_bit("K")  # (K)  Safe from pkilling and aggressive mobs
+    SOLITARY = code_bit("L")  # (L)  One character only can enter this room
+    PET_SHOP = code_bit("M")  # (M)  see addendum about pet shops
+    # (N)  players cannot use the 'recall' command to leave this room
+    NO_RECALL = code_bit("N")
 
     # These are flags not described in Rom2.4 Doc... :weary:
-    IMP_ONLY = "O"
-    GODS_ONLY = "P"
-    NEWBIES_ONLY = "R"
-    LAW = "S"
-    NOWHERE = "T"
+    IMP_ONLY = code_bit("O")
+    GODS_ONLY = code_bit("P")
+    NEWBIES_ONLY = code_bit("R")
+    LAW = code_bit("S")
+    NOWHERE = code_bit("T")
 
 
 class RoomSectorType(Enum, metaclass=EnumContains):
@@ -58,14 +55,40 @@ class DoorState(Enum, metaclass=EnumContains):
     CLOSED_AND_LOCKED = 2
 
 
+def mob_keywords(mob):
+    return mob.keywords
+
+
+def object_keywords(obj):
+    # Objects can also be looked at by their extra descriptions' keywords
+    return (*obj.keywords, *obj.extra_description)
+
+
 class Room:
+    __slots__ = (
+        "vnum",
+        "header",
+        "desc",
+        "flags",
+        "sector_type",
+        "exits",
+        "extra",
+        "mana_recovery_adjust",
+        "health_recovery_adjust",
+        "clan",
+        "owner",
+        "players",
+        "objects",
+        "mobs",
+    )
+
     def __init__(self):
         self.vnum = 0
 
         self.header = "Room"
         self.desc = "Starring Brie Larson"
 
-        self.flags = []
+        self.flags = RoomFlag(0)
         self.sector_type = "INSIDE"
 
         self.exits = {}
@@ -78,29 +101,32 @@ class Room:
         self.clan = None
         self.owner = None
 
-        # More state-y stuff
+        # More state-y stuff. Mobs and objects are indexed so they can be
+        # found by vnum and keyword
         self.players = []
-        self.objects = []
-        self.mobs = []
+        self.objects = IndexedContents(object_keywords)
+        self.mobs = IndexedContents(mob_keywords)
 
     def __repr__(self):
         return f"ROOM #{self.vnum}: {self.header} ({self.sector_type} - EXITS: {', '.join(self.exits.keys())})"
 
     @staticmethod
-    def load_exit(fp, room):
-        dir_num = read_number(fp)
+    def load_exit(lexer, room):
+        dir_num = lexer.read_number()
         direction = code_to_direction[dir_num]
 
-        desc = read_until_tilde(fp)
-        raw_keywords = read_until_tilde(fp)
+        desc = lexer.read_until_tilde()
+        raw_keywords = lexer.read_until_tilde()
 
-        door_state = read_number(fp)
-        key_vnum = read_number(fp)
-        exit_vnum = str(read_number(fp))
+        door_state = lexer.read_number()
+        key_vnum = lexer.read_number()
+        exit_vnum = intern_string(str(lexer.read_number()))
 
         room.exits[direction] = {
             "look_description": desc,
-            "door_keywords": raw_keywords.split(" ") if raw_keywords != "" else None,
+            "door_keywords": intern_strings(raw_keywords.split(" "))
+            if raw_keywords != ""
+            else None,
             "door_state": DoorState(door_state),
             "key_vnum": str(key_vnum)
             if key_vnum > 0
@@ -109,74 +135,74 @@ class Room:
         }
 
     @classmethod
-    def load_from_file(cls, fp):
+    def load_from_file(cls, lexer):
+        """Reads a room from an AreaLexer at its #vnum line, leaving the
+        lexer just past it. Open files aren't accepted, as reading one
+        record from a file would use up the rest of it
+        """
         room = cls()
 
-        vnum = fp.readline()
+        vnum = lexer.readline()
         vnum = vnum.strip()
         vnum = vnum[1:]  # Remove leading #-sign
-        room.vnum = vnum
+        room.vnum = intern_string(vnum)
 
-        room.header = read_until_tilde(fp)
-        room.desc = read_until_tilde(fp)
+        room.header = lexer.read_until_tilde()
+        room.desc = lexer.read_until_tilde()
 
         # First set of flags are old and can be ignored
-        read_flagset(fp)
-
-        raw_room_flags = read_flagset(fp)
-        for flag in raw_room_flags:
-            if flag not in RoomFlag:
-                continue
+        lexer.read_flagset()
 
-            room.flags.append(RoomFlag(flag))
+        raw_room_flags = lexer.read_flagset()
+        room.flags = RoomFlag.from_codes(raw_room_flags)
 
-        raw_sector_type = read_string(fp)
+        raw_sector_type = lexer.read_string()
         room.sector_type = RoomSectorType(raw_sector_type)
 
-        last_char = read_letter(fp)
+        last_char = lexer.read_letter()
         while last_char != "S":
             if last_char == "D":
                 # Handle exit direction
-                Room.load_exit(fp, room)
+                Room.load_exit(lexer, room)
             elif last_char == "E":
-                fp.read(1)
+                lexer.read(1)
 
                 # Handle extra description
-                keyword_str = read_until_tilde(fp)
+                keyword_str = lexer.read_until_tilde()
                 keyword_str = keyword_str.strip()
                 extra_keywords = keyword_str.split(" ")
 
-                extra_desc = read_until_tilde(fp)
+                extra_desc = lexer.read_until_tilde()
 
                 for k in extra_keywords:
-                    room.extra[k] = extra_desc
+                    room.extra[intern_string(k)] = extra_desc
 
                 # Combined case
-                room.extra[keyword_str] = extra_desc
+                room.extra[intern_string(keyword_str)] = extra_desc
             elif last_char == "M":
-                fp.read(1)
+                lexer.read(1)
 
                 # handle mana adjustment
-                room.mana_recovery_adjust = read_number(fp)
+                room.mana_recovery_adjust = lexer.read_number()
             elif last_char == "H":
-                fp.read(1)
+                lexer.read(1)
 
                 # handle HP adjustment
-                room.hp_recovery_adjust = read_number(fp)
+                room.health_recovery_adjust = lexer.read_number()
             elif last_char == "O":
-                fp.read(1)
+                lexer.read(1)
 
                 # owner string
-                room.owner = read_until_tilde(fp)
+                room.owner = lexer.read_until_tilde()
             elif last_char == "C":
-                fp.read(1)
+                lexer.read(1)
 
                 # handle clan
-                room.clan = read_until_tilde(fp)
+                room.clan = lexer.read_until_tilde()
 
-            last_char = read_letter(fp)
+            last_char = lexer.read_letter()
 
         # If it's an S, we need to skip past the newline character
-        fp.read(1)
+        lexer.read(1)
 
         return room
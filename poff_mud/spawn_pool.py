@@ -1,6 +1,7 @@
-import copy
 from enum import Enum
 from poff_mud.copyable import Copyable
+from poff_mud.instance_registry import InstanceRegistry
+from poff_mud.lazy_records import LazyRecords
 
 
 class SpawnPoolType(Enum):
@@ -24,6 +25,30 @@ class SpawnPoolItemDoesNotExistError(Exception):
     pass
 
 
+class SpawnHandle:
+    """An item in a SpawnPool, looked up once so it can be spawned over and
+    over without finding it again each time. See SpawnPool.handle
+    """
+
+    __slots__ = ("pool_key", "item_key", "prototype", "_instances")
+
+    def __init__(self, pool_key, item_key, prototype, instances):
+        self.pool_key = pool_key
+        self.item_key = item_key
+        self.prototype = prototype
+        self._instances = instances
+
+    def spawn(self, location=None):
+        instance = self.prototype.spawn()
+        self._instances.add(instance, self.pool_key, self.item_key, location)
+
+        return instance
+
+    def count(self):
+        """How many instances of the item there are"""
+        return self._instances.count(self.pool_key, self.item_key)
+
+
 class SpawnPool:
     """
     This class is just a helper to create generic pools from which to create
@@ -31,32 +56,58 @@ class SpawnPool:
 
     The thought process here is that we can load in the representative object/mob/whatever
     via area files (or wherever else) and then when we need to create/spawn a new
-    item, we can simply spawn it by deepcopying the requested item.
+    item, we can simply spawn a new instance of the requested item. Instances
+    share everything with the loaded item except what they change, see
+    Copyable.spawn.
 
     This makes it easier to share items across areas and enforces the copyable
     requirement.
+
+    Everything spawned is recorded in 'instances', an InstanceRegistry.
     """
 
     def __init__(self):
         # Come on in the water's fine
         self._pool = {}
 
-    def add(self, pool_key, item_key, item):
+        self.instances = InstanceRegistry()
+
+    def _pool_for_new_item(self, pool_key, item_key):
         # Create pool_key entry if it doesn't exist
         if pool_key not in self._pool:
-            self._pool[pool_key] = {}
+            self._pool[pool_key] = LazyRecords()
+
+        if item_key in self._pool[pool_key]:
+            raise SpawnPoolDuplicateExistsError(
+                f"Item {item_key} for pool {pool_key} already exists in pool"
+            )
 
+        return self._pool[pool_key]
+
+    def _check_copyable(self, pool_key, item_key, item):
         if not issubclass(type(item), Copyable):
             raise SpawnPoolNotCopyableError(
                 f"Item {item_key} for pool {pool_key} is not copyable"
             )
 
-        if item_key in self._pool[pool_key]:
-            raise SpawnPoolNotCopyableError(
-                f"Item {item_key} for pool {pool_key} already exists in pool"
-            )
+        return item
 
-        self._pool[pool_key][item_key] = item
+    def add(self, pool_key, item_key, item):
+        pool = self._pool_for_new_item(pool_key, item_key)
+        self._check_copyable(pool_key, item_key, item)
+
+        pool[item_key] = item
+
+    def add_lazy(self, pool_key, item_key, loader):
+        """Like add, but the item is only created by calling
+        'loader(item_key)' the first time it's spawned
+        """
+        pool = self._pool_for_new_item(pool_key, item_key)
+
+        def load(key):
+            return self._check_copyable(pool_key, key, loader(key))
+
+        pool.add_lazy(item_key, load)
 
     def contains(self, pool_key, item_key):
         if pool_key not in self._pool:
@@ -64,7 +115,10 @@ class SpawnPool:
 
         return item_key in self._pool[pool_key]
 
-    def spawn(self, pool_key, item_key):
+    def handle(self, pool_key, item_key):
+        """Returns a SpawnHandle for 'item_key'. This loads the item if it
+        was added lazily
+        """
         if pool_key not in self._pool:
             raise SpawnPoolDoesNotExistError(f"Pool {pool_key} does not exist")
 
@@ -73,4 +127,11 @@ class SpawnPool:
                 f"{item_key} does not exist in pool {pool_key}"
             )
 
-        return copy.deepcopy(self._pool[pool_key][item_key])
+        prototype = self._pool[pool_key][item_key]
+        return SpawnHandle(pool_key, item_key, prototype, self.instances)
+
+    def spawn(self, pool_key, item_key, location=None):
+        """Returns a new instance of 'item_key' and records it as being in
+        'location', see InstanceRegistry
+        """
+        return self.handle(pool_key, item_key).spawn(location)
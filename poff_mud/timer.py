@@ -1,29 +1,91 @@
+import heapq
+import itertools
 import time
-import uuid
+
+
+def monotonic_ms():
+    return time.monotonic_ns() // 1_000_000
+
+
+class _Timer:
+    __slots__ = ("interval", "callback", "repeat")
+
+    def __init__(self, interval, callback, repeat):
+        self.interval = interval
+        self.callback = callback
+        self.repeat = repeat
 
 
 class TimerManager:
-    def __init__(self):
+    """Runs callbacks after a given number of milliseconds, once or
+    repeatedly, whenever run() is called after they're due.
+
+    Timers are kept in a heap ordered by when they're next due, so run()
+    only looks at the ones which are due. Removing a timer just forgets
+    it, and its heap entry is skipped when it comes up.
+    """
+
+    def __init__(self, clock=monotonic_ms):
+        self.clock = clock
+
+        # timer id -> _Timer, for every timer which hasn't been removed
         self._timers = {}
+        # (target time, timer id), one for each timer. Ids are increasing,
+        # so timers due at the same time run in the order they were added
+        self._heap = []
+        self._ids = itertools.count(1)
+        # Entries in the heap for timers which have been removed
+        self._removed = 0
 
     def add_timer(self, interval, callback, repeat=False):
-        self._timers[uuid.uuid4()] = {
-            "target_time": int(time.time_ns() / 1000000) + interval,
-            "interval": interval,
-            "repeat": repeat,
-            "callback": callback,
-        }
+        """Calls 'callback' in 'interval' milliseconds, and every 'interval'
+        milliseconds after that if 'repeat' is True. Returns the timer's id
+        """
+        timer_id = next(self._ids)
+        self._timers[timer_id] = _Timer(interval, callback, repeat)
+        heapq.heappush(self._heap, (self.clock() + interval, timer_id))
+        return timer_id
 
     def remove_timer(self, timer_id):
-        del self._timers[timer_id]
+        """Stops a timer. Timers which have already run, if they don't
+        repeat, or have been removed are ignored
+        """
+        if self._timers.pop(timer_id, None) is None:
+            return
+        self._removed += 1
+
+        # Don't let the heap fill up with removed timers. It's changed in
+        # place as this may be a callback called from run()
+        if self._removed > 1024 and self._removed > len(self._heap) // 2:
+            self._heap[:] = [e for e in self._heap if e[1] in self._timers]
+            heapq.heapify(self._heap)
+            self._removed = 0
 
     def run(self):
-        current_time_ms = int(time.time_ns() / 1000000)
+        now = self.clock()
+        heap = self._heap
+        timers = self._timers
+
+        while heap and heap[0][0] <= now:
+            target_time, timer_id = heapq.heappop(heap)
+
+            t = timers.get(timer_id)
+            if t is None:
+                self._removed -= 1
+                continue
+
+            if t.repeat:
+                # Keep to the timer's schedule, unless it's fallen a whole
+                # interval behind. Either way it's not due again until the
+                # next call, so a short interval can't keep this one going
+                next_time = target_time + t.interval
+                if next_time <= now:
+                    next_time = now + max(t.interval, 1)
+                heapq.heappush(heap, (next_time, timer_id))
+            else:
+                del timers[timer_id]
 
-        for timer_id, t in self._timers.items():
-            if t["target_time"] <= current_time_ms:
-                t["callback"]()
+            t.callback()
 
-                if t["repeat"] is False:
-                    t["target_time"] = int(time.time_ns() / 1000000) + t["interval"]
-                    self.remove_timer(timer_id)
+    def __len__(self):
+        return len(self._timers)
@@ -0,0 +1,111 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from poff_mud.area_cache import load_area
+from poff_mud.lazy_records import LazyRecords
+from poff_mud.log import worker_initializer
+
+
+class DuplicateVnumError(Exception):
+    pass
+
+
+def read_area_list(path):
+    """Reads a ROM style area list: one .are file name per line, relative to
+    the list, ending with a line containing just '$'
+    """
+    area_dir = os.path.dirname(path)
+    paths = []
+
+    with open(path) as fp:
+        for line in fp:
+            line = line.strip()
+            if line == "$":
+                break
+            elif line == "":
+                continue
+
+            paths.append(os.path.join(area_dir, line))
+
+    return paths
+
+
+def _find_duplicates(areas, paths):
+    # Maps each vnum to the file that first defined it, separately for
+    # rooms, mobs and objects
+    owners = {"room": {}, "mob": {}, "object": {}}
+    duplicates = []
+
+    for area, path in zip(areas, paths):
+        for kind, vnums in [
+            ("room", area.rooms),
+            ("mob", area.mobs),
+            ("object", area.objects),
+        ]:
+            for vnum in vnums:
+                if vnum in owners[kind]:
+                    duplicates.append(
+                        f"{kind} {vnum} in {path} (already in {owners[kind][vnum]})"
+                    )
+                else:
+                    owners[kind][vnum] = path
+
+    return duplicates
+
+
+def load_world(area_list_path, gsp, gs, max_workers=None, use_cache=True, lazy=False):
+    """Loads every area in the area list, adding their mobs and objects to
+    the spawn pool and their rooms to the game state. Returns the areas in
+    the order they're listed.
+
+    The area files are parsed in separate processes, up to 'max_workers'
+    at once (by default one per CPU), and merged here once they're all
+    done. If two areas use the same vnum for a room, mob or object nothing
+    is added and DuplicateVnumError is raised.
+
+    If 'lazy' is True the areas are only indexed, and mobs, rooms and
+    objects are parsed the first time they're used. Indexing is quick
+    enough that it's done here rather than in other processes.
+    """
+    paths = read_area_list(area_list_path)
+    load = partial(load_area, use_cache=use_cache, lazy=lazy)
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(paths))
+    if lazy:
+        max_workers = 1
+        if not isinstance(gs.rooms, LazyRecords):
+            gs.rooms = LazyRecords(gs.rooms)
+
+    # Starting worker processes isn't worth it for a single area
+    if max_workers <= 1:
+        areas = [load(path) for path in paths]
+    else:
+        # The workers log through our logging, if it's set up
+        initializer, initargs = worker_initializer()
+        with ProcessPoolExecutor(
+            max_workers=max_workers, initializer=initializer, initargs=initargs
+        ) as pool:
+            areas = list(pool.map(load, paths))
+
+    duplicates = _find_duplicates(areas, paths)
+    if duplicates:
+        message = "Duplicate vnums: " + ", ".join(duplicates[:10])
+        if len(duplicates) > 10:
+            message += f" and {len(duplicates) - 10} more"
+        raise DuplicateVnumError(message)
+
+    for area in areas:
+        area.add_to_spawn_pool(gsp)
+
+        for room_vnum in area.rooms:
+            # Rooms not loaded yet are loaded by the area when first used, so
+            # there's only ever one copy of each
+            if isinstance(area.rooms, LazyRecords):
+                gs.rooms.add_lazy(room_vnum, area.rooms.__getitem__)
+            else:
+                gs.rooms[room_vnum] = area.rooms[room_vnum]
+
+    return areas
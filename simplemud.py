@@ -1,55 +1,70 @@
 #!/usr/bin/env python
 
+import asyncio
+import logging
+import sys
 import time
 from signal import signal, SIGINT
-from sys import exit
 from termcolor import colored
 
-# import the MUD server class
-from mudserver import MudServer
+# import the MUD server classes
+from mudserver import MudServer, NewPlayerEvent, PlayerLeftEvent
+from asyncmudserver import AsyncMudServer
 
 from poff_mud.spawn_pool import SpawnPool
 from poff_mud.gamestate import GameState
 from poff_mud.commands import LookCommand, MoveCommand, SayCommand
 from poff_mud.login_screen import send_login_welcome
 from poff_mud.timer import TimerManager
+from poff_mud.area_update import AreaUpdater
+from poff_mud.log import setup_logging
 
-from poff_mud.area import Area
+from poff_mud.world import load_world
 from poff_mud.room_utils import get_room_display_str
 
+logger = logging.getLogger("simplemud")
+
 if __name__ == "__main__":
+    # Everything is logged from a background thread so writing the log
+    # never holds up the game. --debug logs everything, like each reset
+    setup_logging(
+        level=logging.DEBUG if "--debug" in sys.argv else None,
+        levels={"simplemud": logging.INFO},
+    )
+
     # Create the global spawn pool
     gsp = SpawnPool()
 
-    areas = []
-
-    # Load in school
-    with open("areas/school.are") as fp:
-        school_area = Area.load_from_file(fp, gsp=gsp)
-        areas.append(school_area)
-
-    # Load in midgaard
-    with open("areas/midgaard.are") as fp:
-        midgaard_area = Area.load_from_file(fp, gsp=gsp)
-        areas.append(midgaard_area)
-
-    # setup game state and add rooms 
+    # setup game state
     gs = GameState()
     gs.rooms = {}
-    for a in areas:
-        for room_vnum in a.rooms:
-            gs.rooms[room_vnum] = a.rooms[room_vnum]
 
-        a.reset(gsp)
+    # Load in every area in the area list, adding their rooms to the game.
+    # After the first boot the areas come from their compiled copies unless
+    # the .are files have changed. With --lazy-areas, rooms, mobs and objects
+    # are only parsed once they're used instead
+    areas = load_world("areas/area.lst", gsp, gs, lazy="--lazy-areas" in sys.argv)
+    logger.info("Loaded %d areas", len(areas))
+
+    # Reset every area now, then periodically once the game is running
+    area_updater = AreaUpdater(areas, gsp, gs)
+    area_updater.reset_all()
 
     # stores the players in the game
     gs.players = {}
 
     # manages timers in our main loop
     gs.timer_manager = TimerManager()
+    area_updater.start(gs.timer_manager)
 
-    # start the server
-    mud = MudServer()
+    # start the server. By default we use the asyncio server, which wakes the
+    # game loop as soon as a player does something. Pass --sync to fall back
+    # to the original polling server. MCCP2 compression is only offered to
+    # players with --mccp, as it costs CPU time for every player using it
+    use_async = "--sync" not in sys.argv
+    server_class = AsyncMudServer if use_async else MudServer
+    compression = "--mccp" in sys.argv
+    mud = server_class(compression=compression)
 
     # build command look-up map
     commands = [LookCommand(gs, mud), MoveCommand(gs, mud), SayCommand(gs, mud)]
@@ -58,15 +73,24 @@ if __name__ == "__main__":
     for c in commands:
         for keyword in c.keywords:
             if keyword in commands_lookup:
-                print(f"Warning: keyword {keyword} already registered")
+                logger.warning("Keyword %s already registered", keyword)
                 continue
 
             commands_lookup[keyword] = c
 
+    # the game loop carries on until this is set to False
+    running = True
+
     def shutdown_callback():
+        global running
+
+        logger.info("Shutting down")
         mud.send_global_message(colored("Shutdown commencing. Until next time.", "red"))
-        mud.shutdown()
-        exit(0)
+
+        # the game loop stops, and shuts the server down, once it's finished
+        # this tick. Exiting here would leave the event loop half way through
+        # handling the clients
+        running = False
 
     def shutdown_handler(signal_received, frame):
         mud.send_global_message(
@@ -81,128 +105,215 @@ if __name__ == "__main__":
     # Tell Python to run the handler() function when SIGINT is recieved
     signal(SIGINT, shutdown_handler)
 
-    # main game loop. We loop forever (i.e. until the program is terminated)
-    while True:
-        # pause for 1/5 of a second on each loop, so that we don't constantly
-        # use 100% CPU time
-        time.sleep(0.2)
-
-        # 'update' must be called in the loop to keep the game running and give
-        # us up-to-date information
-        mud.update()
-
-        gs.timer_manager.run()
+    # adds a newly connected player to the game
+    def handle_new_player(id):
+        # add the new player to the dictionary, noting that they've not been
+        # named yet.
+        # The dictionary key is the player's id number. We set their room to
+        # None initially until they have entered a name
+        # Try adding more player stats - level, gold, inventory, etc
+        gs.players[id] = {
+            "name": None,
+            "room": None,
+            "id": id,
+        }
+
+        # send the new player a prompt for their name
+        send_login_welcome(mud, id)
+
+    # removes a player who has left from the game
+    def handle_player_left(id):
+        # if for any reason the player isn't in the player map, skip them
+        if id not in gs.players:
+            return
+
+        # go through all the players in the game
+        for pid, pl in gs.players.items():
+            # send each player a message to tell them about the diconnected
+            # player
+            mud.send_message(pid, "{} quit the game".format(gs.players[id]["name"]))
+
+        # remove the player's entry in the player dictionary
+        del gs.players[id]
+
+    # carries out a command sent by a player
+    def handle_command(id, command, params):
+        try:
+            # if for any reason the player isn't in the player map, skip them
+            if id not in gs.players:
+                return
 
-        # go through any newly connected players
-        for id in mud.get_new_players():
+            cmd_player = gs.players[id]
 
-            # add the new player to the dictionary, noting that they've not been
-            # named yet.
-            # The dictionary key is the player's id number. We set their room to
-            # None initially until they have entered a name
-            # Try adding more player stats - level, gold, inventory, etc
-            gs.players[id] = {
-                "name": None,
-                "room": None,
-                "id": id,
-            }
+            mud.send_message(id, "")
 
-            # send the new player a prompt for their name
-            send_login_welcome(mud, id)
+            # if the player hasn't given their name yet, use this first command as
+            # their name and move them to the starting room.
+            if gs.players[id]["name"] is None:
 
-        # go through any recently disconnected players
-        for id in mud.get_disconnected_players():
+                gs.players[id]["name"] = command
+                gs.players[id]["room"] = "3700"
 
-            # if for any reason the player isn't in the player map, skip them and
-            # move on to the next one
-            if id not in gs.players:
-                continue
-
-            # go through all the players in the game
-            for pid, pl in gs.players.items():
-                # send each player a message to tell them about the diconnected
-                # player
-                mud.send_message(pid, "{} quit the game".format(gs.players[id]["name"]))
+                # go through all the players in the game
+                for pid, pl in gs.players.items():
+                    # send each player a message to tell them about the new player
+                    mud.send_message(
+                        pid, "{} entered the game".format(gs.players[id]["name"])
+                    )
 
-            # remove the player's entry in the player dictionary
-            del gs.players[id]
+                # send the new player a welcome message
+                mud.send_message(
+                    id,
+                    "Welcome to the game, {}. ".format(gs.players[id]["name"])
+                    + "Type 'help' for a list of commands. Have fun!\n",
+                )
+
+                # send the new player the description of their current room
+                rm = gs.rooms[gs.players[id]["room"]]
+                mud.send_message(id, get_room_display_str(rm, gs.players[id], gs))
+
+            elif command in commands_lookup:
+                c = commands_lookup[command]
+
+                # execute yields strings to pass on to the client
+                for msg in c.execute(cmd_player, params, command):
+                    mud.send_message(id, msg)
+            # 'help' command
+            elif command == "help":
+
+                # send the player back the list of possible commands
+                mud.send_message(id, "Commands:")
+                mud.send_message(
+                    id,
+                    "  say <message>  - Says something out loud, " + "e.g. 'say Hello'",
+                )
+                mud.send_message(
+                    id,
+                    "  look           - Examines the " + "surroundings, e.g. 'look'",
+                )
+                mud.send_message(
+                    id,
+                    "  go <exit>      - Moves through the exit "
+                    + "specified, e.g. 'go outside'",
+                )
+                mud.send_message(id, "  quit      - Quit and log out of the PoffMUD")
+            elif command == "quit":
+
+                mud.send_message(id, f"Goodbye {cmd_player['name']}...")
+                mud.disconnect_client(id)
+
+            # some other, unrecognised command
+            else:
+                # send back an 'unknown command' message
+                mud.send_message(id, "Unknown command '{}'".format(command))
+
+        # one broken command shouldn't take the whole game down with it, so
+        # we log it and carry on
+        except Exception:
+            logger.exception("Error running command %r from player %s", command, id)
+            mud.send_message(id, "Something went wrong running that command.")
+
+    # handles everything that happened since the last call to 'mud.update'
+    def handle_events():
+        gs.timer_manager.run()
 
-        # go through any new commands sent from players
-        for id, command, params in mud.get_commands():
-            try:
-                # if for any reason the player isn't in the player map, skip them and
-                # move on to the next one
-                if id not in gs.players:
-                    continue
+        # reset the areas which have come due, a few each tick
+        area_updater.run()
 
-                cmd_player = gs.players[id]
+        # go through everything that happened in the order it happened, so
+        # that e.g. a player's last commands are carried out before they leave
+        for event in mud.drain_events():
+            if type(event) is NewPlayerEvent:
+                handle_new_player(event.id)
+            elif type(event) is PlayerLeftEvent:
+                handle_player_left(event.id)
+            else:
+                handle_command(event.id, event.command, event.params)
 
-                mud.send_message(id, "")
+        # send everything the commands above produced, one write per player
+        mud.flush()
 
-                # if the player hasn't given their name yet, use this first command as
-                # their name and move them to the starting room.
-                if gs.players[id]["name"] is None:
+    # with --stats we print how long ticks are taking every few seconds. The
+    # bot swarm benchmark reads these lines to report tick durations
+    print_stats = "--stats" in sys.argv
+    tick_durations = []
+    last_stats_time = time.monotonic()
 
-                    gs.players[id]["name"] = command
-                    gs.players[id]["room"] = "3700"
+    def run_tick():
+        global last_stats_time
 
-                    # go through all the players in the game
-                    for pid, pl in gs.players.items():
-                        # send each player a message to tell them about the new player
-                        mud.send_message(
-                            pid, "{} entered the game".format(gs.players[id]["name"])
-                        )
+        tick_start = time.perf_counter()
 
-                    # send the new player a welcome message
-                    mud.send_message(
-                        id,
-                        "Welcome to the game, {}. ".format(gs.players[id]["name"])
-                        + "Type 'help' for a list of commands. Have fun!\n",
-                    )
+        # 'update' must be called in the loop to keep the game running and give
+        # us up-to-date information
+        mud.update()
 
-                    # send the new player the description of their current room
-                    rm = gs.rooms[gs.players[id]["room"]]
-                    mud.send_message(id, get_room_display_str(rm, gs.players[id], gs))
+        handle_events()
+
+        if not print_stats:
+            return
+
+        tick_durations.append(time.perf_counter() - tick_start)
+        if time.monotonic() - last_stats_time >= 5.0:
+            tick_durations.sort()
+            count = len(tick_durations)
+            print(
+                f"STATS ticks={count}"
+                f" mean_ms={sum(tick_durations) / count * 1000:.3f}"
+                f" p99_ms={tick_durations[int(count * 0.99)] * 1000:.3f}"
+                f" max_ms={tick_durations[-1] * 1000:.3f}",
+                flush=True,
+            )
+            tick_durations.clear()
 
-                elif command in commands_lookup:
-                    c = commands_lookup[command]
+            # and the areas whose last resets took longest
+            durations = sorted(
+                area_updater.reset_durations().items(), key=lambda d: -d[1]
+            )
+            print(
+                f"AREA_STATS queued={area_updater.queued} slowest="
+                + ",".join(f"{name}:{ms:.3f}" for name, ms in durations[:5]),
+                flush=True,
+            )
 
-                    # execute yields strings to pass on to the client
-                    for msg in c.execute(cmd_player, params, command):
-                        mud.send_message(id, msg)
-                # 'help' command
-                elif command == "help":
+            # and how well compression is doing for the players using it
+            if compression:
+                compression_stats = mud.get_compression_stats().values()
+                raw_bytes = sum(c["raw_bytes"] for c in compression_stats)
+                compressed_bytes = sum(c["compressed_bytes"] for c in compression_stats)
+                cpu_seconds = sum(c["cpu_seconds"] for c in compression_stats)
+                print(
+                    f"MCCP_STATS players={len(compression_stats)}"
+                    f" raw_bytes={raw_bytes} compressed_bytes={compressed_bytes}"
+                    f" ratio={raw_bytes / max(compressed_bytes, 1):.2f}"
+                    f" cpu_ms={cpu_seconds * 1000:.3f}",
+                    flush=True,
+                )
+            last_stats_time = time.monotonic()
+
+    async def run_async():
+        await mud.start()
+
+        # main game loop. We loop until the server is shut down
+        while running:
+            # wait until a player does something, but wake up at least every
+            # 1/5 of a second so that timers keep running
+            await mud.wait_for_events(0.2)
+
+            run_tick()
 
-                    # send the player back the list of possible commands
-                    mud.send_message(id, "Commands:")
-                    mud.send_message(
-                        id,
-                        "  say <message>  - Says something out loud, "
-                        + "e.g. 'say Hello'",
-                    )
-                    mud.send_message(
-                        id,
-                        "  look           - Examines the "
-                        + "surroundings, e.g. 'look'",
-                    )
-                    mud.send_message(
-                        id,
-                        "  go <exit>      - Moves through the exit "
-                        + "specified, e.g. 'go outside'",
-                    )
-                    mud.send_message(
-                        id, "  quit      - Quit and log out of the PoffMUD"
-                    )
-                elif command == "quit":
+        mud.shutdown()
+        await mud.wait_closed()
 
-                    mud.send_message(id, f"Goodbye {cmd_player['name']}...")
-                    mud.disconnect_client(id)
+    if use_async:
+        asyncio.run(run_async())
+    else:
+        # main game loop. We loop until the server is shut down
+        while running:
+            # pause for 1/5 of a second on each loop, so that we don't
+            # constantly use 100% CPU time
+            time.sleep(0.2)
 
-                # some other, unrecognised command
-                else:
-                    # send back an 'unknown command' message
-                    mud.send_message(id, "Unknown command '{}'".format(command))
+            run_tick()
 
-            except Exception as e:
-                print(e)
-                raise e
+        mud.shutdown()